@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Group Closing
+วัดเวลาการปิด Position เป็นกลุ่มจากพอร์ต 500 ตัวบน fake_mt5
+
+- bookkeeping: PositionStore.remove เทียบกับการกรอง list แบบเดิม
+- end-to-end: OrderManager.close_positions_group_raw ผ่าน Terminal จำลอง (speed=0)
+  รวม delay 100ms ระหว่างคำสั่งของ MT5Connection จึงรันไม่กี่รอบ
+
+ใช้งาน:
+    python benchmarks/bench_group_close.py [--book 500] [--group 10] [--repeat 200] [--e2e-repeat 3]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+os.environ['MT5_SIMULATOR'] = '1'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fake_mt5  # noqa: E402
+from mt5_connection import MT5Connection  # noqa: E402
+from order_management import OrderManager, PositionStore  # noqa: E402
+
+def _setup(book_size: int):
+    """สร้าง Terminal จำลอง + OrderManager ที่มี Position book_size ตัว"""
+    terminal = fake_mt5.reset(speed=0)
+    for i in range(book_size):
+        terminal.add_position(i % 2, 0.01, 1990.0 + i * 0.05)
+    connection = MT5Connection()
+    if not connection.connect_mt5(max_retries=1):
+        raise RuntimeError("ไม่สามารถเชื่อมต่อ fake_mt5 ได้")
+    order_manager = OrderManager(connection)
+    order_manager.sync_positions_from_mt5()
+    return terminal, order_manager
+
+def bench_end_to_end(book_size: int, group_size: int, repeat: int) -> float:
+    """
+    ปิดกลุ่มละ group_size ตัวแล้วเติม Position กลับให้พอร์ตคงที่ book_size
+
+    Returns:
+        float: เวลาเฉลี่ยต่อการปิดหนึ่งกลุ่ม (ms)
+    """
+    terminal, order_manager = _setup(book_size)
+    elapsed = 0.0
+    for i in range(repeat):
+        group = order_manager.active_positions[:group_size]
+        start = time.perf_counter()
+        result = order_manager.close_positions_group_raw(group, reason="benchmark")
+        elapsed += time.perf_counter() - start
+        if len(result.closed_tickets) != group_size:
+            raise RuntimeError(f"ปิดได้ {len(result.closed_tickets)}/{group_size}: {result.error_message}")
+        for j in range(group_size):
+            terminal.add_position(j % 2, 0.01, 1990.0 + j * 0.05)
+        order_manager.sync_positions_from_mt5()
+    return elapsed / repeat * 1e3
+
+def bench_bookkeeping(book_size: int, group_size: int, repeat: int) -> dict:
+    """
+    เวลาอัพเดทพอร์ตหลังปิดกลุ่ม (ไม่รวม Terminal)
+
+    Returns:
+        dict: {'list_filter_us', 'store_remove_us'} ต่อหนึ่งกลุ่ม
+    """
+    _, order_manager = _setup(book_size)
+    positions = order_manager.get_positions()
+
+    # แบบเดิม: สร้าง list ใหม่โดยกรอง ticket ที่ปิด
+    active = list(positions)
+    elapsed_list = 0.0
+    for i in range(repeat):
+        closed = [p.ticket for p in active[:group_size]]
+        start = time.perf_counter()
+        active = [p for p in active if p.ticket not in closed]
+        elapsed_list += time.perf_counter() - start
+        active.extend(positions[:group_size])
+
+    # แบบใหม่: ลบจาก PositionStore ทีละ ticket
+    store = PositionStore()
+    store.replace_all(positions)
+    elapsed_store = 0.0
+    for i in range(repeat):
+        closed = [p.ticket for p in store.as_list()[:group_size]]
+        start = time.perf_counter()
+        removed = [store.remove(ticket) for ticket in closed]
+        elapsed_store += time.perf_counter() - start
+        for position in removed:
+            store.add(position)
+
+    return {
+        'list_filter_us': elapsed_list / repeat * 1e6,
+        'store_remove_us': elapsed_store / repeat * 1e6
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--book', type=int, default=500, help="จำนวน Position ในพอร์ต")
+    parser.add_argument('--group', type=int, default=10, help="จำนวน Position ต่อกลุ่มที่ปิด")
+    parser.add_argument('--repeat', type=int, default=200, help="จำนวนรอบ bookkeeping")
+    parser.add_argument('--e2e-repeat', type=int, default=3, help="จำนวนรอบ end-to-end (0 = ข้าม)")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    bookkeeping = bench_bookkeeping(args.book, args.group, args.repeat)
+    print(f"book={args.book} group={args.group} repeat={args.repeat}")
+    print(f"  list filter (old)      : {bookkeeping['list_filter_us']:8.1f} us/group")
+    print(f"  PositionStore.remove   : {bookkeeping['store_remove_us']:8.1f} us/group")
+    if args.e2e_repeat > 0:
+        end_to_end = bench_end_to_end(args.book, args.group, args.e2e_repeat)
+        print(f"  close_positions_group_raw end-to-end: {end_to_end:8.1f} ms/group")
+
+if __name__ == '__main__':
+    main()
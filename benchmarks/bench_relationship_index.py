@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Position Relationships
+เทียบ PositionStatusManager.analyze_all_positions กับอัลกอริทึมเดิมแบบ O(N^2)
+
+อัลกอริทึมเดิม (ก่อนใช้ดัชนีรายฝั่ง) คัดลอกไว้ใน _legacy_relationships / _legacy_status
+สคริปต์ตรวจว่า relationships และข้อความสถานะตรงกันทุก ticket แล้วจับเวลาแต่ละขนาดพอร์ต
+
+ใช้งาน:
+    python benchmarks/bench_relationship_index.py [--sizes 100 500 2000] [--books 5]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculations import Position  # noqa: E402
+from position_status_manager import PositionStatusManager  # noqa: E402
+
+def _legacy_ratio_string(position_profit: float, target_profit: float) -> str:
+    if target_profit == 0:
+        return "1:1"
+    return f"{abs(position_profit / target_profit):.1f}:1"
+
+def _legacy_relationships(position: Any, all_positions: List[Any]) -> Dict[str, Any]:
+    """_find_position_relationships เดิม - สแกนทั้งพอร์ตต่อหนึ่งไม้"""
+    relationships = {
+        'is_hedging': False,
+        'is_protecting_others': False,
+        'is_protected': False,
+        'has_assignment': False,
+        'hedge_target': None,
+        'hedge_ratio': '1:1',
+        'protecting': [],
+        'protected_by': None
+    }
+    ticket, position_type, profit = position.ticket, position.type, position.profit
+
+    for other in all_positions:
+        if other.ticket != ticket and other.type != position_type:
+            if other.profit < -5.0 and profit > 0:
+                relationships['is_hedging'] = True
+                relationships['hedge_target'] = {
+                    'ticket': other.ticket,
+                    'direction': 'BUY' if other.type == 0 else 'SELL',
+                    'profit': other.profit
+                }
+                relationships['hedge_ratio'] = _legacy_ratio_string(profit, other.profit)
+                break
+
+    if profit > 0:
+        protected = [p for p in all_positions
+                     if p.ticket != ticket and p.type == position_type and p.profit < -2.0]
+        if protected:
+            relationships['is_protecting_others'] = True
+            relationships['protecting'] = [{'ticket': p.ticket, 'profit': p.profit} for p in protected]
+
+    if profit < -2.0:
+        protectors = [p for p in all_positions
+                      if p.ticket != ticket and p.type == position_type and p.profit > 0]
+        if protectors:
+            relationships['is_protected'] = True
+            relationships['protected_by'] = {'ticket': protectors[0].ticket, 'profit': protectors[0].profit}
+
+    relationships['has_assignment'] = (
+        relationships['is_hedging'] or relationships['is_protecting_others'] or relationships['is_protected']
+    )
+    return relationships
+
+def _legacy_status(position: Any, zone_type: str, relationships: Dict[str, Any]) -> str:
+    """_determine_position_status เดิม"""
+    if relationships['is_hedging']:
+        target = relationships['hedge_target']
+        return f"HG - ค้ำ {target['direction']} Zone {zone_type} ({relationships['hedge_ratio']})"
+    if relationships['is_protecting_others']:
+        return f"Support Guard - ห้ามปิด ค้ำ {len(relationships['protecting'])} ไม้"
+    if relationships['is_protected']:
+        return f"Protected - มี HG ค้ำแล้ว รอช่วยเหลือ (โดย #{relationships['protected_by']['ticket']})"
+    if position.profit > 0 and not relationships['has_assignment']:
+        return "Profit Helper - พร้อมช่วยเหลือ"
+    return "Standalone - ยังไม่มีหน้าที่"
+
+def _random_book(size: int, seed: int) -> List[Position]:
+    rng = random.Random(seed)
+    return [
+        Position(ticket=100000 + i, symbol='XAUUSD', type=rng.randint(0, 1), volume=0.01,
+                 price_open=1900 + rng.random() * 200, price_current=2000.0,
+                 profit=round(rng.uniform(-30, 30), 2))
+        for i in range(size)
+    ]
+
+def run(size: int, books: int) -> Dict[str, Any]:
+    """
+    เทียบผลและเวลาบนพอร์ตสุ่ม books ชุดขนาด size
+
+    Returns:
+        Dict: legacy_ms, current_ms (เฉลี่ยต่อรอบ), mismatches
+    """
+    legacy_time = current_time = 0.0
+    mismatches = 0
+    for seed in range(books):
+        positions = _random_book(size, seed)
+
+        start = time.perf_counter()
+        legacy = {p.ticket: _legacy_relationships(p, positions) for p in positions}
+        legacy_time += time.perf_counter() - start
+
+        manager = PositionStatusManager()
+        manager.analysis_interval = 0
+        start = time.perf_counter()
+        statuses = manager.analyze_all_positions(positions, 2000.0, [], 'sideways')
+        current_time += time.perf_counter() - start
+
+        if statuses.keys() != legacy.keys():
+            mismatches += abs(len(statuses) - len(legacy)) or 1
+        for position in positions:
+            status = statuses.get(position.ticket)
+            if status is None:
+                continue
+            expected = _legacy_status(position, status.zone, legacy[position.ticket])
+            if status.relationships != legacy[position.ticket] or status.status != expected:
+                mismatches += 1
+
+    return {
+        'legacy_ms': legacy_time / books * 1e3,
+        'current_ms': current_time / books * 1e3,
+        'mismatches': mismatches
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 500, 2000], help="ขนาดพอร์ต")
+    parser.add_argument('--books', type=int, default=5, help="จำนวนพอร์ตสุ่มต่อขนาด")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    failed = False
+    for size in args.sizes:
+        result = run(size, args.books)
+        failed = failed or result['mismatches'] > 0
+        print(f"N={size:5d}: legacy relationships {result['legacy_ms']:8.1f} ms | "
+              f"analyze_all_positions {result['current_ms']:7.1f} ms | mismatches {result['mismatches']}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
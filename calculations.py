@@ -6,14 +6,72 @@ Calculations Module
 
 import logging
 import math
+import sys
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# slots=True ใช้ได้ตั้งแต่ Python 3.10 - เวอร์ชันเก่ากว่าจะได้ dataclass ปกติ (มี __dict__)
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_DATACLASS_SLOTS)
 class Position:
-    """คลาสสำหรับเก็บข้อมูล Position"""
+    """
+    คลาสสำหรับเก็บข้อมูล Position
+    
+    ใช้ __slots__ เพื่อลดหน่วยความจำต่อ instance (ไม่มี __dict__) - ถูกสร้างเป็นพันตัวทุกรอบ sync
+    ฟิลด์ยังแก้ไขได้ เพราะ OrderManager อัปเดตราคา/กำไรแบบ in-place
+    """
+    ticket: int
+    symbol: str
+    type: int  # 0=BUY, 1=SELL
+    volume: float
+    price_open: float
+    price_current: float
+    profit: float
+    swap: float = 0.0
+    commission: float = 0.0
+    comment: str = ""
+    magic: int = 0
+    time_open: Optional[Any] = None
+    sl: float = 0.0
+    tp: float = 0.0
+    
+    @classmethod
+    def from_mt5(cls, record: Any) -> 'Position':
+        """
+        สร้าง Position จาก record ของ MT5 (TradePosition) โดยตรง
+        
+        ส่ง argument แบบ positional เพื่อเลี่ยงต้นทุนการจับคู่ keyword ในลูป sync
+        
+        Args:
+            record: Position record จาก mt5.positions_get()
+            
+        Returns:
+            Position: Position ใหม่
+        """
+        return cls(record.ticket, record.symbol, record.type, record.volume,
+                   record.price_open, record.price_current, record.profit,
+                   record.swap, getattr(record, 'commission', 0.0),
+                   record.comment, record.magic, record.time,
+                   record.sl, record.tp)
+    
+    def freeze(self) -> 'FrozenPosition':
+        """
+        คัดลอกเป็น FrozenPosition (แก้ไขไม่ได้) สำหรับส่งต่อให้ผู้อ่านข้าม thread
+        
+        Returns:
+            FrozenPosition: สำเนาที่แก้ไขไม่ได้ ณ เวลาที่เรียก
+        """
+        return FrozenPosition(self.ticket, self.symbol, self.type, self.volume,
+                              self.price_open, self.price_current, self.profit,
+                              self.swap, self.commission, self.comment,
+                              self.magic, self.time_open, self.sl, self.tp)
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
+class FrozenPosition:
+    """Position แบบแก้ไขไม่ได้ (ฟิลด์เดียวกับ Position) - ใช้เป็น snapshot ที่แชร์ได้อย่างปลอดภัย"""
     ticket: int
     symbol: str
     type: int  # 0=BUY, 1=SELL
@@ -26,6 +84,8 @@ class Position:
     comment: str = ""
     magic: int = 0
     time_open: Optional[Any] = None
+    sl: float = 0.0
+    tp: float = 0.0
 
 class PercentageCalculator:
     """คลาสสำหรับคำนวณเปอร์เซ็นต์ต่างๆ"""
@@ -0,0 +1,599 @@
+# -*- coding: utf-8 -*-
+"""
+Fake MT5 Terminal Module
+โมดูล Terminal จำลองที่ใช้แทน MetaTrader5 สำหรับทดสอบและ benchmark บน Linux
+
+ใช้งานเหมือนแพ็กเกจ MetaTrader5 (initialize, copy_rates_from_pos, copy_rates_from,
+symbol_info, symbol_info_tick, positions_get, order_send, account_info, terminal_info)
+โดยราคามาจาก random walk ที่กำหนด seed ได้ หรือจากราคาที่บันทึกไว้
+"""
+
+import csv
+import logging
+import threading
+import time
+from collections import deque, namedtuple
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional, Sequence, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# ==================== ค่าคงที่ (ค่าเดียวกับแพ็กเกจ MetaTrader5) ====================
+
+TIMEFRAME_M1 = 1
+TIMEFRAME_M5 = 5
+TIMEFRAME_M15 = 15
+TIMEFRAME_M30 = 30
+TIMEFRAME_H1 = 16385
+TIMEFRAME_H4 = 16388
+TIMEFRAME_D1 = 16408
+
+ORDER_TYPE_BUY = 0
+ORDER_TYPE_SELL = 1
+POSITION_TYPE_BUY = 0
+POSITION_TYPE_SELL = 1
+
+TRADE_ACTION_DEAL = 1
+TRADE_ACTION_PENDING = 5
+TRADE_ACTION_SLTP = 6
+TRADE_ACTION_MODIFY = 7
+TRADE_ACTION_REMOVE = 8
+
+ORDER_FILLING_FOK = 0
+ORDER_FILLING_IOC = 1
+ORDER_FILLING_RETURN = 2
+ORDER_TIME_GTC = 0
+
+SYMBOL_TRADE_MODE_DISABLED = 0
+SYMBOL_TRADE_MODE_FULL = 4
+
+TRADE_RETCODE_REQUOTE = 10004
+TRADE_RETCODE_REJECT = 10006
+TRADE_RETCODE_DONE = 10009
+TRADE_RETCODE_INVALID = 10013
+TRADE_RETCODE_INVALID_VOLUME = 10014
+TRADE_RETCODE_INVALID_STOPS = 10016
+TRADE_RETCODE_NO_CHANGES = 10025
+TRADE_RETCODE_POSITION_CLOSED = 10039
+
+RES_S_OK = 1
+RES_E_FAIL = -1
+
+# นาทีต่อแท่งของแต่ละ timeframe
+TIMEFRAME_MINUTES = {
+    TIMEFRAME_M1: 1,
+    TIMEFRAME_M5: 5,
+    TIMEFRAME_M15: 15,
+    TIMEFRAME_M30: 30,
+    TIMEFRAME_H1: 60,
+    TIMEFRAME_H4: 240,
+    TIMEFRAME_D1: 1440
+}
+
+RATES_DTYPE = np.dtype([
+    ('time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8'),
+    ('tick_volume', '<u8'), ('spread', '<i4'), ('real_volume', '<u8')
+])
+
+# ==================== Records (field เดียวกับ MetaTrader5) ====================
+
+Tick = namedtuple('Tick', 'time bid ask last volume time_msc flags volume_real')
+
+SymbolInfo = namedtuple('SymbolInfo', [
+    'name', 'description', 'currency_base', 'currency_profit', 'currency_margin',
+    'digits', 'point', 'spread', 'trade_stops_level', 'trade_freeze_level',
+    'volume_min', 'volume_max', 'volume_step', 'trade_contract_size',
+    'trade_tick_value', 'trade_tick_size', 'margin_initial', 'margin_maintenance',
+    'trade_mode', 'filling_mode', 'visible', 'select', 'bid', 'ask', 'last', 'time'
+])
+
+AccountInfo = namedtuple('AccountInfo', [
+    'login', 'trade_mode', 'leverage', 'trade_allowed', 'balance', 'credit', 'profit',
+    'equity', 'margin', 'margin_free', 'margin_level', 'name', 'server', 'currency', 'company'
+])
+
+TerminalInfo = namedtuple('TerminalInfo', [
+    'name', 'company', 'path', 'data_path', 'commondata_path', 'build',
+    'connected', 'trade_allowed', 'tradeapi_disabled', 'x64'
+])
+
+TradePosition = namedtuple('TradePosition', [
+    'ticket', 'time', 'time_msc', 'time_update', 'type', 'magic', 'identifier',
+    'volume', 'price_open', 'sl', 'tp', 'price_current', 'swap', 'profit',
+    'symbol', 'comment'
+])
+
+OrderSendResult = namedtuple('OrderSendResult', [
+    'retcode', 'deal', 'order', 'volume', 'price', 'bid', 'ask', 'comment',
+    'request_id', 'retcode_external', 'request'
+])
+
+class FakeTerminal:
+    """
+    Terminal จำลองแบบ deterministic
+
+    เวลาของ terminal เริ่มที่ start_time และเดินตาม speed (เท่าของเวลาจริง)
+    ถ้า speed = 0 เวลาจะเดินเฉพาะเมื่อเรียก advance() ทำให้ผลลัพธ์ซ้ำได้ทุกครั้ง
+    """
+
+    def __init__(self, symbol: str = "XAUUSD", start_price: float = 2000.0,
+                 seed: int = 42, volatility: float = 0.35,
+                 closes: Optional[Sequence[float]] = None,
+                 start_time: datetime = datetime(2024, 1, 2, 8, 0, tzinfo=timezone.utc),
+                 history_bars: int = 10080, speed: float = 1.0,
+                 spread_points: int = 25, stops_level: int = 0,
+                 balance: float = 10000.0, leverage: int = 500,
+                 latency: Union[float, Dict[str, float]] = 0.0,
+                 slippage_points: int = 0):
+        """
+        Args:
+            symbol: สัญลักษณ์ที่จำลอง
+            start_price: ราคาเริ่มต้นของ random walk
+            seed: seed ของ random walk
+            volatility: ส่วนเบี่ยงเบนมาตรฐานของราคาต่อนาที
+            closes: ราคาปิด M1 ที่บันทึกไว้ (ใช้แทน random walk)
+            start_time: เวลาของแท่ง M1 แรกหลัง history (UTC)
+            history_bars: จำนวนแท่ง M1 ก่อน start_time
+            speed: ความเร็วเวลาเทียบกับเวลาจริง (0 = เดินด้วย advance() เท่านั้น)
+            spread_points: spread เป็น points
+            stops_level: ระยะ SL/TP ขั้นต่ำเป็น points
+            balance: ยอดเงินเริ่มต้น
+            leverage: leverage ของบัญชี
+            latency: หน่วงเวลาต่อการเรียก (วินาที) - ค่าเดียวหรือ dict ตามชื่อฟังก์ชัน
+            slippage_points: slippage ที่ใส่ให้ราคา fill (points, ในทิศทางที่เสียเปรียบ)
+        """
+        self.symbol = symbol
+        self.digits = 2
+        self.point = 0.01
+        self.contract_size = 100.0
+        self.spread_points = spread_points
+        self.stops_level = stops_level
+        self.leverage = leverage
+        self.balance = balance
+        self.latency = latency
+        self.slippage_points = slippage_points
+        self.speed = speed
+        self.volatility = volatility
+
+        self._lock = threading.RLock()
+        self._rng = np.random.RandomState(seed)
+        self._start_epoch = int(start_time.timestamp()) // 60 * 60
+        self._history_bars = history_bars
+        self._sim_seconds = 0.0
+        self._wall_start = time.monotonic()
+
+        # ราคาปิด M1 (index 0 = แท่งแรกของ history)
+        if closes is not None:
+            self._recorded = True
+            self._closes = np.asarray(closes, dtype=np.float64)
+            self._history_bars = min(history_bars, max(len(self._closes) - 1, 0))
+        else:
+            self._recorded = False
+            steps = self._rng.normal(0.0, volatility, history_bars + 1440)
+            self._closes = start_price + np.cumsum(steps)
+        self._noise = np.abs(self._rng.normal(0.0, volatility * 0.5, len(self._closes)))
+
+        self.initialized = False
+        self.positions = {}  # ticket -> dict
+        self._next_ticket = 100000
+        self._last_error = (RES_S_OK, 'Success')
+
+        # Retcode injection - คิว retcode ที่ order_send จะตอบครั้งถัดไป
+        self.injected_retcodes = deque()
+        self.retcode_hook = None  # Callable[[Dict], Optional[int]]
+
+        # 📊 นับจำนวนการเรียกแต่ละฟังก์ชัน
+        self.call_counts = {}
+        self.order_log = deque(maxlen=10000)
+        self._request_id = 0
+
+    # ==================== Clock & Prices ====================
+
+    @classmethod
+    def from_csv(cls, path: str, column: str = 'close', **kwargs) -> 'FakeTerminal':
+        """สร้าง terminal จากไฟล์ CSV ของราคาปิด M1 ที่บันทึกไว้"""
+        with open(path, newline='') as f:
+            closes = [float(row[column]) for row in csv.DictReader(f)]
+        return cls(closes=closes, **kwargs)
+
+    def advance(self, seconds: float):
+        """เดินเวลาของ terminal ไปข้างหน้า"""
+        with self._lock:
+            self._sim_seconds += seconds
+
+    def now(self) -> float:
+        """เวลาปัจจุบันของ terminal (epoch seconds)"""
+        elapsed = self._sim_seconds
+        if self.speed > 0:
+            elapsed += (time.monotonic() - self._wall_start) * self.speed
+        return self._start_epoch + elapsed
+
+    def _bar_index(self, epoch: float) -> int:
+        """index ของแท่ง M1 ที่ครอบเวลา epoch"""
+        return self._history_bars + int((epoch - self._start_epoch) // 60)
+
+    def _ensure_bars(self, index: int):
+        """ขยาย random walk ให้ครอบ index (ราคาที่บันทึกไว้จะคงราคาสุดท้าย)"""
+        missing = index + 1 - len(self._closes)
+        if missing <= 0:
+            return
+        missing = max(missing, 1440)
+        if self._recorded:
+            extension = np.full(missing, self._closes[-1])
+        else:
+            extension = self._closes[-1] + np.cumsum(self._rng.normal(0.0, self.volatility, missing))
+        self._closes = np.concatenate([self._closes, extension])
+        self._noise = np.concatenate([
+            self._noise, np.abs(self._rng.normal(0.0, self.volatility * 0.5, missing))
+        ])
+
+    def _mid_price(self, epoch: float) -> float:
+        """ราคากลาง ณ เวลา epoch (interpolate ภายในแท่ง M1)"""
+        index = max(self._bar_index(epoch), 0)
+        self._ensure_bars(index)
+        bar_open = self._closes[index - 1] if index > 0 else self._closes[0]
+        fraction = ((epoch - self._start_epoch) % 60) / 60.0
+        return round(float(bar_open + (self._closes[index] - bar_open) * fraction), self.digits)
+
+    def _quote(self) -> Dict[str, float]:
+        epoch = self.now()
+        bid = self._mid_price(epoch)
+        ask = round(bid + self.spread_points * self.point, self.digits)
+        return {'time': epoch, 'bid': bid, 'ask': ask}
+
+    def _build_rates(self, timeframe: int, end_index: int, count: int) -> np.ndarray:
+        """สร้างแท่งเทียนของ timeframe จากแท่ง M1 โดยแท่งสุดท้ายครอบ end_index"""
+        minutes = TIMEFRAME_MINUTES.get(timeframe, 1)
+        self._ensure_bars(end_index)
+
+        # จัดแท่งให้ตรงขอบเวลาของ timeframe
+        end_minute = (self._start_epoch // 60) + (end_index - self._history_bars)
+        last_bar_start = end_minute - (end_minute % minutes)
+        first_bar_start = last_bar_start - (count - 1) * minutes
+
+        rates = np.zeros(count, dtype=RATES_DTYPE)
+        written = 0
+        for bar in range(count):
+            bar_start = first_bar_start + bar * minutes
+            first = bar_start - (self._start_epoch // 60) + self._history_bars
+            last = min(first + minutes - 1, end_index)
+            if first < 1:
+                continue  # ก่อนเริ่ม history
+            closes = self._closes[first:last + 1]
+            noise = self._noise[first:last + 1]
+            bar_open = self._closes[first - 1]
+            rates[written] = (
+                bar_start * 60,
+                bar_open,
+                max(bar_open, (closes + noise).max()),
+                min(bar_open, (closes - noise).min()),
+                closes[-1],
+                60 * len(closes),
+                self.spread_points,
+                0
+            )
+            written += 1
+        return rates[:written]
+
+    # ==================== Call bookkeeping ====================
+
+    def _enter(self, name: str):
+        """บันทึกการเรียกและจำลอง latency"""
+        self.call_counts[name] = self.call_counts.get(name, 0) + 1
+        delay = self.latency.get(name, 0.0) if isinstance(self.latency, dict) else self.latency
+        if delay > 0:
+            time.sleep(delay)
+
+    def inject_retcode(self, retcode: int, count: int = 1):
+        """ให้ order_send ครั้งถัดไปตอบ retcode นี้ (count ครั้ง)"""
+        with self._lock:
+            self.injected_retcodes.extend([retcode] * count)
+
+    def reset_call_counts(self):
+        self.call_counts = {}
+
+    # ==================== MetaTrader5 API ====================
+
+    def initialize(self, path: Optional[str] = None, **kwargs) -> bool:
+        self._enter('initialize')
+        self.initialized = True
+        self._last_error = (RES_S_OK, 'Success')
+        return True
+
+    def shutdown(self):
+        self._enter('shutdown')
+        self.initialized = False
+
+    def last_error(self):
+        return self._last_error
+
+    def terminal_info(self) -> Optional[TerminalInfo]:
+        self._enter('terminal_info')
+        if not self.initialized:
+            return None
+        return TerminalInfo(
+            name='Fake MetaTrader 5', company='Simulator', path='/fake/mt5',
+            data_path='/fake/mt5/data', commondata_path='/fake/mt5/common', build=4000,
+            connected=True, trade_allowed=True, tradeapi_disabled=False, x64=True
+        )
+
+    def account_info(self) -> Optional[AccountInfo]:
+        self._enter('account_info')
+        if not self.initialized:
+            return None
+        with self._lock:
+            quote = self._quote()
+            profit = sum(self._position_profit(pos, quote) for pos in self.positions.values())
+            margin = sum(
+                pos['volume'] * self.contract_size * pos['price_open'] / self.leverage
+                for pos in self.positions.values()
+            )
+            equity = self.balance + profit
+            return AccountInfo(
+                login=5000000, trade_mode=1, leverage=self.leverage, trade_allowed=True,
+                balance=self.balance, credit=0.0, profit=round(profit, 2), equity=round(equity, 2),
+                margin=round(margin, 2), margin_free=round(equity - margin, 2),
+                margin_level=(equity / margin) * 100 if margin > 0 else 0.0,
+                name='Simulator', server='Fake-Demo', currency='USD', company='Simulator'
+            )
+
+    def _symbol_info(self, quote: Dict[str, float]) -> SymbolInfo:
+        return SymbolInfo(
+            name=self.symbol, description='Gold vs US Dollar (simulated)',
+            currency_base='XAU', currency_profit='USD', currency_margin='USD',
+            digits=self.digits, point=self.point, spread=self.spread_points,
+            trade_stops_level=self.stops_level, trade_freeze_level=0,
+            volume_min=0.01, volume_max=100.0, volume_step=0.01,
+            trade_contract_size=self.contract_size, trade_tick_value=1.0,
+            trade_tick_size=self.point, margin_initial=0.0, margin_maintenance=0.0,
+            trade_mode=SYMBOL_TRADE_MODE_FULL, filling_mode=3, visible=True, select=True,
+            bid=quote['bid'], ask=quote['ask'], last=0.0, time=int(quote['time'])
+        )
+
+    def symbol_info(self, symbol: str) -> Optional[SymbolInfo]:
+        self._enter('symbol_info')
+        if symbol != self.symbol:
+            return None
+        with self._lock:
+            return self._symbol_info(self._quote())
+
+    def symbols_get(self, group: Optional[str] = None):
+        self._enter('symbols_get')
+        with self._lock:
+            return (self._symbol_info(self._quote()),)
+
+    def symbol_select(self, symbol: str, enable: bool = True) -> bool:
+        self._enter('symbol_select')
+        return symbol == self.symbol
+
+    def symbol_info_tick(self, symbol: str) -> Optional[Tick]:
+        self._enter('symbol_info_tick')
+        if symbol != self.symbol:
+            return None
+        with self._lock:
+            quote = self._quote()
+        return Tick(
+            time=int(quote['time']), bid=quote['bid'], ask=quote['ask'], last=0.0, volume=0,
+            time_msc=int(quote['time'] * 1000), flags=6, volume_real=0.0
+        )
+
+    def copy_rates_from_pos(self, symbol: str, timeframe: int, start_pos: int, count: int):
+        self._enter('copy_rates_from_pos')
+        if symbol != self.symbol or count <= 0:
+            return None
+        with self._lock:
+            minutes = TIMEFRAME_MINUTES.get(timeframe, 1)
+            end_index = self._bar_index(self.now()) - start_pos * minutes
+            return self._build_rates(timeframe, end_index, count)
+
+    def copy_rates_from(self, symbol: str, timeframe: int, date_from: Union[datetime, int, float], count: int):
+        self._enter('copy_rates_from')
+        if symbol != self.symbol or count <= 0:
+            return None
+        epoch = date_from.timestamp() if isinstance(date_from, datetime) else float(date_from)
+        with self._lock:
+            end_index = min(self._bar_index(epoch), self._bar_index(self.now()))
+            return self._build_rates(timeframe, end_index, count)
+
+    def _position_profit(self, pos: Dict, quote: Dict[str, float]) -> float:
+        if pos['type'] == POSITION_TYPE_BUY:
+            price_diff = quote['bid'] - pos['price_open']
+        else:
+            price_diff = pos['price_open'] - quote['ask']
+        return float(price_diff * pos['volume'] * self.contract_size)
+
+    def _to_record(self, pos: Dict, quote: Dict[str, float]) -> TradePosition:
+        price_current = quote['bid'] if pos['type'] == POSITION_TYPE_BUY else quote['ask']
+        return TradePosition(
+            ticket=pos['ticket'], time=pos['time'], time_msc=pos['time'] * 1000,
+            time_update=pos['time_update'], type=pos['type'], magic=pos['magic'],
+            identifier=pos['ticket'], volume=pos['volume'], price_open=pos['price_open'],
+            sl=pos['sl'], tp=pos['tp'], price_current=price_current, swap=0.0,
+            profit=round(self._position_profit(pos, quote), 2),
+            symbol=pos['symbol'], comment=pos['comment']
+        )
+
+    def positions_get(self, symbol: Optional[str] = None, group: Optional[str] = None,
+                      ticket: Optional[int] = None):
+        self._enter('positions_get')
+        with self._lock:
+            quote = self._quote()
+            if ticket is not None:
+                pos = self.positions.get(ticket)
+                return (self._to_record(pos, quote),) if pos else ()
+            return tuple(
+                self._to_record(pos, quote) for pos in self.positions.values()
+                if symbol is None or pos['symbol'] == symbol
+            )
+
+    def positions_total(self) -> int:
+        self._enter('positions_total')
+        return len(self.positions)
+
+    def add_position(self, position_type: int, volume: float, price_open: float,
+                     magic: int = 0, comment: str = "", open_time: Optional[int] = None) -> int:
+        """เพิ่ม Position โดยตรง (สำหรับเตรียมพอร์ตในการทดสอบ)"""
+        with self._lock:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            now = int(self.now()) if open_time is None else open_time
+            self.positions[ticket] = {
+                'ticket': ticket, 'symbol': self.symbol, 'type': position_type,
+                'volume': volume, 'price_open': price_open, 'sl': 0.0, 'tp': 0.0,
+                'magic': magic, 'comment': comment, 'time': now, 'time_update': now
+            }
+            return ticket
+
+    def _result(self, retcode: int, request: Dict, quote: Dict[str, float],
+                deal: int = 0, order: int = 0, volume: float = 0.0, price: float = 0.0,
+                comment: str = '') -> OrderSendResult:
+        self._request_id += 1
+        result = OrderSendResult(
+            retcode=retcode, deal=deal, order=order, volume=volume, price=price,
+            bid=quote['bid'], ask=quote['ask'], comment=comment or ('Request executed' if retcode == TRADE_RETCODE_DONE else 'Rejected'),
+            request_id=self._request_id, retcode_external=0, request=dict(request)
+        )
+        self.order_log.append(result)
+        return result
+
+    def _stops_valid(self, position_type: int, sl: float, tp: float, quote: Dict[str, float]) -> bool:
+        """ตรวจ SL/TP เทียบกับ stops level"""
+        min_distance = self.stops_level * self.point
+        reference = quote['bid'] if position_type == POSITION_TYPE_BUY else quote['ask']
+        if position_type == POSITION_TYPE_BUY:
+            if sl and sl > reference - min_distance:
+                return False
+            if tp and tp < reference + min_distance:
+                return False
+        else:
+            if sl and sl < reference + min_distance:
+                return False
+            if tp and tp > reference - min_distance:
+                return False
+        return True
+
+    def order_send(self, request: Dict) -> Optional[OrderSendResult]:
+        self._enter('order_send')
+        if not self.initialized or not isinstance(request, dict):
+            self._last_error = (RES_E_FAIL, 'Terminal not initialized' if not self.initialized else 'Invalid request')
+            return None
+
+        with self._lock:
+            quote = self._quote()
+
+            # 💉 Retcode injection
+            injected = self.injected_retcodes.popleft() if self.injected_retcodes else None
+            if injected is None and self.retcode_hook is not None:
+                injected = self.retcode_hook(request)
+            if injected is not None and injected != TRADE_RETCODE_DONE:
+                return self._result(injected, request, quote)
+
+            action = request.get('action')
+            ticket = request.get('position')
+
+            if action == TRADE_ACTION_SLTP:
+                pos = self.positions.get(ticket)
+                if pos is None:
+                    return self._result(TRADE_RETCODE_POSITION_CLOSED, request, quote)
+                sl = request.get('sl', 0.0) or 0.0
+                tp = request.get('tp', 0.0) or 0.0
+                if sl == pos['sl'] and tp == pos['tp']:
+                    return self._result(TRADE_RETCODE_NO_CHANGES, request, quote)
+                if not self._stops_valid(pos['type'], sl, tp, quote):
+                    return self._result(TRADE_RETCODE_INVALID_STOPS, request, quote)
+                pos['sl'], pos['tp'] = sl, tp
+                pos['time_update'] = int(quote['time'])
+                return self._result(TRADE_RETCODE_DONE, request, quote, order=ticket)
+
+            if action != TRADE_ACTION_DEAL:
+                return self._result(TRADE_RETCODE_INVALID, request, quote)
+
+            volume = float(request.get('volume', 0.0))
+            order_type = request.get('type')
+            if volume <= 0:
+                return self._result(TRADE_RETCODE_INVALID_VOLUME, request, quote)
+
+            # ราคา fill + slippage (ทิศทางที่เสียเปรียบ)
+            slippage = self.slippage_points * self.point
+            if order_type == ORDER_TYPE_BUY:
+                fill_price = round(quote['ask'] + slippage, self.digits)
+            else:
+                fill_price = round(quote['bid'] - slippage, self.digits)
+
+            deal = self._next_ticket
+            self._next_ticket += 1
+
+            if ticket:
+                # ปิด Position
+                pos = self.positions.get(ticket)
+                if pos is None:
+                    return self._result(TRADE_RETCODE_POSITION_CLOSED, request, quote)
+                close_volume = min(volume, pos['volume'])
+                if pos['type'] == POSITION_TYPE_BUY:
+                    realized = (fill_price - pos['price_open']) * close_volume * self.contract_size
+                else:
+                    realized = (pos['price_open'] - fill_price) * close_volume * self.contract_size
+                self.balance += round(realized, 2)
+                pos['volume'] = round(pos['volume'] - close_volume, 2)
+                if pos['volume'] <= 0:
+                    del self.positions[ticket]
+                return self._result(TRADE_RETCODE_DONE, request, quote, deal=deal, order=deal,
+                                    volume=close_volume, price=fill_price)
+
+            # เปิด Position ใหม่
+            sl = request.get('sl', 0.0) or 0.0
+            tp = request.get('tp', 0.0) or 0.0
+            if not self._stops_valid(order_type, sl, tp, quote):
+                return self._result(TRADE_RETCODE_INVALID_STOPS, request, quote)
+            now = int(quote['time'])
+            self.positions[deal] = {
+                'ticket': deal, 'symbol': request.get('symbol', self.symbol), 'type': order_type,
+                'volume': volume, 'price_open': fill_price, 'sl': sl, 'tp': tp,
+                'magic': request.get('magic', 0), 'comment': request.get('comment', ''),
+                'time': now, 'time_update': now
+            }
+            return self._result(TRADE_RETCODE_DONE, request, quote, deal=deal, order=deal,
+                                volume=volume, price=fill_price)
+
+    def history_deals_get(self, *args, **kwargs):
+        self._enter('history_deals_get')
+        return ()
+
+    def orders_get(self, *args, **kwargs):
+        self._enter('orders_get')
+        return ()
+
+# ==================== Module-level API (drop-in แทน MetaTrader5) ====================
+
+terminal = FakeTerminal()
+
+def reset(**kwargs) -> FakeTerminal:
+    """สร้าง terminal ใหม่ด้วยค่าที่กำหนด (เช่น reset(speed=0, seed=7) สำหรับทดสอบ)"""
+    global terminal
+    terminal = FakeTerminal(**kwargs)
+    return terminal
+
+def _delegate(name: str) -> Callable:
+    def call(*args, **kwargs):
+        return getattr(terminal, name)(*args, **kwargs)
+    call.__name__ = name
+    return call
+
+initialize = _delegate('initialize')
+shutdown = _delegate('shutdown')
+last_error = _delegate('last_error')
+terminal_info = _delegate('terminal_info')
+account_info = _delegate('account_info')
+symbol_info = _delegate('symbol_info')
+symbols_get = _delegate('symbols_get')
+symbol_select = _delegate('symbol_select')
+symbol_info_tick = _delegate('symbol_info_tick')
+copy_rates_from_pos = _delegate('copy_rates_from_pos')
+copy_rates_from = _delegate('copy_rates_from')
+positions_get = _delegate('positions_get')
+positions_total = _delegate('positions_total')
+order_send = _delegate('order_send')
+history_deals_get = _delegate('history_deals_get')
+orders_get = _delegate('orders_get')
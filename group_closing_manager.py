@@ -11,6 +11,8 @@ from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 
+from position_status_manager import PositionStatusCode
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -198,10 +200,8 @@ class GroupClosingManager:
                 if ticket in processed_tickets:
                     continue
                 
-                status = status_obj.status
-                
                 # ตรวจสอบ Protected
-                if 'Protected' in status:
+                if status_obj.code == PositionStatusCode.PROTECTED:
                     protected_pos = self._get_position_by_ticket(positions, ticket)
                     if not protected_pos:
                         continue
@@ -714,6 +714,12 @@ class GroupClosingManager:
                     'group_id': closing_group.group_id
                 }
             
+            # กำไรหลังหัก spread ของทั้งกลุ่ม (คำนวณครั้งเดียว)
+            spread_adjusted = self.get_spread_adjusted_profits(closing_group.positions)
+            if spread_adjusted:
+                adjusted_total = sum(item['calculated_profit'] for item in spread_adjusted.values())
+                logger.info(f"   Spread-adjusted Profit: ${adjusted_total:.2f}")
+            
             # ส่งคำสั่งปิดไปยัง OrderManager
             if self.order_manager:
                 result = self.order_manager.close_positions_group_raw(
@@ -776,8 +782,7 @@ class GroupClosingManager:
             protected_ticket = getattr(protected_pos, 'ticket', 0)
             
             for ticket, status_obj in position_statuses.items():
-                status = status_obj.status
-                if 'HG' in status and ticket != protected_ticket:
+                if status_obj.code == PositionStatusCode.HEDGE_GUARD and ticket != protected_ticket:
                     # ตรวจสอบว่าเป็น HG ของไม้นี้หรือไม่
                     relationships = getattr(status_obj, 'relationships', {})
                     if relationships.get('is_hedging'):
@@ -798,8 +803,7 @@ class GroupClosingManager:
         try:
             helpers = []
             for ticket, status_obj in position_statuses.items():
-                status = status_obj.status
-                if 'Profit Helper' in status:
+                if status_obj.code == PositionStatusCode.PROFIT_HELPER:
                     helper_pos = self._get_position_by_ticket(positions, ticket)
                     if helper_pos:
                         helpers.append(helper_pos)
@@ -808,6 +812,21 @@ class GroupClosingManager:
             logger.error(f"❌ Error getting profit helpers: {e}")
             return []
     
+    def get_spread_adjusted_profits(self, positions: List[Any], tick: Optional[Dict] = None) -> Dict[int, Dict]:
+        """
+        คำนวณกำไรรวม spread ของทุกไม้ในครั้งเดียว (ไม่ต้องถาม MT5 ทีละ ticket)
+        
+        Args:
+            positions: List[Position] - snapshot ของไม้ที่ต้องการ
+            tick: Dict - tick ที่จะใช้ (None = ใช้ tick cache ของ MT5Connection)
+            
+        Returns:
+            Dict[int, Dict] - ผลลัพธ์แยกตาม ticket
+        """
+        if not self.mt5_connection or not positions:
+            return {}
+        return self.mt5_connection.calculate_positions_profit_with_spread(positions=positions, tick=tick)
+    
     def _calculate_group_profit(self, positions: List[Any]) -> float:
         """คำนวณกำไรรวมของกลุ่ม"""
         try:
@@ -12,6 +12,9 @@ import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 
+from mt5_connection import MT5_SIMULATED
+from position_status_manager import PositionStatusCode
+
 # GUI แบบง่าย - ไม่มี enhanced widgets
 
 logger = logging.getLogger(__name__)
@@ -873,12 +876,19 @@ class TradingGUI:
         """อัพเดทข้อมูลใน GUI (เรียกจาก safe_update_gui_data)"""
         self.safe_update_gui_data()
         
+    def _show_connected_status(self):
+        """แสดงสถานะเชื่อมต่อ (แยกโหมดจำลองให้เห็นชัด)"""
+        if MT5_SIMULATED:
+            self.connection_status.config(text="Connected (SIMULATOR)", fg='orange')
+        else:
+            self.connection_status.config(text="Connected", fg='green')
+        
     def update_connection_status_light(self):
         """อัพเดทสถานะการเชื่อมต่อแบบเบา"""
         try:
             # ใช้ตัวแปรแทนการเรียกฟังก์ชัน
             if self.mt5_connection.is_connected:
-                self.connection_status.config(text="Connected", fg='green')
+                self._show_connected_status()
                 self.connect_btn.config(text="Disconnect", command=self.disconnect_mt5)
             else:
                 self.connection_status.config(text="Disconnected", fg='red')
@@ -928,7 +938,7 @@ class TradingGUI:
         """อัพเดทสถานะการเชื่อมต่อ"""
         try:
             if self.mt5_connection.check_connection_health():
-                self.connection_status.config(text="Connected", fg='green')
+                self._show_connected_status()
                 self.connect_btn.config(text="Disconnect", command=self.disconnect_mt5)
             else:
                 self.connection_status.config(text="Disconnected", fg='red')
@@ -1911,9 +1921,11 @@ class TradingGUI:
                 return
             
             total_positions = len(status_results)
-            hg_count = sum(1 for s in status_results.values() if 'HG' in s.status)
-            guard_count = sum(1 for s in status_results.values() if 'Support Guard' in s.status)
-            protected_count = sum(1 for s in status_results.values() if 'Protected' in s.status)
+            # HG รวมไม้ Protected (มี HG ค้ำแล้ว)
+            hg_count = sum(1 for s in status_results.values()
+                           if s.code in (PositionStatusCode.HEDGE_GUARD, PositionStatusCode.PROTECTED))
+            guard_count = sum(1 for s in status_results.values() if s.code == PositionStatusCode.SUPPORT_GUARD)
+            protected_count = sum(1 for s in status_results.values() if s.code == PositionStatusCode.PROTECTED)
             
             # อัพเดท labels
             self.status_info_labels['total_positions'].config(text=f"Total: {total_positions}")
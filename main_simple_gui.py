@@ -44,7 +44,7 @@ from smart_entry_system import SmartEntrySystem
 # 🚫 REMOVED: from portfolio_anchor import PortfolioAnchor
 
 # 🚀 REAL-TIME STATUS TRACKING SYSTEMS
-from position_status_manager import PositionStatusManager
+from position_status_manager import PositionStatusManager, PositionStatusCode
 from real_time_tracker import RealTimeTracker
 from market_condition_detector import MarketConditionDetector
 
@@ -361,6 +361,12 @@ class AdaptiveTradingSystemGUI:
                     time.sleep(1)
                     continue
                 
+                # 📸 ซิงค์พอร์ตจาก MT5 ครั้งเดียวต่อรอบ - worker อื่นอ่านจาก snapshot นี้
+                self.portfolio_manager.publish_portfolio_snapshot(
+                    self.mt5_connection.get_account_info(),
+                    current_price=getattr(current_candle, 'close', 0.0)
+                )
+                
                 # 🕐 Log market status (every 5 minutes)
                 if not hasattr(self, '_last_market_status_log'):
                     self._last_market_status_log = 0
@@ -1429,6 +1435,10 @@ class AdaptiveTradingSystemGUI:
     def _get_portfolio_state(self) -> PortfolioState:
         """Get current portfolio state"""
         try:
+            snapshot = self.portfolio_manager.get_portfolio_snapshot()
+            if snapshot is not None:
+                return snapshot.state
+            
             positions = self.order_manager.active_positions
             account_info = self.mt5_connection.get_account_info() if self.mt5_connection else {}
             
@@ -1494,8 +1504,11 @@ class AdaptiveTradingSystemGUI:
             if not self.dynamic_position_modifier:
                 return
             
-            account_info = self.mt5_connection.get_account_info()
-            positions = self.order_manager.active_positions
+            snapshot = self.portfolio_manager.get_portfolio_snapshot()
+            if snapshot is None:
+                return
+            account_info = dict(snapshot.account_info)
+            positions = list(snapshot.positions)
             
             if not positions:
                 return
@@ -1629,9 +1642,10 @@ class AdaptiveTradingSystemGUI:
                                 nearest_resistance = min(zones['resistance'], key=lambda x: abs(x['price'] - current_price))
                                 logger.info(f"📉 Nearest Resistance: {nearest_resistance['price']:.2f} (Distance: {abs(current_price - nearest_resistance['price']):.2f})")
                             
-                            # ดึงข้อมูลพอร์ต
-                            positions = self.mt5_connection.get_positions()
-                            account_info = self.mt5_connection.get_account_info()
+                            # ดึงข้อมูลพอร์ตจาก snapshot ของรอบนี้ (ไม่ซิงค์ MT5 ซ้ำ)
+                            snapshot = self.portfolio_manager.get_portfolio_snapshot()
+                            positions = list(snapshot.positions) if snapshot else []
+                            account_info = dict(snapshot.account_info) if snapshot else {}
                             portfolio_profit = sum(getattr(pos, 'profit', 0) for pos in positions) if positions else 0
                             
                             # 1. Smart Entry System
@@ -1721,8 +1735,14 @@ class AdaptiveTradingSystemGUI:
             logger.info("กำลังปิดระบบเทรด...")
             self.stop_trading()
             
+            # หยุด Real-time Tracker และรอ thread จบ
+            if self.real_time_tracker:
+                self.real_time_tracker.stop_monitoring(timeout=5.0)
+            
             if self.mt5_connection:
                 self.mt5_connection.disconnect_mt5()
+                # หยุด MT5 I/O thread หลังคำสั่งที่ค้างในคิวเสร็จ
+                self.mt5_connection.io_executor.stop()
                 
             logger.info("✅ ปิดระบบเรียบร้อยแล้ว")
             
@@ -1805,8 +1825,9 @@ class AdaptiveTradingSystemGUI:
             # ดึงสภาวะตลาดปัจจุบัน
             market_condition = self.market_detector.get_current_condition()
             
-            # ดึง Position ทั้งหมด
-            positions = self.order_manager.get_positions()
+            # ดึง Position ทั้งหมดจาก snapshot ล่าสุด
+            snapshot = self.portfolio_manager.get_portfolio_snapshot()
+            positions = list(snapshot.positions) if snapshot else []
             if not positions:
                 return
             
@@ -1857,7 +1878,9 @@ class AdaptiveTradingSystemGUI:
         try:
             special_count = 0
             for ticket, status_obj in status_results.items():
-                if 'HG' in status_obj.status or 'Support Guard' in status_obj.status:
+                # สถานะพิเศษ: HG, Support Guard และ Protected (มี HG ค้ำแล้ว)
+                if status_obj.code in (PositionStatusCode.HEDGE_GUARD, PositionStatusCode.SUPPORT_GUARD,
+                                       PositionStatusCode.PROTECTED):
                     special_count += 1
                     if special_count <= 3:  # Log เฉพาะ 3 ไม้แรก
                         logger.info(f"🎯 [SPECIAL STATUS] #{ticket}: {status_obj.status}")
@@ -1903,7 +1926,8 @@ class AdaptiveTradingSystemGUI:
                 'total_support_zones': sum(stats['support'] for stats in self.zone_stats.values()),
                 'total_resistance_zones': sum(stats['resistance'] for stats in self.zone_stats.values()),
                 'timeframes': self.timeframes,
-                'adaptive_mode': getattr(self.zone_analyzer, 'enable_adaptive_mode', False) if self.zone_analyzer else False
+                'adaptive_mode': getattr(self.zone_analyzer, 'enable_adaptive_mode', False) if self.zone_analyzer else False,
+                'execution_quality': self.portfolio_manager.get_execution_quality()
             }
             return status
             
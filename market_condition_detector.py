@@ -10,7 +10,6 @@ import numpy as np
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from collections import deque
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +33,152 @@ class VolatilityLevel:
     zone_tolerance: float
     min_zone_strength: float
 
+class RingSeries:
+    """
+    ชุดตัวเลขล่าสุดแบบ ring buffer ขนาดคงที่ (จอง NumPy array ล่วงหน้า)
+    
+    แต่ละค่าถูกเขียนสองตำแหน่ง (i และ i + capacity) ค่าล่าสุด n ค่าจึงต่อเนื่องกันใน memory เสมอ
+    last(n) คืน view แบบอ่านอย่างเดียวโดยไม่ copy
+    """
+    
+    def __init__(self, capacity: int):
+        """
+        Args:
+            capacity: จำนวนค่าล่าสุดที่เก็บ
+        """
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=np.float64)
+        self._head = 0  # ตำแหน่งที่จะเขียนถัดไป
+        self._count = 0
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def append(self, value: float):
+        """เพิ่มค่า - เมื่อเต็มจะเขียนทับค่าเก่าสุด O(1)"""
+        self._data[self._head] = value
+        self._data[self._head + self.capacity] = value
+        self._head = (self._head + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+    
+    def last(self, n: Optional[int] = None) -> np.ndarray:
+        """
+        ค่าล่าสุด n ค่า (เก่า -> ใหม่) เป็น view ไม่ copy - ค่าจะเปลี่ยนเมื่อมีการ append ถัดไป
+        
+        Args:
+            n: จำนวนค่า (None = ทั้งหมด)
+        """
+        n = self._count if n is None else max(0, min(n, self._count))
+        end = self._head + self.capacity
+        view = self._data[end - n:end]
+        view.flags.writeable = False
+        return view
+    
+    def back(self, n: int) -> float:
+        """
+        ค่าลำดับที่ n นับจากค่าล่าสุด (1 = ค่าล่าสุด) เป็น float O(1)
+        
+        Args:
+            n: ลำดับจากค่าล่าสุด (1..len)
+        """
+        if not 1 <= n <= self._count:
+            raise IndexError(n)
+        return float(self._data[self._head + self.capacity - n])
+    
+    def clear(self):
+        """ล้างข้อมูล"""
+        self._head = 0
+        self._count = 0
+
+class RollingWindowStats:
+    """
+    สถิติของค่าล่าสุดในหน้าต่างขนาด window อัพเดท O(1) ต่อค่าใหม่
+    
+    - mean / M2 แบบ Welford (หน้าต่างเลื่อน: เพิ่มค่าใหม่และเอาค่าเก่าออกในขั้นเดียว)
+    - ผลรวม sum_y / sum_xy สำหรับ linear regression โดย x = 0..n-1 ของหน้าต่าง
+    ค่าเก็บแบบหักด้วย anchor (ค่าล่าสุดตอน rebuild) เพื่อลดขนาดตัวเลขและความคลาดเคลื่อนสะสม
+    """
+    
+    def __init__(self, window: int):
+        """
+        Args:
+            window: ขนาดหน้าต่าง (จำนวนค่าล่าสุด)
+        """
+        self.window = window
+        self.rebuild(np.empty(0))
+    
+    def rebuild(self, values: np.ndarray):
+        """คำนวณใหม่ทั้งหมดจากค่าล่าสุดในหน้าต่าง (ใช้ตอนเริ่มและ re-sync เป็นระยะ) - O(window)"""
+        values = np.asarray(values, dtype=np.float64)[-self.window:] if self.window else np.empty(0)
+        self.anchor = float(values[-1]) if values.size else 0.0
+        relative = values - self.anchor
+        self.count = int(relative.size)
+        self.mean = float(relative.mean()) if self.count else 0.0
+        self.m2 = float(((relative - self.mean) ** 2).sum()) if self.count else 0.0
+        self.sum_y = float(relative.sum())
+        self.sum_xy = float(np.dot(np.arange(self.count, dtype=np.float64), relative))
+    
+    def push(self, value: float, evicted: Optional[float] = None):
+        """
+        เพิ่มค่าใหม่ O(1)
+        
+        Args:
+            value: ค่าใหม่
+            evicted: ค่าเก่าสุดที่หลุดจากหน้าต่าง (None = หน้าต่างยังไม่เต็ม)
+        """
+        value -= self.anchor
+        if evicted is None:
+            n = self.count + 1
+            delta = value - self.mean
+            self.mean += delta / n
+            self.m2 += delta * (value - self.mean)
+            self.sum_xy += self.count * value
+            self.sum_y += value
+            self.count = n
+        else:
+            evicted -= self.anchor
+            n = self.count
+            old_mean = self.mean
+            self.mean += (value - evicted) / n
+            self.m2 = max(0.0, self.m2 + (value - evicted) * (value - self.mean + evicted - old_mean))
+            # ค่าที่เหลือเลื่อน x ลง 1 ค่าใหม่อยู่ที่ x = n - 1
+            self.sum_xy += (n - 1) * value - (self.sum_y - evicted)
+            self.sum_y += value - evicted
+    
+    @property
+    def average(self) -> float:
+        """ค่าเฉลี่ยของหน้าต่าง"""
+        return self.mean + self.anchor
+    
+    @property
+    def std(self) -> float:
+        """ส่วนเบี่ยงเบนมาตรฐาน (population, เท่ากับ np.std)"""
+        return float(np.sqrt(self.m2 / self.count)) if self.count else 0.0
+    
+    def _centered_sums(self) -> Tuple[float, float]:
+        """(Σ(x - x̄)², Σ(x - x̄)(y - ȳ)) ของหน้าต่าง"""
+        n = self.count
+        sxx = n * (n * n - 1) / 12.0
+        cxy = self.sum_xy - (n - 1) / 2.0 * self.sum_y
+        return sxx, cxy
+    
+    @property
+    def slope(self) -> float:
+        """ความชันของ linear regression (เท่ากับ np.polyfit(x, y, 1)[0])"""
+        if self.count < 2:
+            return 0.0
+        sxx, cxy = self._centered_sums()
+        return cxy / sxx
+    
+    @property
+    def r_squared(self) -> float:
+        """R² ของ linear regression"""
+        if self.count < 2 or self.m2 <= 0:
+            return 0.0
+        sxx, cxy = self._centered_sums()
+        return float(min(1.0, cxy * cxy / (sxx * self.m2)))
+
 class MarketConditionDetector:
     """ตรวจจับสภาวะตลาดแบบ Real-time"""
     
@@ -48,10 +193,11 @@ class MarketConditionDetector:
             parameters={}
         )
         
-        # 📊 Data Storage
-        self.price_history = deque(maxlen=1000)  # เก็บราคา 1000 ครั้งล่าสุด
-        self.volume_history = deque(maxlen=1000)
-        self.volatility_history = deque(maxlen=100)
+        # 📊 Data Storage (ring buffer - อ่านช่วงล่าสุดเป็น view ไม่ copy)
+        self.price_history = RingSeries(1000)  # เก็บราคา 1000 ครั้งล่าสุด
+        self.price_timestamps = RingSeries(1000)
+        self.volume_history = RingSeries(1000)
+        self.volatility_history = RingSeries(100)
         
         # 🎯 Volatility Levels
         self.volatility_levels = {
@@ -67,6 +213,14 @@ class MarketConditionDetector:
         
         # 📈 Trend Detection
         self.trend_periods = [5, 10, 20, 50]  # ระยะเวลาสำหรับการวิเคราะห์เทรนด์
+        self.volatility_window = 50  # จำนวนราคาล่าสุดสำหรับความผันผวน
+        
+        # สถิติ rolling ต่อขนาดหน้าต่าง (slope / R² / Welford variance) - อัพเดท O(1) ทุกราคาใหม่
+        self.window_stats: Dict[int, RollingWindowStats] = {}
+        self.stats_resync_interval = 1000  # คำนวณใหม่จาก ring buffer ทุก N ราคา (จำกัดความคลาดเคลื่อนสะสม)
+        self._updates_since_resync = 0
+        for window in self.trend_periods + [self.volatility_window]:
+            self._get_window_stats(window)
         self.trend_thresholds = {
             'strong': 0.7,
             'medium': 0.5,
@@ -88,19 +242,24 @@ class MarketConditionDetector:
             if timestamp is None:
                 timestamp = time.time()
             
+            # อัพเดทสถิติ rolling (ค่าเก่าสุดที่หลุดจากหน้าต่างอ่านก่อน append)
+            price = float(price)
+            history_length = len(self.price_history)
+            for window, stats in self.window_stats.items():
+                evicted = self.price_history.back(window) if history_length >= window else None
+                stats.push(price, evicted)
+            
             # เก็บข้อมูลราคา
-            self.price_history.append({
-                'price': price,
-                'volume': volume,
-                'timestamp': timestamp
-            })
+            self.price_history.append(price)
+            self.price_timestamps.append(timestamp)
+            
+            self._updates_since_resync += 1
+            if self._updates_since_resync >= self.stats_resync_interval:
+                self._resync_window_stats()
             
             # เก็บข้อมูล Volume
             if volume > 0:
-                self.volume_history.append({
-                    'volume': volume,
-                    'timestamp': timestamp
-                })
+                self.volume_history.append(volume)
             
             # ตรวจสอบว่าต้องวิเคราะห์ใหม่หรือไม่
             if timestamp - self.last_analysis_time >= self.analysis_interval:
@@ -119,14 +278,14 @@ class MarketConditionDetector:
                 logger.debug("📊 [ANALYSIS] Insufficient data for analysis")
                 return
             
-            # วิเคราะห์ความผันผวน
+            # วิเคราะห์ความผันผวน (ครั้งเดียวต่อรอบ)
             volatility_level = self._detect_volatility_level()
             
             # วิเคราะห์ทิศทางเทรนด์
             trend_direction = self._detect_trend_direction()
             
             # วิเคราะห์ความแข็งแกร่ง
-            strength = self._calculate_market_strength()
+            strength = self._calculate_market_strength(volatility_level)
             
             # วิเคราะห์ความเชื่อมั่น
             confidence = self._calculate_confidence()
@@ -166,21 +325,38 @@ class MarketConditionDetector:
         except Exception as e:
             logger.error(f"❌ Error analyzing market condition: {e}")
     
+    def _get_window_stats(self, window: int) -> RollingWindowStats:
+        """
+        สถิติ rolling ของหน้าต่าง (สร้างจาก ring buffer ถ้ายังไม่มี เช่น เมื่อเปลี่ยน trend_periods)
+        
+        หน้าต่างถูกจำกัดไม่เกินความจุของ price_history - ค่าที่เก่ากว่านั้นไม่มีให้เอาออกจากหน้าต่าง
+        """
+        window = max(1, min(window, self.price_history.capacity))
+        stats = self.window_stats.get(window)
+        if stats is None:
+            stats = RollingWindowStats(window)
+            stats.rebuild(self.price_history.last(window))
+            self.window_stats[window] = stats
+        return stats
+    
+    def _resync_window_stats(self):
+        """คำนวณสถิติ rolling ใหม่จาก ring buffer - O(ผลรวมขนาดหน้าต่าง) ทุก stats_resync_interval ราคา"""
+        for window, stats in self.window_stats.items():
+            stats.rebuild(self.price_history.last(window))
+        self._updates_since_resync = 0
+    
     def _detect_volatility_level(self) -> float:
         """ตรวจจับระดับความผันผวน"""
         try:
             if len(self.price_history) < 10:
                 return 0.01
             
-            # คำนวณ Standard Deviation ของราคา
-            prices = [item['price'] for item in list(self.price_history)[-50:]]  # 50 ข้อมูลล่าสุด
-            volatility = np.std(prices) / np.mean(prices)
+            # Standard Deviation / ค่าเฉลี่ย ของราคาล่าสุด (จากสถิติ rolling)
+            stats = self._get_window_stats(self.volatility_window)
+            volatility = stats.std / stats.average
             
             # เก็บประวัติความผันผวน
-            self.volatility_history.append({
-                'volatility': volatility,
-                'timestamp': time.time()
-            })
+            self.volatility_history.append(volatility)
             
             return volatility
             
@@ -223,18 +399,14 @@ class MarketConditionDetector:
     def _calculate_trend_score(self, period: int) -> float:
         """คำนวณคะแนนเทรนด์"""
         try:
-            recent_prices = [item['price'] for item in list(self.price_history)[-period:]]
-            
-            # คำนวณ Linear Regression
-            x = np.arange(len(recent_prices))
-            y = np.array(recent_prices)
-            
-            # คำนวณ slope
-            slope = np.polyfit(x, y, 1)[0]
+            # Linear Regression จากสถิติ rolling (ตรงกับ np.polyfit บนราคาล่าสุด period ค่า)
+            stats = self._get_window_stats(period)
             
             # แปลงเป็นคะแนน -1 ถึง 1
-            max_slope = np.std(y) * 0.1  # 10% ของ standard deviation
-            trend_score = np.clip(slope / max_slope, -1, 1)
+            max_slope = stats.std * 0.1  # 10% ของ standard deviation
+            if max_slope <= abs(stats.average) * 1e-12:
+                return 0.0  # ราคาคงที่ - ไม่มีเทรนด์
+            trend_score = float(np.clip(stats.slope / max_slope, -1, 1))
             
             return trend_score
             
@@ -242,14 +414,20 @@ class MarketConditionDetector:
             logger.error(f"❌ Error calculating trend score: {e}")
             return 0.0
     
-    def _calculate_market_strength(self) -> float:
-        """คำนวณความแข็งแกร่งของตลาด"""
+    def _calculate_market_strength(self, volatility: Optional[float] = None) -> float:
+        """
+        คำนวณความแข็งแกร่งของตลาด
+        
+        Args:
+            volatility: ความผันผวนของรอบนี้ (None = คำนวณใหม่)
+        """
         try:
             if len(self.price_history) < 10:
                 return 0.5
             
             # คำนวณจากความผันผวนและเทรนด์
-            volatility = self._detect_volatility_level()
+            if volatility is None:
+                volatility = self._detect_volatility_level()
             trend_score = abs(self._calculate_trend_score(20))
             
             # รวมคะแนน (0-1)
@@ -273,7 +451,7 @@ class MarketConditionDetector:
                 return data_confidence * 0.5
             
             # คำนวณความสอดคล้องของความผันผวน
-            recent_volatilities = [item['volatility'] for item in list(self.volatility_history)[-5:]]
+            recent_volatilities = self.volatility_history.last(5)
             volatility_consistency = 1.0 - (np.std(recent_volatilities) / np.mean(recent_volatilities))
             volatility_consistency = np.clip(volatility_consistency, 0, 1)
             
@@ -314,9 +492,9 @@ class MarketConditionDetector:
             
             # ตรวจสอบ Volume Spike
             if len(self.volume_history) >= 10:
-                recent_volumes = [item['volume'] for item in list(self.volume_history)[-10:]]
+                recent_volumes = self.volume_history.last(10)
                 avg_volume = np.mean(recent_volumes[:-1])  # ยกเว้นข้อมูลล่าสุด
-                current_volume = recent_volumes[-1]
+                current_volume = float(recent_volumes[-1])
                 
                 if avg_volume > 0 and current_volume > avg_volume * self.volume_spike_threshold:
                     events.append({
@@ -329,16 +507,17 @@ class MarketConditionDetector:
             
             # ตรวจสอบ Price Jump
             if len(self.price_history) >= 5:
-                recent_prices = [item['price'] for item in list(self.price_history)[-5:]]
-                price_change = abs(recent_prices[-1] - recent_prices[-2]) / recent_prices[-2]
+                recent_prices = self.price_history.last(5)
+                current_price, previous_price = float(recent_prices[-1]), float(recent_prices[-2])
+                price_change = abs(current_price - previous_price) / previous_price
                 
                 if price_change > self.price_jump_threshold:
                     events.append({
                         'type': 'price_jump',
                         'severity': 'high',
                         'price_change': price_change,
-                        'current_price': recent_prices[-1],
-                        'previous_price': recent_prices[-2]
+                        'current_price': current_price,
+                        'previous_price': previous_price
                     })
             
             return events
@@ -485,10 +664,31 @@ class MarketConditionDetector:
     def clear_history(self):
         """ล้างประวัติข้อมูล"""
         self.price_history.clear()
+        self.price_timestamps.clear()
         self.volume_history.clear()
         self.volatility_history.clear()
+        self._resync_window_stats()
         logger.info("🧹 [HISTORY] Cleared all market data history")
     
+    def get_trend_statistics(self) -> Dict[int, Dict[str, float]]:
+        """
+        สถิติ rolling ล่าสุดต่อช่วงเทรนด์
+        
+        Returns:
+            Dict: period -> slope, r_squared, std, mean, count
+        """
+        return {
+            period: {
+                'slope': stats.slope,
+                'r_squared': stats.r_squared,
+                'std': stats.std,
+                'mean': stats.average,
+                'count': stats.count
+            }
+            for period in self.trend_periods
+            for stats in (self._get_window_stats(period),)
+        }
+    
     def get_data_summary(self) -> Dict[str, Any]:
         """ดึงสรุปข้อมูล"""
         return {
@@ -4,22 +4,272 @@ MT5 Connection Module
 โมดูลสำหรับการเชื่อมต่อและจัดการ MetaTrader 5
 """
 
+import itertools
 import logging
+import os
+import queue
+import threading
 import time
-from typing import Optional, Dict, List, Any
+from collections import OrderedDict, deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Optional, Dict, List, Any, Tuple, Callable
 from datetime import datetime, timedelta
 
-# Safe import for MT5
-try:
-    import MetaTrader5 as mt5
-    MT5_AVAILABLE = True
-except ImportError:
-    print("WARNING: MetaTrader5 not available - running in simulation mode")
-    mt5 = None
-    MT5_AVAILABLE = False
+import numpy as np
+
+# Safe import for MT5 (ใช้ fake_mt5 เฉพาะเมื่อกำหนด MT5_SIMULATOR=1 เท่านั้น)
+_mt5_module = None
+MT5_SIMULATED = os.environ.get('MT5_SIMULATOR', '') == '1'
+if MT5_SIMULATED:
+    try:
+        import fake_mt5 as _mt5_module
+        print("WARNING: MT5_SIMULATOR=1 - using simulated MT5 terminal (orders are not real)")
+    except ImportError:
+        print("WARNING: fake_mt5 simulator not available")
+else:
+    try:
+        import MetaTrader5 as _mt5_module
+    except ImportError:
+        print("WARNING: MetaTrader5 not available - running in simulation mode")
+MT5_AVAILABLE = _mt5_module is not None
 
 logger = logging.getLogger(__name__)
 
+_USE_DEFAULT_TIMEOUT = object()
+
+class MT5IOExecutor:
+    """
+    Thread เดียวสำหรับเรียก MT5 Terminal ทั้งหมด
+    
+    แพ็กเกจ MetaTrader5 ไม่รองรับการเรียกพร้อมกันจากหลาย thread จึงส่งทุกคำสั่ง
+    เข้าคิว priority ให้ thread นี้ทำทีละคำสั่ง - คำสั่งเทรดได้คิวก่อนการดึงข้อมูลวิเคราะห์
+    """
+    
+    PRIORITY_TRADE = 0      # order_send / order_check
+    PRIORITY_NORMAL = 1     # account, positions, symbol, tick
+    PRIORITY_ANALYTICS = 2  # copy_rates_*, history
+    
+    def __init__(self, name: str = "MT5-IO", wait_sample_size: int = 1000):
+        self.name = name
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        
+        # Deadline เริ่มต้นต่อ priority (วินาที) - คำสั่งเทรดรอจนกว่าจะได้ผล
+        self.default_timeouts = {
+            self.PRIORITY_TRADE: None,
+            self.PRIORITY_NORMAL: 30.0,
+            self.PRIORITY_ANALYTICS: 30.0
+        }
+        
+        # 📊 สถิติคิว
+        self.submitted_count = 0
+        self.completed_count = 0
+        self.failed_count = 0
+        self.expired_count = 0
+        self.max_queue_depth = 0
+        self._wait_samples = {
+            priority: deque(maxlen=wait_sample_size)
+            for priority in self.default_timeouts
+        }
+    
+    def is_io_thread(self) -> bool:
+        """ตรวจสอบว่า thread ปัจจุบันคือ I/O thread หรือไม่"""
+        return threading.current_thread() is self._thread
+    
+    def _ensure_started(self):
+        """เริ่ม I/O thread เมื่อมีคำสั่งแรก (หรือเริ่มใหม่หลัง stop)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._worker, name=self.name, daemon=True)
+                self._thread.start()
+    
+    def submit(self, fn: Callable, args: tuple = (), kwargs: Optional[Dict] = None,
+               priority: int = PRIORITY_NORMAL, timeout: Any = _USE_DEFAULT_TIMEOUT) -> Future:
+        """
+        ส่งคำสั่งเข้าคิว
+        
+        Args:
+            fn: ฟังก์ชัน MT5 ที่จะเรียก
+            args: arguments ของฟังก์ชัน
+            kwargs: keyword arguments ของฟังก์ชัน
+            priority: ลำดับความสำคัญ (ค่าน้อย = ทำก่อน)
+            timeout: deadline (วินาที) - ถ้าถึงคิวช้ากว่านี้จะไม่ถูกเรียกและได้ TimeoutError
+            
+        Returns:
+            Future: ผลลัพธ์ของคำสั่ง
+        """
+        kwargs = kwargs or {}
+        future = Future()
+        
+        # เรียกจาก I/O thread เอง (nested call) - ทำทันทีเพื่อไม่ให้ deadlock
+        if self.is_io_thread():
+            future.set_running_or_notify_cancel()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        
+        if timeout is _USE_DEFAULT_TIMEOUT:
+            timeout = self.default_timeouts.get(priority)
+        
+        now = time.monotonic()
+        deadline = now + timeout if timeout is not None else None
+        
+        self._ensure_started()
+        self._queue.put((priority, next(self._sequence), now, deadline, fn, args, kwargs, future))
+        
+        with self._stats_lock:
+            self.submitted_count += 1
+            depth = self._queue.qsize()
+            if depth > self.max_queue_depth:
+                self.max_queue_depth = depth
+        
+        return future
+    
+    def call(self, fn: Callable, args: tuple = (), kwargs: Optional[Dict] = None,
+             priority: int = PRIORITY_NORMAL, timeout: Any = _USE_DEFAULT_TIMEOUT) -> Any:
+        """
+        ส่งคำสั่งเข้าคิวแล้วรอผลลัพธ์
+        
+        Raises:
+            TimeoutError: ถ้ารอเกิน deadline
+        """
+        if timeout is _USE_DEFAULT_TIMEOUT:
+            timeout = self.default_timeouts.get(priority)
+        
+        future = self.submit(fn, args, kwargs, priority=priority, timeout=timeout)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            raise TimeoutError(f"MT5 call {getattr(fn, '__name__', fn)} exceeded {timeout}s deadline")
+    
+    def _worker(self):
+        """Loop ของ I/O thread - ทำคำสั่งทีละรายการตาม priority"""
+        while True:
+            priority, _, enqueued_at, deadline, fn, args, kwargs, future = self._queue.get()
+            
+            if fn is None:  # stop sentinel
+                break
+            
+            if not future.set_running_or_notify_cancel():
+                continue
+            
+            started_at = time.monotonic()
+            with self._stats_lock:
+                self._wait_samples[priority].append(started_at - enqueued_at)
+            
+            if deadline is not None and started_at > deadline:
+                with self._stats_lock:
+                    self.expired_count += 1
+                future.set_exception(TimeoutError(
+                    f"MT5 call {getattr(fn, '__name__', fn)} expired after "
+                    f"{started_at - enqueued_at:.3f}s in queue"
+                ))
+                continue
+            
+            try:
+                future.set_result(fn(*args, **kwargs))
+                with self._stats_lock:
+                    self.completed_count += 1
+            except Exception as e:
+                with self._stats_lock:
+                    self.failed_count += 1
+                future.set_exception(e)
+    
+    def stop(self, timeout: float = 5.0) -> bool:
+        """
+        หยุด I/O thread หลังทำคำสั่งที่ค้างในคิวเสร็จ
+        
+        Returns:
+            bool: True ถ้า thread หยุดภายในเวลาที่กำหนด
+        """
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return True
+        
+        # sentinel มี priority ต่ำสุด จึงถูกหยิบหลังคำสั่งที่ค้างอยู่ทั้งหมด
+        self._queue.put((float('inf'), next(self._sequence), time.monotonic(), None, None, (), {}, None))
+        thread.join(timeout)
+        return not thread.is_alive()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """สถิติคิว: ความลึก, จำนวนคำสั่ง และเวลารอคิวต่อ priority (ms)"""
+        with self._stats_lock:
+            wait_times = {}
+            for priority, samples in self._wait_samples.items():
+                ordered = sorted(samples)
+                count = len(ordered)
+                wait_times[priority] = {
+                    'samples': count,
+                    'avg_ms': (sum(ordered) / count) * 1000 if count else 0.0,
+                    'p95_ms': ordered[min(count - 1, int(count * 0.95))] * 1000 if count else 0.0,
+                    'max_ms': ordered[-1] * 1000 if count else 0.0
+                }
+            
+            return {
+                'running': self._thread is not None and self._thread.is_alive(),
+                'queue_depth': self._queue.qsize(),
+                'max_queue_depth': self.max_queue_depth,
+                'submitted': self.submitted_count,
+                'completed': self.completed_count,
+                'failed': self.failed_count,
+                'expired': self.expired_count,
+                'wait_times': wait_times
+            }
+
+# ลำดับความสำคัญของฟังก์ชัน MT5 (ฟังก์ชันที่ไม่อยู่ในรายการใช้ PRIORITY_NORMAL)
+MT5_CALL_PRIORITIES = {
+    'order_send': MT5IOExecutor.PRIORITY_TRADE,
+    'order_check': MT5IOExecutor.PRIORITY_TRADE,
+    'copy_rates_from': MT5IOExecutor.PRIORITY_ANALYTICS,
+    'copy_rates_from_pos': MT5IOExecutor.PRIORITY_ANALYTICS,
+    'copy_rates_range': MT5IOExecutor.PRIORITY_ANALYTICS,
+    'copy_ticks_from': MT5IOExecutor.PRIORITY_ANALYTICS,
+    'copy_ticks_range': MT5IOExecutor.PRIORITY_ANALYTICS,
+    'history_deals_get': MT5IOExecutor.PRIORITY_ANALYTICS,
+    'history_orders_get': MT5IOExecutor.PRIORITY_ANALYTICS
+}
+
+class SerializedMT5:
+    """
+    ห่อโมดูล MetaTrader5 ให้ทุกฟังก์ชันถูกเรียกผ่าน MT5IOExecutor
+    
+    ค่าคงที่ (เช่น mt5.ORDER_TYPE_BUY) อ่านตรงจากโมดูล ส่วนฟังก์ชันถูกส่งเข้าคิว
+    ตาม MT5_CALL_PRIORITIES ผู้เรียกจึงใช้งานได้เหมือนโมดูลเดิม
+    """
+    
+    def __init__(self, module: Any, executor: MT5IOExecutor):
+        self._module = module
+        self._executor = executor
+        self._wrapped = {}
+    
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._module, name)
+        if not callable(attr):
+            return attr
+        
+        wrapped = self._wrapped.get(name)
+        if wrapped is None:
+            priority = MT5_CALL_PRIORITIES.get(name, MT5IOExecutor.PRIORITY_NORMAL)
+            executor = self._executor
+            
+            def wrapped(*args, **kwargs):
+                return executor.call(attr, args, kwargs, priority=priority)
+            
+            wrapped.__name__ = name
+            self._wrapped[name] = wrapped
+        return wrapped
+
+# I/O thread เดียวต่อ process (MT5 terminal เป็น global ของ process)
+mt5_io_executor = MT5IOExecutor()
+mt5 = SerializedMT5(_mt5_module, mt5_io_executor) if MT5_AVAILABLE else None
+
 class MT5Connection:
     """คลาสสำหรับจัดการการเชื่อมต่อ MT5"""
     
@@ -40,13 +290,29 @@ class MT5Connection:
             'overlap_london_ny': {'open': '13:00', 'close': '17:00', 'timezone': 'UTC+0'}
         }
         self.last_market_status = None
-        self.market_status_cache = {}
+        # 🚀 Market Status Cache: LRU จำกัดขนาด (symbol -> (เวลา, trade_allowed, trade_session))
+        self.market_status_cache = OrderedDict()
+        self.market_status_cache_size = 16
+        self.market_status_ttl = 60.0  # วินาที (เท่ากับ cache 1 นาทีเดิม)
+        self._market_status_lock = threading.Lock()
+        # ตาราง session ที่คำนวณไว้ล่วงหน้า - คำนวณใหม่เมื่อผ่านขอบเวลาเปิด/ปิดถัดไปเท่านั้น
+        self._session_schedule = None
         
         # 🚀 Performance Optimization - Caching
-        self.tick_cache = {}  # Cache สำหรับ tick data
+        self.default_symbol = None  # สัญลักษณ์ที่ตรวจพบจากโบรกเกอร์ (ตั้งโดย auto_detect_gold_symbol)
+        self.tick_cache = OrderedDict()  # Cache สำหรับ tick data (เรียงตามเวลาที่อัพเดท เก่าสุดอยู่หน้า)
         self.tick_cache_time = {}  # เวลาของ cache
         self.cache_duration = 0.5  # Cache duration ในวินาที
         self.max_cache_size = 10  # จำกัดขนาด cache เพื่อประหยัด memory
+        self.tick_cache_hits = 0
+        self.tick_cache_misses = 0
+        
+        # 📏 Stops level cache สำหรับตรวจ SL/TP (symbol -> (เวลา, spec))
+        self.symbol_stops_cache = {}
+        self.symbol_stops_ttl = 300.0  # วินาที - stops level แทบไม่เปลี่ยนระหว่างวัน
+        
+        # 🚀 MT5 I/O: ทุกคำสั่งไปยัง terminal ผ่าน thread เดียว
+        self.io_executor = mt5_io_executor
         
     def connect_mt5(self, max_retries: int = 3, retry_delay: float = 2.0) -> bool:
         """
@@ -80,6 +346,8 @@ class MT5Connection:
                     logger.info(f"เชื่อมต่อ MT5 สำเร็จ - Terminal: {self.terminal_info.name}")
                     logger.info(f"Account: {self.account_info.login}, Balance: {self.account_info.balance}")
                     logger.info(f"โหลดสัญลักษณ์ได้ {len(self.broker_symbols)} รายการ")
+                    if MT5_SIMULATED:
+                        logger.warning("⚠️ SIMULATED MT5 terminal (MT5_SIMULATOR=1) - orders are not sent to a broker")
                     return True
                     
                 else:
@@ -416,6 +684,26 @@ class MT5Connection:
             
         return []
         
+    def get_positions_snapshot(self) -> Optional[tuple]:
+        """
+        ดึง Position จาก MT5 เป็น record ดิบ (ไม่แปลงเป็น dict) สำหรับ sync แบบ diff
+        
+        Returns:
+            tuple: record ของ Position (ว่างถ้าไม่มี) หรือ None ถ้าดึงข้อมูลไม่ได้
+        """
+        if not MT5_AVAILABLE or not self.is_connected:
+            return None
+            
+        try:
+            positions = mt5.positions_get()
+            if positions is None:
+                logger.warning(f"⚠️ positions_get failed: {mt5.last_error()}")
+                return None
+            return positions
+        except Exception as e:
+            logger.error(f"เกิดข้อผิดพลาดในการดึงรายการ Position: {e}")
+            return None
+        
     def place_order(self, symbol: str, order_type: int, volume: float, 
                    price: float = 0, sl: float = 0, tp: float = 0, 
                    comment: str = "", magic: int = 0) -> Optional[Dict]:
@@ -520,15 +808,20 @@ class MT5Connection:
                     logger.error("❌ ไม่สามารถเชื่อมต่อ MT5 ใหม่ได้")
                     return None
             
-            # ส่ง order
+            # ส่ง order (จับเวลาตั้งแต่ส่งจนได้ผลจาก terminal)
+            request_time = time.time()
+            started = time.perf_counter()
             result = mt5.order_send(request)
+            latency_ms = (time.perf_counter() - started) * 1000
             
             if result is None:
                 last_error = mt5.last_error()
                 logger.error(f"❌ ส่ง Order ไม่สำเร็จ: {last_error}")
                 return None
             else:
-                logger.info(f"📋 Result: RetCode={result.retcode}")
+                logger.info(f"📋 Result: RetCode={result.retcode} ({latency_ms:.1f}ms)")
+                execution = self._build_execution_info(symbol, order_type, price, result,
+                                                       request_time, latency_ms, 0)
                 if result.retcode == 10009:
                     logger.info(f"✅ สำเร็จ! Deal: {result.deal}, Order: {result.order}")
                     return {
@@ -541,14 +834,16 @@ class MT5Connection:
                         'ask': result.ask,
                         'comment': result.comment,
                         'request_id': result.request_id,
-                        'retcode_external': result.retcode_external
+                        'retcode_external': result.retcode_external,
+                        'execution': execution
                     }
                 else:
                     error_desc = self._get_retcode_description(result.retcode)
                     logger.error(f"❌ ไม่สำเร็จ: RetCode {result.retcode} - {error_desc}")
                     return {
                         'retcode': result.retcode,
-                        'error_description': error_desc
+                        'error_description': error_desc,
+                        'execution': execution
                     }
                 
         except Exception as e:
@@ -556,6 +851,200 @@ class MT5Connection:
             
         return None
         
+    def get_symbol_stops(self, symbol: str) -> Optional[Dict[str, float]]:
+        """
+        ดึง stops level / freeze level ของสัญลักษณ์จาก cache (หมดอายุตาม symbol_stops_ttl)
+        
+        Args:
+            symbol: สัญลักษณ์การเทรด
+            
+        Returns:
+            Dict: point, digits, stops_level, freeze_level และ min_distance (หน่วยราคา) หรือ None
+        """
+        now = time.time()
+        entry = self.symbol_stops_cache.get(symbol)
+        if entry is not None and now - entry[0] < self.symbol_stops_ttl:
+            return entry[1]
+        
+        symbol_info = mt5.symbol_info(symbol)
+        if symbol_info is None:
+            return None
+        
+        stops_level = getattr(symbol_info, 'trade_stops_level', 0) or 0
+        freeze_level = getattr(symbol_info, 'trade_freeze_level', 0) or 0
+        spec = {
+            'point': symbol_info.point,
+            'digits': symbol_info.digits,
+            'stops_level': stops_level,
+            'freeze_level': freeze_level,
+            'min_distance': max(stops_level, freeze_level) * symbol_info.point
+        }
+        self.symbol_stops_cache[symbol] = (now, spec)
+        return spec
+        
+    @staticmethod
+    def validate_sl_tp(position_type: int, sl: float, tp: float, bid: float, ask: float,
+                       min_distance: float) -> Optional[str]:
+        """
+        ตรวจ SL/TP เทียบกับราคาปัจจุบันและระยะขั้นต่ำ (ค่า 0 = ไม่ตั้ง)
+        
+        BUY เทียบกับ Bid, SELL เทียบกับ Ask ตามกฎของ MT5
+        
+        Returns:
+            str: เหตุผลที่ไม่ผ่าน หรือ None ถ้าผ่าน
+        """
+        if position_type == 0:  # BUY
+            if sl and sl > bid - min_distance:
+                return f"SL {sl} ต้องต่ำกว่า Bid {bid} อย่างน้อย {min_distance}"
+            if tp and tp < bid + min_distance:
+                return f"TP {tp} ต้องสูงกว่า Bid {bid} อย่างน้อย {min_distance}"
+        else:  # SELL
+            if sl and sl < ask + min_distance:
+                return f"SL {sl} ต้องสูงกว่า Ask {ask} อย่างน้อย {min_distance}"
+            if tp and tp > ask - min_distance:
+                return f"TP {tp} ต้องต่ำกว่า Ask {ask} อย่างน้อย {min_distance}"
+        return None
+        
+    def modify_positions_sl_tp(self, modifications: List[Dict]) -> Dict[int, Dict]:
+        """
+        แก้ไข SL/TP หลาย Position ด้วย TRADE_ACTION_SLTP ในรอบเดียว
+        
+        ทั้งชุดทำงานบน MT5 I/O thread ด้วย priority การเทรด จึงไม่มีคำสั่งอื่นแทรกระหว่างกลาง
+        ตรวจ SL/TP กับ stops level ที่ cache ไว้ก่อนส่ง - ไม้ที่ไม่ผ่านจะไม่ถูกส่งไปที่ terminal
+        
+        Args:
+            modifications: รายการ {'ticket', 'sl', 'tp'} (ใส่ 'symbol' / 'type' ได้ถ้ารู้อยู่แล้ว)
+            
+        Returns:
+            Dict[int, Dict]: ผลต่อ ticket - success, retcode, sl, tp, error_description
+        """
+        if not modifications:
+            return {}
+        
+        if not self.check_connection_health():
+            return {
+                item['ticket']: {'success': False, 'retcode': None, 'sl': item.get('sl', 0.0),
+                                 'tp': item.get('tp', 0.0), 'error_description': 'MT5 ไม่ได้เชื่อมต่อ'}
+                for item in modifications
+            }
+        
+        return self.io_executor.call(self._modify_sl_tp_burst, (modifications,),
+                                     priority=MT5IOExecutor.PRIORITY_TRADE)
+        
+    def _modify_sl_tp_burst(self, modifications: List[Dict]) -> Dict[int, Dict]:
+        """ส่ง TRADE_ACTION_SLTP ทีละ ticket (เรียกบน MT5 I/O thread)"""
+        results = {}
+        
+        # ดึงข้อมูลที่ยังไม่รู้ (symbol/type) จาก positions ครั้งเดียว
+        records = {}
+        if any('symbol' not in item or 'type' not in item for item in modifications):
+            positions = mt5.positions_get()
+            if positions:
+                records = {pos.ticket: pos for pos in positions}
+        
+        ticks = {}
+        for item in modifications:
+            ticket = item['ticket']
+            sl = float(item.get('sl', 0.0) or 0.0)
+            tp = float(item.get('tp', 0.0) or 0.0)
+            result = {'success': False, 'retcode': None, 'sl': sl, 'tp': tp, 'error_description': ''}
+            results[ticket] = result
+            
+            record = records.get(ticket)
+            symbol = item.get('symbol') or (record.symbol if record is not None else None)
+            position_type = item.get('type', record.type if record is not None else None)
+            if symbol is None or position_type is None:
+                result['retcode'] = 10039
+                result['error_description'] = self._get_retcode_description(10039)
+                continue
+            
+            stops = self.get_symbol_stops(symbol)
+            if symbol not in ticks:
+                ticks[symbol] = mt5.symbol_info_tick(symbol)
+            tick = ticks[symbol]
+            if stops is None or tick is None:
+                result['error_description'] = f'ไม่มีข้อมูลราคา/stops level ของ {symbol}'
+                continue
+            
+            # ปัดตาม digits ของสัญลักษณ์ก่อนตรวจและส่ง
+            sl = round(sl, stops['digits'])
+            tp = round(tp, stops['digits'])
+            result['sl'], result['tp'] = sl, tp
+            
+            reason = self.validate_sl_tp(position_type, sl, tp, tick.bid, tick.ask, stops['min_distance'])
+            if reason is not None:
+                result['retcode'] = 10016
+                result['error_description'] = reason
+                continue
+            
+            request = {
+                "action": mt5.TRADE_ACTION_SLTP,
+                "position": ticket,
+                "symbol": symbol,
+                "sl": sl,
+                "tp": tp,
+            }
+            send_result = mt5.order_send(request)
+            if send_result is None:
+                result['error_description'] = f'order_send ไม่ตอบกลับ: {mt5.last_error()}'
+                continue
+            
+            result['retcode'] = send_result.retcode
+            # NO_CHANGES = SL/TP เป็นค่านี้อยู่แล้ว ถือว่าสำเร็จ
+            if send_result.retcode in (10009, 10025):
+                result['success'] = True
+            else:
+                result['error_description'] = self._get_retcode_description(send_result.retcode)
+        
+        succeeded = sum(1 for r in results.values() if r['success'])
+        logger.info(f"🎯 แก้ไข SL/TP: สำเร็จ {succeeded}/{len(results)} ไม้")
+        return results
+        
+    def _build_execution_info(self, symbol: str, order_type: int, requested_price: float,
+                              result: Any, request_time: float, latency_ms: float,
+                              retries: int) -> Dict[str, Any]:
+        """
+        สรุปเวลาและคุณภาพการ fill ของ order_send หนึ่งครั้ง
+        
+        Args:
+            symbol: สัญลักษณ์การเทรด
+            order_type: ORDER_TYPE_BUY (0) / ORDER_TYPE_SELL (1) ของคำสั่งที่ส่ง
+            requested_price: ราคาที่ขอ (0 = ใช้ราคาตลาดตอน execute)
+            result: ผลจาก mt5.order_send()
+            request_time: เวลา (epoch) ที่ส่งคำสั่ง
+            latency_ms: เวลาตั้งแต่ส่งจนได้ผล (ms)
+            retries: จำนวนครั้งที่ส่งซ้ำก่อนได้ผลนี้
+            
+        Returns:
+            Dict: request_time, response_time, latency_ms, requested_price, filled_price,
+                  slippage_points (บวก = เสียเปรียบ), retries, retcode
+        """
+        filled_price = result.price if result is not None and result.price else 0.0
+        if not requested_price and result is not None:
+            requested_price = result.ask if order_type == 0 else result.bid
+        
+        slippage_points = 0.0
+        if filled_price and requested_price:
+            stops = self.get_symbol_stops(symbol)
+            point = stops['point'] if stops else 0.0
+            if point:
+                if order_type == 0:  # BUY: fill สูงกว่าที่ขอ = เสียเปรียบ
+                    slippage_points = (filled_price - requested_price) / point
+                else:
+                    slippage_points = (requested_price - filled_price) / point
+        
+        return {
+            'symbol': symbol,
+            'request_time': request_time,
+            'response_time': request_time + latency_ms / 1000,
+            'latency_ms': latency_ms,
+            'requested_price': requested_price,
+            'filled_price': filled_price,
+            'slippage_points': round(slippage_points, 1),
+            'retries': retries,
+            'retcode': result.retcode if result is not None else None
+        }
+        
     def _get_retcode_description(self, retcode: int) -> str:
         """แปล retcode เป็นคำอธิบาย"""
         retcode_dict = {
@@ -649,64 +1138,108 @@ class MT5Connection:
             if not position:
                 logger.warning(f"⚠️ Position {ticket} not found in MT5")
                 return None
-                
-            pos = position[0]
             
-            # ดึงข้อมูล symbol
-            symbol_info = mt5.symbol_info(pos.symbol)
-            if not symbol_info:
-                logger.warning(f"⚠️ Symbol info not found for {pos.symbol}")
+            results = self.calculate_positions_profit_with_spread(positions=position)
+            if ticket not in results:
+                logger.warning(f"⚠️ Current tick not found for {position[0].symbol}")
                 return None
+            return results[ticket]
             
-            # คำนวณ spread
-            current_tick = mt5.symbol_info_tick(pos.symbol)
-            if not current_tick:
-                logger.warning(f"⚠️ Current tick not found for {pos.symbol}")
-                return None
-                
-            spread_points = current_tick.ask - current_tick.bid
-            spread_pct = (spread_points / pos.price_open) * 100
-            
-            # คำนวณราคาปิดจริง (รวม spread)
-            if pos.type == mt5.POSITION_TYPE_BUY:
-                close_price = current_tick.bid  # BUY ปิดด้วย Bid
-            else:
-                close_price = current_tick.ask  # SELL ปิดด้วย Ask
-            
-            # คำนวณกำไรจริง (รวม spread)
-            if pos.type == mt5.POSITION_TYPE_BUY:
-                price_diff = close_price - pos.price_open
-            else:
-                price_diff = pos.price_open - close_price
-            
-            # คำนวณกำไรเป็นเงิน
-            if 'XAU' in pos.symbol.upper() or 'GOLD' in pos.symbol.upper():
-                profit_usd = price_diff * pos.volume * 100  # XAUUSD: 100 oz per lot
-            else:
-                profit_usd = price_diff * pos.volume * 100000  # Forex: 100,000 units per lot
+        except Exception as e:
+            logger.error(f"เกิดข้อผิดพลาดในการคำนวณกำไร Position {ticket}: {e}")
+            return None
+    
+    def calculate_positions_profit_with_spread(self, tickets: Optional[List[int]] = None,
+                                               positions: Optional[List[Any]] = None,
+                                               tick: Optional[Any] = None) -> Dict[int, Dict]:
+        """
+        คำนวณกำไรจริงรวม spread ของหลาย Position พร้อมกัน (vectorized)
+        
+        ใช้ positions_get ครั้งเดียว (หรือ snapshot ที่ส่งมา) และ tick ครั้งเดียวต่อ symbol
+        แทนการเรียก MT5 3 ครั้งต่อ ticket
+        
+        Args:
+            tickets: รายการ ticket ที่ต้องการ (None = ทุก Position ใน snapshot)
+            positions: snapshot ของ Position (Position object, dict หรือ record จาก MT5)
+                       ถ้าไม่ส่งมาจะดึงจาก MT5 ครั้งเดียว
+            tick: tick ที่จะใช้คำนวณ (dict หรือ record ที่มี bid/ask)
+                  ถ้าไม่ส่งมาจะดึงจาก tick cache ตาม symbol
             
-            # คำนวณกำไรเป็นเปอร์เซ็นต์ (ตาม lot size)
-            position_value = pos.volume * pos.price_open * 100  # สำหรับ XAUUSD
-            profit_percentage = (profit_usd / position_value) * 100 if position_value > 0 else 0
+        Returns:
+            Dict[int, Dict]: ผลลัพธ์แยกตาม ticket (รูปแบบเดียวกับ calculate_position_profit_with_spread)
+        """
+        try:
+            if positions is None:
+                positions = mt5.positions_get() or ()
+            
+            def field(pos, name, default=None):
+                return pos.get(name, default) if isinstance(pos, dict) else getattr(pos, name, default)
+            
+            wanted = set(tickets) if tickets is not None else None
+            selected = [pos for pos in positions if wanted is None or field(pos, 'ticket') in wanted]
+            if not selected:
+                return {}
+            
+            # แยกตาม symbol (ปกติมี symbol เดียว)
+            by_symbol = {}
+            for pos in selected:
+                by_symbol.setdefault(field(pos, 'symbol', ''), []).append(pos)
+            
+            results = {}
+            for symbol, group in by_symbol.items():
+                if tick is not None:
+                    bid, ask = field(tick, 'bid'), field(tick, 'ask')
+                else:
+                    symbol_tick = self.get_current_tick(symbol)
+                    if not symbol_tick:
+                        logger.warning(f"⚠️ Current tick not found for {symbol}")
+                        continue
+                    bid, ask = symbol_tick['bid'], symbol_tick['ask']
+                
+                tickets_arr = [field(pos, 'ticket') for pos in group]
+                is_buy = np.array([field(pos, 'type') == 0 for pos in group])
+                volume = np.array([field(pos, 'volume', 0.0) for pos in group], dtype=np.float64)
+                price_open = np.array([field(pos, 'price_open', 0.0) for pos in group], dtype=np.float64)
+                current_profit = [field(pos, 'profit', 0.0) for pos in group]
+                
+                spread_points = ask - bid
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    spread_pct = np.where(price_open != 0, (spread_points / price_open) * 100, 0.0)
+                
+                # ราคาปิดจริง (รวม spread): BUY ปิดด้วย Bid, SELL ปิดด้วย Ask
+                close_price = np.where(is_buy, bid, ask)
+                price_diff = np.where(is_buy, close_price - price_open, price_open - close_price)
+                
+                # XAUUSD: 100 oz per lot, Forex: 100,000 units per lot
+                contract_size = 100 if ('XAU' in symbol.upper() or 'GOLD' in symbol.upper()) else 100000
+                profit_usd = price_diff * volume * contract_size
+                
+                position_value = volume * price_open * 100  # สำหรับ XAUUSD
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    profit_percentage = np.where(position_value > 0, (profit_usd / position_value) * 100, 0.0)
+                should_close = profit_percentage > (spread_pct * 0.3)  # ปิดเมื่อกำไร > 30% ของ spread
+                
+                for i, ticket in enumerate(tickets_arr):
+                    results[ticket] = {
+                        'ticket': ticket,
+                        'symbol': symbol,
+                        'type': 'BUY' if is_buy[i] else 'SELL',
+                        'volume': float(volume[i]),
+                        'open_price': float(price_open[i]),
+                        'close_price': float(close_price[i]),
+                        'current_profit': current_profit[i],  # กำไรจาก MT5
+                        'calculated_profit': float(profit_usd[i]),  # กำไรที่คำนวณ
+                        'profit_percentage': float(profit_percentage[i]),
+                        'spread_points': spread_points,
+                        'spread_percentage': float(spread_pct[i]),
+                        'should_close': bool(should_close[i])
+                    }
             
-            return {
-                'ticket': ticket,
-                'symbol': pos.symbol,
-                'type': 'BUY' if pos.type == 0 else 'SELL',
-                'volume': pos.volume,
-                'open_price': pos.price_open,
-                'close_price': close_price,
-                'current_profit': pos.profit,  # กำไรจาก MT5
-                'calculated_profit': profit_usd,  # กำไรที่คำนวณ
-                'profit_percentage': profit_percentage,
-                'spread_points': spread_points,
-                'spread_percentage': spread_pct,
-                'should_close': profit_percentage > (spread_pct * 0.3)  # ปิดเมื่อกำไร > 30% ของ spread
-            }
+            return results
             
         except Exception as e:
-            logger.error(f"เกิดข้อผิดพลาดในการคำนวณกำไร Position {ticket}: {e}")
-            return None
+            logger.error(f"เกิดข้อผิดพลาดในการคำนวณกำไรแบบกลุ่ม: {e}")
+            return {}
 
         
     def _load_broker_symbols(self):
@@ -809,6 +1342,7 @@ class MT5Connection:
             for symbol in gold_symbols:
                 if preferred.upper() in symbol.upper():
                     logger.info(f"✅ ตรวจพบสัญลักษณ์ทองคำที่เหมาะสม: {symbol}")
+                    self.default_symbol = symbol
                     return symbol
         
         # ถ้าไม่มีที่ตรงกับ preferred ให้ใช้ตัวแรก
@@ -816,6 +1350,7 @@ class MT5Connection:
         logger.info(f"✅ ใช้สัญลักษณ์ทองคำ: {selected}")
         logger.info(f"💡 สัญลักษณ์ทองคำทั้งหมด: {', '.join(gold_symbols)}")
         
+        self.default_symbol = selected
         return selected
         
     def _detect_filling_type(self, symbol: str) -> int:
@@ -865,38 +1400,39 @@ class MT5Connection:
         logger.warning(f"ไม่สามารถตรวจสอบ filling type สำหรับ {symbol} ใช้ RETURN เป็นค่าเริ่มต้น")
         return mt5.ORDER_FILLING_RETURN
     
+    def _resolve_symbol(self, symbol: Optional[str]) -> str:
+        """แปลง symbol ที่ไม่ระบุเป็นสัญลักษณ์ทองคำที่ตรวจพบจากโบรกเกอร์"""
+        if symbol:
+            return symbol
+        if self.default_symbol:
+            return self.default_symbol
+        # ยังไม่ได้ตรวจหา - ลองหาจากรายการสัญลักษณ์ที่โหลดไว้ แล้วค่อยใช้ XAUUSD
+        self.default_symbol = self.find_symbol("XAUUSD") if self.broker_symbols else None
+        return self.default_symbol or "XAUUSD"
+    
     def get_current_price(self, symbol: str = None) -> Optional[float]:
-        """ดึงราคาปัจจุบัน (Bid) สำหรับ Smart Entry System"""
-        try:
-            if symbol is None:
-                # ใช้ XAUUSD เป็น default
-                symbol = "XAUUSD"
-            
-            tick = mt5.symbol_info_tick(symbol)
-            if tick:
-                logger.debug(f"💰 [TICK] {symbol}: Bid={tick.bid:.5f}, Ask={tick.ask:.5f}")
-                return tick.bid
-            else:
-                logger.warning(f"⚠️ No tick data for {symbol}")
-                return None
-            
-        except Exception as e:
-            logger.error(f"❌ Error getting current price for {symbol}: {e}")
-            return None
+        """ดึงราคาปัจจุบัน (Bid) สำหรับ Smart Entry System - ผ่าน tick cache"""
+        tick_data = self.get_current_tick(symbol)
+        if tick_data:
+            return tick_data['bid']
+        logger.warning(f"⚠️ No tick data for {self._resolve_symbol(symbol)}")
+        return None
     
     def get_current_tick(self, symbol: str = None) -> Optional[Dict]:
         """ดึงข้อมูล tick ปัจจุบัน รวม spread - OPTIMIZED with Caching"""
         try:
-            if symbol is None:
-                symbol = self.default_symbol
+            symbol = self._resolve_symbol(symbol)
             
             # 🚀 OPTIMIZED: Check cache first
             current_time = time.time()
-            if (symbol in self.tick_cache and 
-                symbol in self.tick_cache_time and 
-                current_time - self.tick_cache_time[symbol] < self.cache_duration):
-                return self.tick_cache[symbol]
-            
+            cache_time = self.tick_cache_time.get(symbol)
+            if cache_time is not None and current_time - cache_time < self.cache_duration:
+                tick_data = self.tick_cache.get(symbol)
+                if tick_data is not None:
+                    self.tick_cache_hits += 1
+                    return tick_data
+            
+            self.tick_cache_misses += 1
             tick = mt5.symbol_info_tick(symbol)
             if tick:
                 spread_points = tick.ask - tick.bid
@@ -907,13 +1443,15 @@ class MT5Connection:
                     'spread': spread_points,
                     'time': tick.time
                 }
+                logger.debug(f"💰 [TICK] {symbol}: Bid={tick.bid:.5f}, Ask={tick.ask:.5f}")
                 
-                # 🚀 OPTIMIZED: Cache the result
+                # 🚀 OPTIMIZED: Cache the result (ย้ายไปท้ายสุด = ใหม่สุด)
                 self.tick_cache[symbol] = tick_data
+                self.tick_cache.move_to_end(symbol)
                 self.tick_cache_time[symbol] = current_time
                 
                 # 🚀 OPTIMIZED: Cleanup old cache entries
-                self._cleanup_cache()
+                self._cleanup_cache(current_time)
                 
                 return tick_data
             return None
@@ -922,30 +1460,41 @@ class MT5Connection:
             logger.error(f"❌ Error getting current tick for {symbol}: {e}")
             return None
     
-    def _cleanup_cache(self):
-        """Cleanup old cache entries to prevent memory leaks - OPTIMIZED"""
+    def get_tick_cache_stats(self) -> Dict[str, Any]:
+        """สถิติการใช้งาน tick cache"""
+        total = self.tick_cache_hits + self.tick_cache_misses
+        return {
+            'hits': self.tick_cache_hits,
+            'misses': self.tick_cache_misses,
+            'hit_rate': (self.tick_cache_hits / total) * 100 if total > 0 else 0.0,
+            'size': len(self.tick_cache),
+            'max_size': self.max_cache_size
+        }
+    
+    def get_io_stats(self) -> Dict[str, Any]:
+        """สถิติคิวคำสั่ง MT5 (ความลึกคิว, เวลารอ, คำสั่งที่หมดเวลา)"""
+        return self.io_executor.get_stats()
+    
+    def _cleanup_cache(self, current_time: float = None):
+        """
+        Cleanup old cache entries to prevent memory leaks - OPTIMIZED
+        
+        tick_cache เรียงตามเวลาอัพเดท จึงลบจากหัวแถวจนเจอรายการที่ยังไม่หมดอายุ
+        (amortized O(1) ต่อการเขียน cache)
+        """
         try:
-            current_time = time.time()
-            
-            # 🚀 OPTIMIZED: Remove expired cache entries
-            expired_symbols = []
-            for symbol, cache_time in self.tick_cache_time.items():
-                if current_time - cache_time > self.cache_duration * 2:  # 2x cache duration
-                    expired_symbols.append(symbol)
-            
-            for symbol in expired_symbols:
-                self.tick_cache.pop(symbol, None)
-                self.tick_cache_time.pop(symbol, None)
-            
-            # 🚀 OPTIMIZED: Limit cache size
-            if len(self.tick_cache) > self.max_cache_size:
-                # Remove oldest entries
-                sorted_symbols = sorted(self.tick_cache_time.items(), key=lambda x: x[1])
-                symbols_to_remove = sorted_symbols[:len(self.tick_cache) - self.max_cache_size]
-                
-                for symbol, _ in symbols_to_remove:
-                    self.tick_cache.pop(symbol, None)
-                    self.tick_cache_time.pop(symbol, None)
+            if current_time is None:
+                current_time = time.time()
+            expire_after = self.cache_duration * 2  # 2x cache duration
+            
+            while self.tick_cache:
+                oldest_symbol = next(iter(self.tick_cache))
+                oldest_time = self.tick_cache_time.get(oldest_symbol, 0.0)
+                if (len(self.tick_cache) <= self.max_cache_size and 
+                    current_time - oldest_time <= expire_after):
+                    break
+                self.tick_cache.pop(oldest_symbol, None)
+                self.tick_cache_time.pop(oldest_symbol, None)
                     
         except Exception as e:
             logger.debug(f"Error during cache cleanup: {e}")
@@ -1018,6 +1567,7 @@ class MT5Connection:
         
         closed_tickets = []
         failed_tickets = []
+        executions = []
         total_profit = 0.0
         
         # 🚀 TRUE GROUP CLOSING: ปิดทั้งหมดพร้อมกัน
@@ -1029,6 +1579,7 @@ class MT5Connection:
                 closed_tickets = result.get('closed_tickets', [])
                 total_profit = result.get('total_profit', 0.0)
                 failed_tickets = result.get('failed_tickets', [])
+                executions = result.get('executions', [])
                 
                 logger.info(f"✅ TRUE GROUP CLOSE: {len(closed_tickets)}/{len(tickets)} positions closed")
                 logger.info(f"💰 Total Profit: ${total_profit:.2f}")
@@ -1041,6 +1592,8 @@ class MT5Connection:
                 for ticket in tickets:
                     try:
                         result = self._simple_close_legacy(ticket)
+                        if result and result.get('execution'):
+                            executions.append(dict(result['execution'], ticket=ticket))
                         if result and result.get('retcode') == 10009:
                             closed_tickets.append(ticket)
                             profit = result.get('profit', 0.0)
@@ -1068,6 +1621,7 @@ class MT5Connection:
             'rejected_tickets': [],  # Group closing handles rejections at business logic layer
             'failed_tickets': failed_tickets,
             'total_profit': total_profit,
+            'executions': executions,
             'message': message
         }
     
@@ -1076,8 +1630,6 @@ class MT5Connection:
         🚀 TRUE GROUP CLOSING: ปิดทั้งหมดพร้อมกันด้วย MT5 OrderSendMultiple
         """
         try:
-            import MetaTrader5 as mt5
-            
             if not mt5.initialize():
                 logger.error("❌ MT5 initialization failed")
                 return {'success': False, 'closed_tickets': [], 'failed_tickets': tickets, 'total_profit': 0.0}
@@ -1114,6 +1666,7 @@ class MT5Connection:
             
             closed_tickets = []
             failed_tickets = []
+            executions = []
             total_profit = 0.0
             
             # ปิดทีละตัวแต่เร็ว (concurrent execution)
@@ -1130,13 +1683,20 @@ class MT5Connection:
                         delay = 0.1 if attempt == 0 else 0.2
                         time.sleep(delay)
                         
+                        request_time = time.time()
+                        started = time.perf_counter()
                         result = mt5.order_send(request_data)
+                        latency_ms = (time.perf_counter() - started) * 1000
+                        execution = self._build_execution_info(
+                            request_data['symbol'], request_data['type'], request_data['price'],
+                            result, request_time, latency_ms, attempt
+                        )
                         if result and result.retcode == 10009:
                             # คำนวณกำไรจาก position ที่ปิด
                             position = mt5.positions_get(ticket=ticket)
                             profit = position[0].profit if position and len(position) > 0 else 0.0
                             logger.debug(f"✅ Order sent successfully: {ticket} (retcode: {result.retcode}, attempt: {attempt+1})")
-                            return {'ticket': ticket, 'success': True, 'profit': profit}
+                            return {'ticket': ticket, 'success': True, 'profit': profit, 'execution': execution}
                         else:
                             error_msg = result.comment if result else "No result"
                             retcode = result.retcode if result else 'None'
@@ -1147,7 +1707,7 @@ class MT5Connection:
                                 continue
                             else:
                                 logger.warning(f"❌ Order failed: {ticket} (retcode: {retcode}, error: {error_msg}, attempt: {attempt+1})")
-                                return {'ticket': ticket, 'success': False, 'profit': 0.0}
+                                return {'ticket': ticket, 'success': False, 'profit': 0.0, 'execution': execution}
                                 
                     except Exception as e:
                         if attempt < max_retries - 1:
@@ -1177,6 +1737,8 @@ class MT5Connection:
                 # Collect results with timeout
                 for future in as_completed(futures, timeout=30):
                     result = future.result()
+                    if result.get('execution'):
+                        executions.append(dict(result['execution'], ticket=result['ticket']))
                     if result['success']:
                         closed_tickets.append(result['ticket'])
                         total_profit += result['profit']
@@ -1192,7 +1754,8 @@ class MT5Connection:
                 'success': success,
                 'closed_tickets': closed_tickets,
                 'failed_tickets': failed_tickets,
-                'total_profit': total_profit
+                'total_profit': total_profit,
+                'executions': executions
             }
             
         except Exception as e:
@@ -1202,8 +1765,6 @@ class MT5Connection:
     def _simple_close_legacy(self, ticket: int) -> Optional[Dict]:
         """🚀 LEGACY SIMPLE CLOSE: Exactly like old system - no filling type"""
         try:
-            import MetaTrader5 as mt5
-            
             # ดึงข้อมูล Position
             position = mt5.positions_get(ticket=ticket)
             if not position:
@@ -1240,7 +1801,12 @@ class MT5Connection:
             }
             
             logger.info(f"🚀 LEGACY CLOSE: {ticket} (let broker choose filling type)")
+            request_time = time.time()
+            started = time.perf_counter()
             result = mt5.order_send(request)
+            latency_ms = (time.perf_counter() - started) * 1000
+            execution = self._build_execution_info(pos.symbol, order_type, price, result,
+                                                   request_time, latency_ms, 0)
             
             if result and result.retcode == 10009:  # TRADE_RETCODE_DONE
                 logger.info(f"✅ LEGACY SUCCESS: {ticket} closed")
@@ -1248,7 +1814,8 @@ class MT5Connection:
                     'retcode': result.retcode,
                     'ticket': ticket,
                     'profit': current_profit,
-                    'comment': 'Legacy close successful'
+                    'comment': 'Legacy close successful',
+                    'execution': execution
                 }
             else:
                 error_desc = self._get_retcode_description(result.retcode if result else 0)
@@ -1256,7 +1823,8 @@ class MT5Connection:
                 return {
                     'retcode': result.retcode if result else 0,
                     'comment': error_desc,
-                    'ticket': ticket
+                    'ticket': ticket,
+                    'execution': execution
                 }
                 
         except Exception as e:
@@ -1273,8 +1841,6 @@ class MT5Connection:
         ⚠️ Internal use only - part of group closing process
         """
         try:
-            import MetaTrader5 as mt5
-            
             # ดึงข้อมูล Position
             position = mt5.positions_get(ticket=ticket)
             if not position:
@@ -1358,18 +1924,13 @@ class MT5Connection:
                     'time_to_next_session': None
                 }
             
-            # ตรวจสอบจาก cache ก่อน (cache 1 นาที)
-            cache_key = f"{symbol}_{datetime.now().strftime('%Y%m%d%H%M')}"
-            if cache_key in self.market_status_cache:
-                return self.market_status_cache[cache_key]
-            
             # ตรวจสอบเวลาปัจจุบันก่อน
             current_time = datetime.now()
             current_utc = datetime.utcnow()
             
-            # ตรวจสอบสถานะตลาดจาก MT5
-            symbol_info = mt5.symbol_info(symbol)
-            if symbol_info is None:
+            # ตรวจสอบสถานะตลาดจาก MT5 (cache LRU ต่อ symbol)
+            trade_flags = self._get_symbol_trade_flags(symbol)
+            if trade_flags is None:
                 return {
                     'is_market_open': False,
                     'reason': f'Symbol {symbol} not found',
@@ -1383,60 +1944,16 @@ class MT5Connection:
                     'symbol': symbol,
                     'london_ny_overlap': False
                 }
+            is_trade_allowed, is_trade_session = trade_flags
             
-            # ตรวจสอบการซื้อขาย
-            is_trade_allowed = symbol_info.trade_mode == mt5.SYMBOL_TRADE_MODE_FULL
-            
-            # ตรวจสอบ session ปัจจุบันจาก MT5
-            try:
-                # ตรวจสอบว่า session ปัจจุบันสามารถเทรดได้หรือไม่
-                current_session = mt5.symbol_info_tick(symbol)
-                is_trade_session = current_session is not None and current_session.time > 0
-            except:
-                is_trade_session = True  # Default to True if can't check
-            
-            # ตรวจสอบแต่ละ session
-            active_sessions = []
+            # ดึง session จากตารางที่คำนวณไว้ล่วงหน้า
+            schedule = self._get_session_schedule(current_utc)
+            active_sessions = list(schedule['active_sessions'])
             next_session = None
-            min_time_to_next = float('inf')
-            
-            for session_name, session_info in self.market_sessions.items():
-                if session_name == 'overlap_london_ny':
-                    continue  # Skip overlap for now
-                    
-                session_open = self._parse_session_time(session_info['open'], current_utc)
-                session_close = self._parse_session_time(session_info['close'], current_utc)
-                
-                # ตรวจสอบว่า session เปิดอยู่หรือไม่
-                if self._is_session_active(session_open, session_close, current_utc):
-                    active_sessions.append({
-                        'name': session_name,
-                        'open': session_info['open'],
-                        'close': session_info['close'],
-                        'timezone': session_info['timezone']
-                    })
-                
-                # หา session ถัดไป
-                time_to_next = self._get_time_to_next_session(session_open, current_utc)
-                if time_to_next < min_time_to_next:
-                    min_time_to_next = time_to_next
-                    next_session = {
-                        'name': session_name,
-                        'open': session_info['open'],
-                        'timezone': session_info['timezone'],
-                        'time_to_open': time_to_next
-                    }
-            
-            # ตรวจสอบ London-NY Overlap
-            london_ny_overlap = self._check_london_ny_overlap(current_utc)
-            if london_ny_overlap:
-                active_sessions.append({
-                    'name': 'london_ny_overlap',
-                    'open': '13:00',
-                    'close': '17:00',
-                    'timezone': 'UTC+0',
-                    'description': 'High Volume Period'
-                })
+            time_to_next = None
+            if schedule['next_session'] is not None:
+                time_to_next = self._get_time_to_next_session(schedule['next_open'], current_utc)
+                next_session = dict(schedule['next_session'], time_to_open=time_to_next)
             
             # สรุปสถานะตลาด
             # ตลาดเปิดเมื่อ: trade allowed, trade session active, และมี active session
@@ -1449,16 +1966,13 @@ class MT5Connection:
                 'current_utc': current_utc.strftime('%H:%M:%S'),
                 'active_sessions': active_sessions,
                 'next_session': next_session,
-                'time_to_next_session': min_time_to_next if min_time_to_next != float('inf') else None,
+                'time_to_next_session': time_to_next,
                 'trade_allowed': is_trade_allowed,
                 'trade_session': is_trade_session,
                 'symbol': symbol,
-                'london_ny_overlap': london_ny_overlap
+                'london_ny_overlap': schedule['london_ny_overlap']
             }
             
-            # เก็บใน cache
-            self.market_status_cache[cache_key] = result
-            
             return result
             
         except Exception as e:
@@ -1479,6 +1993,116 @@ class MT5Connection:
                 'london_ny_overlap': False
             }
     
+    def _get_symbol_trade_flags(self, symbol: str) -> Optional[Tuple[bool, bool]]:
+        """
+        ดึงสถานะ trade_allowed / trade_session ของ symbol จาก cache LRU
+        
+        Cache มีขนาดจำกัด (market_status_cache_size) และหมดอายุตาม market_status_ttl
+        
+        Returns:
+            Tuple[bool, bool]: (trade_allowed, trade_session) หรือ None ถ้าไม่พบ symbol
+        """
+        now = time.time()
+        with self._market_status_lock:
+            entry = self.market_status_cache.get(symbol)
+            if entry is not None and now - entry[0] < self.market_status_ttl:
+                self.market_status_cache.move_to_end(symbol)
+                return entry[1], entry[2]
+        
+        symbol_info = mt5.symbol_info(symbol)
+        if symbol_info is None:
+            return None
+        
+        # ตรวจสอบการซื้อขาย
+        is_trade_allowed = symbol_info.trade_mode == mt5.SYMBOL_TRADE_MODE_FULL
+        
+        # ตรวจสอบ session ปัจจุบันจาก MT5
+        try:
+            current_session = mt5.symbol_info_tick(symbol)
+            is_trade_session = current_session is not None and current_session.time > 0
+        except Exception:
+            is_trade_session = True  # Default to True if can't check
+        
+        with self._market_status_lock:
+            self.market_status_cache[symbol] = (now, is_trade_allowed, is_trade_session)
+            self.market_status_cache.move_to_end(symbol)
+            while len(self.market_status_cache) > self.market_status_cache_size:
+                self.market_status_cache.popitem(last=False)
+        
+        return is_trade_allowed, is_trade_session
+    
+    def _get_session_schedule(self, current_utc: datetime) -> Dict[str, Any]:
+        """
+        ดึงตาราง session ที่คำนวณไว้ล่วงหน้า
+        
+        Session ที่เปิดอยู่และ session ถัดไปไม่เปลี่ยนจนกว่าจะถึงเวลาเปิด/ปิดถัดไป
+        จึงคำนวณใหม่เฉพาะเมื่อผ่านขอบเวลานั้น (valid_until)
+        
+        Args:
+            current_utc: เวลา UTC ปัจจุบัน
+            
+        Returns:
+            Dict: active_sessions, next_session, next_open, london_ny_overlap, valid_until
+        """
+        schedule = self._session_schedule
+        if (schedule is not None and 
+            schedule['built_at'] <= current_utc < schedule['valid_until']):
+            return schedule
+        
+        active_sessions = []
+        next_session = None
+        next_open = None
+        boundaries = []
+        
+        for session_name, session_info in self.market_sessions.items():
+            session_open = self._parse_session_time(session_info['open'], current_utc)
+            session_close = self._parse_session_time(session_info['close'], current_utc)
+            boundaries.append(session_open)
+            boundaries.append(session_close)
+            
+            if session_name == 'overlap_london_ny':
+                continue  # Overlap ตรวจแยกด้านล่าง
+            
+            # ตรวจสอบว่า session เปิดอยู่หรือไม่
+            if self._is_session_active(session_open, session_close, current_utc):
+                active_sessions.append({
+                    'name': session_name,
+                    'open': session_info['open'],
+                    'close': session_info['close'],
+                    'timezone': session_info['timezone']
+                })
+            
+            # หา session ถัดไป
+            if next_open is None or session_open < next_open:
+                next_open = session_open
+                next_session = {
+                    'name': session_name,
+                    'open': session_info['open'],
+                    'timezone': session_info['timezone']
+                }
+        
+        # ตรวจสอบ London-NY Overlap
+        london_ny_overlap = self._check_london_ny_overlap(current_utc)
+        if london_ny_overlap:
+            active_sessions.append({
+                'name': 'london_ny_overlap',
+                'open': '13:00',
+                'close': '17:00',
+                'timezone': 'UTC+0',
+                'description': 'High Volume Period'
+            })
+        
+        schedule = {
+            'built_at': current_utc,
+            'valid_until': min(boundaries) if boundaries else current_utc + timedelta(minutes=1),
+            'active_sessions': active_sessions,
+            'next_session': next_session,
+            'next_open': next_open,
+            'london_ny_overlap': london_ny_overlap
+        }
+        self._session_schedule = schedule
+        return schedule
+    
     def _parse_session_time(self, time_str: str, current_utc: datetime) -> datetime:
         """แปลงเวลาของ session เป็น datetime object"""
         try:
@@ -1535,8 +2159,16 @@ class MT5Connection:
             bool: True ถ้าตลาดเปิด, False ถ้าตลาดปิด
         """
         try:
-            market_status = self.get_market_status(symbol)
-            return market_status.get('is_market_open', False)
+            if not MT5_AVAILABLE or not self.is_connected:
+                return False
+            
+            # ไม่มี session เปิดอยู่ = ตลาดปิด (ไม่ต้องถาม MT5)
+            schedule = self._get_session_schedule(datetime.utcnow())
+            if not schedule['active_sessions']:
+                return False
+            
+            trade_flags = self._get_symbol_trade_flags(symbol)
+            return trade_flags is not None and trade_flags[0] and trade_flags[1]
         except Exception as e:
             logger.error(f"❌ Error checking if market is open: {e}")
             return False
@@ -1552,16 +2184,19 @@ class MT5Connection:
             Dict: ข้อมูลเวลาที่ตลาดจะเปิดครั้งถัดไป
         """
         try:
-            market_status = self.get_market_status(symbol)
-            next_session = market_status.get('next_session')
+            # ตอบจากตาราง session ที่คำนวณไว้ล่วงหน้า (ไม่ต้องถาม MT5)
+            current_utc = datetime.utcnow()
+            schedule = self._get_session_schedule(current_utc)
+            next_session = schedule['next_session']
             
             if next_session:
+                hours_until_open = self._get_time_to_next_session(schedule['next_open'], current_utc)
                 return {
                     'session_name': next_session['name'],
                     'open_time': next_session['open'],
                     'timezone': next_session['timezone'],
-                    'hours_until_open': next_session['time_to_open'],
-                    'minutes_until_open': next_session['time_to_open'] * 60
+                    'hours_until_open': hours_until_open,
+                    'minutes_until_open': hours_until_open * 60
                 }
             else:
                 return {
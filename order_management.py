@@ -5,15 +5,153 @@ Order Management Module
 """
 
 import logging
-from typing import Dict, List, Optional, Tuple, Any
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple, Any
 from datetime import datetime
 from dataclasses import dataclass
+import numpy as np
 from mt5_connection import MT5Connection
-from calculations import Position, PercentageCalculator, LotSizeCalculator, ProfitTargetCalculator
+from calculations import Position, LotSizeCalculator, ProfitTargetCalculator
 from trading_conditions import Signal
 
 logger = logging.getLogger(__name__)
 
+@dataclass
+class ExecutionRecord:
+    """เวลาและคุณภาพการ fill ของคำสั่งหนึ่งครั้ง (เปิดหรือปิด)"""
+    kind: str  # 'open' / 'close'
+    ticket: Optional[int]
+    symbol: str
+    request_time: float  # epoch วินาทีที่ส่งคำสั่ง
+    response_time: float  # epoch วินาทีที่ terminal ตอบกลับ
+    latency_ms: float
+    requested_price: float
+    filled_price: float
+    slippage_points: float  # บวก = เสียเปรียบ
+    retries: int = 0
+    retcode: Optional[int] = None
+    success: bool = False
+    
+    @classmethod
+    def from_execution_info(cls, kind: str, info: Dict, ticket: Optional[int] = None) -> 'ExecutionRecord':
+        """สร้างจาก dict 'execution' ที่ MT5Connection ส่งกลับมา"""
+        retcode = info.get('retcode')
+        return cls(
+            kind=kind,
+            ticket=info.get('ticket', ticket),
+            symbol=info.get('symbol', ''),
+            request_time=info.get('request_time', 0.0),
+            response_time=info.get('response_time', 0.0),
+            latency_ms=info.get('latency_ms', 0.0),
+            requested_price=info.get('requested_price', 0.0),
+            filled_price=info.get('filled_price', 0.0),
+            slippage_points=info.get('slippage_points', 0.0),
+            retries=info.get('retries', 0),
+            retcode=retcode,
+            success=retcode == 10009
+        )
+
+class ExecutionStats:
+    """
+    สถิติ latency / slippage ของคำสั่งเปิดและปิดแบบ rolling window
+    
+    เก็บ ExecutionRecord ล่าสุดต่อประเภท (deque จำกัดขนาด) และคำนวณ percentile เมื่อถูกเรียกดู
+    """
+    
+    KINDS = ('open', 'close')
+    
+    def __init__(self, window: int = 500):
+        """
+        Args:
+            window: จำนวนคำสั่งล่าสุดที่เก็บต่อประเภท
+        """
+        self.window = window
+        self._records = {kind: deque(maxlen=window) for kind in self.KINDS}
+        self._lock = threading.Lock()
+        self.record_callbacks = []  # callback(execution) หลังบันทึกแต่ละคำสั่ง
+    
+    def add_record_callback(self, callback: Callable):
+        """เพิ่ม callback ที่ถูกเรียกทุกครั้งที่บันทึก ExecutionRecord"""
+        self.record_callbacks.append(callback)
+    
+    def remove_record_callback(self, callback: Callable):
+        """ลบ callback"""
+        if callback in self.record_callbacks:
+            self.record_callbacks.remove(callback)
+    
+    def record(self, execution: ExecutionRecord):
+        """บันทึกผลคำสั่ง แล้วแจ้ง record_callbacks"""
+        with self._lock:
+            self._records.setdefault(execution.kind, deque(maxlen=self.window)).append(execution)
+        for callback in list(self.record_callbacks):
+            try:
+                callback(execution)
+            except Exception as e:
+                logger.error(f"❌ Error in execution record callback: {e}")
+    
+    def get_recent(self, kind: str, limit: int = 20) -> List[ExecutionRecord]:
+        """คำสั่งล่าสุด (ใหม่สุดอยู่ท้าย)"""
+        with self._lock:
+            records = list(self._records.get(kind, ()))
+        return records[-limit:]
+    
+    def get_summary(self, kind: Optional[str] = None) -> Dict[str, Any]:
+        """
+        สรุปสถิติ rolling
+        
+        Args:
+            kind: 'open' / 'close' หรือ None เพื่อสรุปทุกประเภท
+            
+        Returns:
+            Dict: count, success_rate, latency_ms (avg/p50/p95/p99/max),
+                  slippage_points (avg/p50/p95/max), avg_retries, retried_count
+                  (ถ้า kind เป็น None จะได้ dict แยกตามประเภท)
+        """
+        if kind is None:
+            return {k: self.get_summary(k) for k in self.KINDS}
+        
+        with self._lock:
+            records = list(self._records.get(kind, ()))
+        
+        count = len(records)
+        if count == 0:
+            return {'count': 0, 'success_rate': 0.0, 'latency_ms': {}, 'slippage_points': {},
+                    'avg_retries': 0.0, 'retried_count': 0}
+        
+        latency = np.fromiter((r.latency_ms for r in records), dtype=np.float64, count=count)
+        retries = np.fromiter((r.retries for r in records), dtype=np.float64, count=count)
+        # slippage นับเฉพาะคำสั่งที่ fill จริง
+        slippage = np.array([r.slippage_points for r in records if r.success and r.filled_price],
+                            dtype=np.float64)
+        successes = sum(1 for r in records if r.success)
+        
+        p50, p95, p99 = np.percentile(latency, [50, 95, 99])
+        summary = {
+            'count': count,
+            'success_rate': successes / count * 100,
+            'latency_ms': {
+                'avg': float(latency.mean()),
+                'p50': float(p50),
+                'p95': float(p95),
+                'p99': float(p99),
+                'max': float(latency.max())
+            },
+            'slippage_points': {},
+            'avg_retries': float(retries.mean()),
+            'retried_count': int(np.count_nonzero(retries))
+        }
+        if slippage.size:
+            s50, s95 = np.percentile(slippage, [50, 95])
+            summary['slippage_points'] = {
+                'avg': float(slippage.mean()),
+                'p50': float(s50),
+                'p95': float(s95),
+                'max': float(slippage.max())
+            }
+        return summary
+
 @dataclass
 class OrderResult:
     """คลาสสำหรับเก็บผลลัพธ์การส่ง Order"""
@@ -21,6 +159,7 @@ class OrderResult:
     ticket: Optional[int] = None
     error_message: str = ""
     order_details: Optional[Dict] = None
+    execution: Optional[ExecutionRecord] = None
 
 @dataclass
 class CloseResult:
@@ -30,6 +169,164 @@ class CloseResult:
     total_profit: float = 0.0
     error_message: str = ""
     close_details: Optional[Dict] = None
+    executions: Optional[List[ExecutionRecord]] = None
+
+def _position_field(pos: Any, name: str, default: Any = None) -> Any:
+    """อ่าน field จาก Position object หรือ dict"""
+    if isinstance(pos, dict):
+        return pos.get(name, default)
+    return getattr(pos, name, default)
+
+class PositionStore:
+    """
+    ที่เก็บ Position แบบ index ตาม ticket
+    
+    มี index รองตาม type และ symbol ทำให้ค้นหา เพิ่ม และลบได้ใน O(1)
+    version จะเพิ่มทุกครั้งที่ข้อมูลเปลี่ยน
+    
+    เพิ่ม/ลบได้จากหลาย thread (trading loop, smart systems worker) - การแก้ไขทั้งหมดอยู่ใต้ lock
+    ผู้อ่านที่วนลูปต้องใช้ as_list() / snapshot() (copy ครั้งเดียวใต้ lock) ไม่วนบน dict โดยตรง
+    """
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._by_ticket = {}  # ticket -> Position
+        self._by_type = {}    # type -> {ticket: Position}
+        self._by_symbol = {}  # symbol -> {ticket: Position}
+        self._list_cache = None
+        self._columns_cache = None  # (version, columns)
+        self.version = 0
+    
+    def __len__(self) -> int:
+        return len(self._by_ticket)
+    
+    def __contains__(self, ticket: int) -> bool:
+        return ticket in self._by_ticket
+    
+    def __iter__(self):
+        return iter(self.as_list())
+    
+    def _changed(self):
+        self._list_cache = None
+        self.version += 1
+    
+    def touch(self):
+        """แจ้งว่าค่าของ Position ถูกแก้ไขในที่ (ticket ไม่เปลี่ยน)"""
+        with self._lock:
+            self.version += 1
+    
+    def _index(self, ticket: int, position: Any):
+        self._by_type.setdefault(_position_field(position, 'type'), {})[ticket] = position
+        self._by_symbol.setdefault(_position_field(position, 'symbol'), {})[ticket] = position
+    
+    def _unindex(self, ticket: int, position: Any):
+        self._by_type.get(_position_field(position, 'type'), {}).pop(ticket, None)
+        self._by_symbol.get(_position_field(position, 'symbol'), {}).pop(ticket, None)
+    
+    def add(self, position: Any):
+        """เพิ่มหรือแทนที่ Position ตาม ticket"""
+        ticket = _position_field(position, 'ticket')
+        with self._lock:
+            existing = self._by_ticket.get(ticket)
+            if existing is not None:
+                self._unindex(ticket, existing)
+            self._by_ticket[ticket] = position
+            self._index(ticket, position)
+            self._changed()
+    
+    def remove(self, ticket: int) -> Optional[Any]:
+        """ลบ Position ตาม ticket (คืนค่า Position ที่ถูกลบ หรือ None)"""
+        with self._lock:
+            position = self._by_ticket.pop(ticket, None)
+            if position is not None:
+                self._unindex(ticket, position)
+                self._changed()
+        return position
+    
+    def get(self, ticket: int) -> Optional[Any]:
+        return self._by_ticket.get(ticket)
+    
+    def by_type(self, position_type: int) -> List[Any]:
+        with self._lock:
+            return list(self._by_type.get(position_type, {}).values())
+    
+    def by_symbol(self, symbol: str) -> List[Any]:
+        with self._lock:
+            return list(self._by_symbol.get(symbol, {}).values())
+    
+    def replace_all(self, positions: List[Any]):
+        """แทนที่ Position ทั้งหมด"""
+        with self._lock:
+            self._by_ticket = {}
+            self._by_type = {}
+            self._by_symbol = {}
+            for position in positions:
+                ticket = _position_field(position, 'ticket')
+                self._by_ticket[ticket] = position
+                self._index(ticket, position)
+            self._changed()
+    
+    def as_list(self) -> List[Any]:
+        """รายการ Position ทั้งหมด (list เดียวกันจนกว่าข้อมูลจะเปลี่ยน - ห้ามแก้ไข)"""
+        with self._lock:
+            if self._list_cache is None:
+                self._list_cache = list(self._by_ticket.values())
+            return self._list_cache
+    
+    def snapshot(self) -> Tuple[int, List[Any]]:
+        """
+        version และรายการ Position ที่อ่านพร้อมกันใต้ lock
+        
+        Returns:
+            Tuple: (version, รายการ Position - ห้ามแก้ไข)
+        """
+        with self._lock:
+            return self.version, self.as_list()
+    
+    def columns(self) -> Dict[str, np.ndarray]:
+        """
+        มุมมองแบบคอลัมน์ของ Position ทั้งหมดเป็น NumPy arrays (อ่านอย่างเดียว)
+        
+        สร้างใหม่เฉพาะเมื่อ version เปลี่ยน ลำดับแถวตรงกับ as_list()
+        
+        Returns:
+            Dict[str, np.ndarray]: ticket, type, volume, price_open, price_current,
+                                   profit, swap, time_open (epoch seconds, 0 = ไม่ทราบ)
+        """
+        version, positions = self.snapshot()
+        cached = self._columns_cache
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        count = len(positions)
+        columns = {
+            'ticket': np.empty(count, dtype=np.int64),
+            'type': np.empty(count, dtype=np.int8),
+            'volume': np.empty(count, dtype=np.float64),
+            'price_open': np.empty(count, dtype=np.float64),
+            'price_current': np.empty(count, dtype=np.float64),
+            'profit': np.empty(count, dtype=np.float64),
+            'swap': np.empty(count, dtype=np.float64),
+            'time_open': np.empty(count, dtype=np.float64)
+        }
+        for i, pos in enumerate(positions):
+            columns['ticket'][i] = _position_field(pos, 'ticket', 0)
+            columns['type'][i] = _position_field(pos, 'type', 0)
+            columns['volume'][i] = _position_field(pos, 'volume', 0.0)
+            columns['price_open'][i] = _position_field(pos, 'price_open', 0.0)
+            columns['price_current'][i] = _position_field(pos, 'price_current', 0.0)
+            columns['profit'][i] = _position_field(pos, 'profit', 0.0)
+            columns['swap'][i] = _position_field(pos, 'swap', 0.0)
+            time_open = _position_field(pos, 'time_open', None)
+            if isinstance(time_open, datetime):
+                time_open = time_open.timestamp()
+            columns['time_open'][i] = time_open or 0.0
+        
+        for array in columns.values():
+            array.flags.writeable = False
+        
+        self._columns_cache = (version, columns)
+        return columns
 
 class OrderManager:
     """คลาสสำหรับจัดการ Orders และ Positions"""
@@ -40,9 +337,60 @@ class OrderManager:
             mt5_connection: การเชื่อมต่อ MT5
         """
         self.mt5 = mt5_connection
-        self.active_positions = []
+        self.position_store = PositionStore()
         self.order_history = []
+        self.position_change_callbacks = []  # callback(change_type, position, timestamp)
+        self._aggregates_cache = None  # (store version, aggregates)
+        self.execution_stats = ExecutionStats()  # latency / slippage ของคำสั่งเปิด-ปิด
         self.magic_number = 123456  # Magic Number สำหรับระบุ Orders ของระบบ (เหมือน test file)
+    
+    def add_position_change_callback(self, callback: Callable):
+        """เพิ่ม callback เมื่อ Position ถูกเปิด ปิด หรือเปลี่ยนแปลง ('opened', 'closed', 'modified')"""
+        self.position_change_callbacks.append(callback)
+    
+    def remove_position_change_callback(self, callback: Callable):
+        """ลบ callback"""
+        if callback in self.position_change_callbacks:
+            self.position_change_callbacks.remove(callback)
+    
+    def _record_execution(self, kind: str, info: Optional[Dict],
+                          ticket: Optional[int] = None) -> Optional[ExecutionRecord]:
+        """แปลง dict 'execution' จาก MT5Connection เป็น ExecutionRecord และเก็บเข้า execution_stats"""
+        if not info:
+            return None
+        execution = ExecutionRecord.from_execution_info(kind, info, ticket)
+        self.execution_stats.record(execution)
+        return execution
+    
+    def get_execution_stats(self, kind: Optional[str] = None) -> Dict[str, Any]:
+        """
+        สถิติ latency / slippage แบบ rolling ของคำสั่งเปิดและปิด
+        
+        Args:
+            kind: 'open' / 'close' หรือ None เพื่อดูทุกประเภท
+            
+        Returns:
+            Dict: ผลจาก ExecutionStats.get_summary()
+        """
+        return self.execution_stats.get_summary(kind)
+    
+    def _trigger_position_change_callbacks(self, change_type: str, positions: List[Position], timestamp: float):
+        """เรียก callbacks สำหรับ Position ที่เปลี่ยน"""
+        for callback in self.position_change_callbacks:
+            for position in positions:
+                try:
+                    callback(change_type, position, timestamp)
+                except Exception as e:
+                    logger.error(f"❌ Error in position change callback: {e}")
+    
+    @property
+    def active_positions(self) -> List[Position]:
+        """รายการ Position ที่เปิดอยู่ (อ่านอย่างเดียว - แก้ไขผ่าน position_store)"""
+        return self.position_store.as_list()
+    
+    @active_positions.setter
+    def active_positions(self, positions: List[Position]):
+        self.position_store.replace_all(positions)
         
     def place_order_from_signal(self, signal: Signal, lot_size: float, 
                                account_balance: float) -> OrderResult:
@@ -72,7 +420,7 @@ class OrderManager:
                 )
                 
             # ตรวจสอบและปรับ lot size ให้ตรงกับ symbol
-            import MetaTrader5 as mt5
+            from mt5_connection import mt5
             mt5_symbol_info = mt5.symbol_info(signal.symbol)
             if mt5_symbol_info:
                 # ปรับ lot size ให้ตรงกับ volume_step
@@ -129,6 +477,7 @@ class OrderManager:
                 
             retcode = result.get('retcode')
             logger.info(f"📋 Order Response: RetCode={retcode}")
+            execution = self._record_execution('open', result.get('execution'))
             
             if retcode == 10009:  # TRADE_RETCODE_DONE
                 # บันทึกข้อมูล Order
@@ -137,6 +486,8 @@ class OrderManager:
                 
                 # ใช้ deal_id เป็น ticket หลัก
                 ticket = deal_id if deal_id > 0 else order_id
+                if execution is not None:
+                    execution.ticket = ticket
                 
                 position = Position(
                     ticket=ticket,
@@ -151,7 +502,7 @@ class OrderManager:
                     time_open=signal.timestamp
                 )
                 
-                self.active_positions.append(position)
+                self.position_store.add(position)
                 
                 logger.info(f"✅ OrderManager: Order sent successfully - Ticket: {ticket}")
                 logger.info(f"   📤 ส่งคำสั่งไปยัง MT5 ผ่าน mt5_connection.py")
@@ -166,7 +517,8 @@ class OrderManager:
                         'price': result.get('price', price),
                         'deal_id': deal_id,
                         'order_id': order_id
-                    }
+                    },
+                    execution=execution
                 )
             else:
                 # แสดง error พร้อมคำอธิบาย
@@ -178,7 +530,7 @@ class OrderManager:
                 logger.error(f"   Request: Symbol={signal.symbol}, Direction={signal.direction}, Volume={lot_size}")
                 logger.error(f"   Price={price}, Account Balance={account_balance:,.2f}")
                 
-                return OrderResult(success=False, error_message=error_msg)
+                return OrderResult(success=False, error_message=error_msg, execution=execution)
                 
         except Exception as e:
             error_msg = f"เกิดข้อผิดพลาดในการส่ง Order: {str(e)}"
@@ -237,12 +589,19 @@ class OrderManager:
             # ประมวลผลลัพธ์
             closed_tickets = group_result.get('closed_tickets', [])
             total_profit = group_result.get('total_profit', 0.0)
+            executions = [
+                self._record_execution('close', info)
+                for info in group_result.get('executions', [])
+            ]
             
             # อัพเดท active positions
-            self.active_positions = [
-                pos for pos in self.active_positions 
-                if (pos['ticket'] if isinstance(pos, dict) else getattr(pos, 'ticket', None)) not in closed_tickets
-            ]
+            removed = []
+            for ticket in closed_tickets:
+                position = self.position_store.remove(ticket)
+                if position is not None:
+                    removed.append(position)
+            if removed:
+                self._trigger_position_change_callbacks('closed', removed, time.time())
             
             if closed_tickets:
                 logger.info(f"✅ ปิด Position สำเร็จ: {len(closed_tickets)} ตัว - กำไร: ${total_profit:.2f}")
@@ -253,14 +612,16 @@ class OrderManager:
                     close_details={
                         'reason': reason,
                         'positions_count': len(closed_tickets)
-                    }
+                    },
+                    executions=executions
                 )
             else:
                 error_msg = group_result.get('error_message', 'ไม่สามารถปิด Position ได้')
                 return CloseResult(
                     success=False,
                     closed_tickets=[],
-                    error_message=error_msg
+                    error_message=error_msg,
+                    executions=executions
                 )
                 
         except Exception as e:
@@ -279,31 +640,84 @@ class OrderManager:
         
         Args:
             ticket: หมายเลข Position
-            new_sl: Stop Loss ใหม่
-            new_tp: Take Profit ใหม่
+            new_sl: Stop Loss ใหม่ (0 = ไม่ตั้ง)
+            new_tp: Take Profit ใหม่ (0 = ไม่ตั้ง)
             
         Returns:
             bool: สำเร็จหรือไม่
         """
-        try:
-            # หาข้อมูล Position
-            position = next((pos for pos in self.active_positions if (pos['ticket'] if isinstance(pos, dict) else getattr(pos, 'ticket', None)) == ticket), None)
-            if not position:
-                logger.error(f"ไม่พบ Position ticket {ticket}")
-                return False
-                
-            # ใช้ MT5 API สำหรับแก้ไข (ถ้ามี)
-            # สำหรับตอนนี้จะอัพเดทใน local data เท่านั้น
-            logger.info(f"แก้ไข Position {ticket} - SL: {new_sl}, TP: {new_tp}")
-            return True
+        result = self.modify_positions_sl_tp([{'ticket': ticket, 'sl': new_sl, 'tp': new_tp}])
+        return result.get(ticket, {}).get('success', False)
+        
+    def modify_positions_sl_tp(self, modifications: List[Dict]) -> Dict[int, Dict]:
+        """
+        แก้ไข SL/TP หลาย Position ในรอบเดียว (TRADE_ACTION_SLTP ผ่าน MT5 I/O thread)
+        
+        ไม้ที่แก้สำเร็จจะอัพเดท sl/tp ใน position_store และแจ้ง callback 'modified'
+        
+        Args:
+            modifications: รายการ {'ticket', 'sl', 'tp'}
             
+        Returns:
+            Dict[int, Dict]: ผลต่อ ticket - success, retcode, sl, tp, error_description
+        """
+        results = {}
+        requests = []
+        for item in modifications:
+            ticket = item['ticket']
+            position = self.position_store.get(ticket)
+            if position is None:
+                logger.error(f"ไม่พบ Position ticket {ticket}")
+                results[ticket] = {'success': False, 'retcode': None, 'sl': item.get('sl', 0.0),
+                                   'tp': item.get('tp', 0.0), 'error_description': 'ไม่พบ Position'}
+                continue
+            requests.append({
+                'ticket': ticket,
+                'sl': item.get('sl', 0.0),
+                'tp': item.get('tp', 0.0),
+                'symbol': position.symbol,
+                'type': position.type
+            })
+        
+        if not requests:
+            return results
+        
+        try:
+            results.update(self.mt5.modify_positions_sl_tp(requests))
         except Exception as e:
-            logger.error(f"เกิดข้อผิดพลาดในการแก้ไข Position {ticket}: {str(e)}")
-            return False
+            logger.error(f"เกิดข้อผิดพลาดในการแก้ไข SL/TP: {str(e)}")
+            for item in requests:
+                results[item['ticket']] = {'success': False, 'retcode': None, 'sl': item['sl'],
+                                           'tp': item['tp'], 'error_description': str(e)}
+            return results
+        
+        modified = []
+        for item in requests:
+            result = results.get(item['ticket'])
+            position = self.position_store.get(item['ticket'])
+            if result is None or position is None:
+                continue
+            if result['success']:
+                if position.sl != result['sl'] or position.tp != result['tp']:
+                    position.sl = result['sl']
+                    position.tp = result['tp']
+                    modified.append(position)
+            else:
+                logger.warning(f"⚠️ แก้ไข SL/TP ticket {item['ticket']} ไม่สำเร็จ: {result['error_description']}")
+        
+        if modified:
+            self.position_store.touch()
+            self._trigger_position_change_callbacks('modified', modified, time.time())
+        
+        return results
             
     def sync_positions_from_mt5(self) -> List[Position]:
         """
-        ซิงค์ข้อมูล Position จาก MT5
+        ซิงค์ข้อมูล Position จาก MT5 แบบ diff
+        
+        เทียบ snapshot จาก MT5 กับ position_store แล้วสร้าง อัพเดท หรือลบ
+        เฉพาะ ticket ที่เปลี่ยน พร้อมแจ้ง callback 'opened' / 'closed' / 'modified'
+        พอร์ตที่ไม่เปลี่ยนจะไม่สร้าง object ใหม่และไม่ log
         
         Returns:
             List[Position]: รายการ Position ปัจจุบัน
@@ -313,62 +727,65 @@ class OrderManager:
                 logger.error("ไม่สามารถเชื่อมต่อ MT5 เพื่อซิงค์ข้อมูล")
                 return self.active_positions
                 
-            # ดึงข้อมูล Position จาก MT5
-            mt5_positions = self.mt5.get_positions()
-            
-            # 🔍 DEBUG: Show all MT5 positions with magic numbers
-            logger.info(f"🔍 MT5 RAW POSITIONS: {len(mt5_positions)} total positions")
-            if mt5_positions:
-                magic_numbers = {}
-                for pos in mt5_positions[:5]:  # Show first 5
-                    magic = pos.get('magic', 'NO_MAGIC')
-                    ticket = pos.get('ticket', 'NO_TICKET')
-                    magic_numbers[magic] = magic_numbers.get(magic, 0) + 1
-                    logger.info(f"   Ticket {ticket}: Magic={magic}")
-                
-                logger.info(f"🔍 Magic Number Summary: {magic_numbers}")
-                logger.info(f"🔍 System Magic Number: {self.magic_number}")
-            
-            # 🚨 DIRECT BROKER ACCESS: ใช้ positions ทั้งหมดจากโบรกเกอร์
-            logger.info(f"💎 DIRECT BROKER ACCESS: Using ALL {len(mt5_positions)} positions from broker")
-            system_positions = mt5_positions  # ใช้ทั้งหมดโดยไม่กรอง Magic Number
-            
-            # # เดิม: กรองเฉพาะ Position ของระบบ (ตาม Magic Number) - DISABLED
-            # system_positions = [
-            #     pos for pos in mt5_positions 
-            #     if pos.get('magic') == self.magic_number
-            # ]
-            
-            # แปลงเป็น Position objects
-            synced_positions = []
-            for pos_data in system_positions:
-                position = Position(
-                    ticket=pos_data['ticket'],
-                    symbol=pos_data['symbol'],
-                    type=pos_data['type'],
-                    volume=pos_data['volume'],
-                    price_open=pos_data['price_open'],
-                    price_current=pos_data['price_current'],
-                    profit=pos_data['profit'],
-                    swap=pos_data.get('swap', 0.0),
-                    commission=pos_data.get('commission', 0.0),
-                    comment=pos_data.get('comment', ''),
-                    magic=pos_data.get('magic', 0),
-                    time_open=pos_data.get('time')
-                )
-                synced_positions.append(position)
-                
-            # อัพเดท active positions
-            self.active_positions = synced_positions
+            # 🚨 DIRECT BROKER ACCESS: ใช้ positions ทั้งหมดจากโบรกเกอร์ (ไม่กรอง Magic Number)
+            snapshot = self.mt5.get_positions_snapshot()
+            if snapshot is None:
+                logger.warning("⚠️ ดึง Position จาก MT5 ไม่ได้ - ใช้ข้อมูลเดิม")
+                return self.active_positions
             
-            logger.info(f"📊 ซิงค์ข้อมูล Position สำเร็จ - จำนวน: {len(synced_positions)}")
+            store = self.position_store
+            opened = None
+            modified = None
+            
+            for record in snapshot:
+                position = store.get(record.ticket)
+                if position is None:
+                    position = Position.from_mt5(record)
+                    store.add(position)
+                    if opened is None:
+                        opened = []
+                    opened.append(position)
+                elif (position.price_current != record.price_current or 
+                      position.profit != record.profit or 
+                      position.swap != record.swap or 
+                      position.volume != record.volume or 
+                      position.sl != record.sl or 
+                      position.tp != record.tp):
+                    position.price_current = record.price_current
+                    position.profit = record.profit
+                    position.swap = record.swap
+                    position.volume = record.volume
+                    position.sl = record.sl
+                    position.tp = record.tp
+                    if modified is None:
+                        modified = []
+                    modified.append(position)
+            
+            # ทุก ticket ใน snapshot อยู่ใน store แล้ว - ถ้าขนาดเท่ากันแปลว่าไม่มีไม้ถูกปิด
+            closed = None
+            if len(store) != len(snapshot):
+                live_tickets = {record.ticket for record in snapshot}
+                closed = [position for position in store.as_list() if position.ticket not in live_tickets]
+                for position in closed:
+                    store.remove(position.ticket)
+            
+            if modified:
+                store.touch()
+            
+            if opened or closed or modified:
+                timestamp = time.time()
+                if opened:
+                    self._trigger_position_change_callbacks('opened', opened, timestamp)
+                if closed:
+                    self._trigger_position_change_callbacks('closed', closed, timestamp)
+                if modified:
+                    self._trigger_position_change_callbacks('modified', modified, timestamp)
+            
+            if opened or closed:
+                logger.info(f"📊 ซิงค์ Position: {len(store)} ตัว "
+                           f"(เปิดใหม่ {len(opened or ())}, ปิด {len(closed or ())})")
             
-            # แสดงจำนวนสุทธิ
-            if synced_positions:
-                logger.info(f"📊 Synced positions: {len(synced_positions)}")
-            else:
-                logger.info("ℹ️ ไม่พบ Position เก่าของระบบ (Magic Number: {})".format(self.magic_number))
-            return synced_positions
+            return self.active_positions
             
         except Exception as e:
             logger.error(f"เกิดข้อผิดพลาดในการซิงค์ข้อมูล Position: {str(e)}")
@@ -393,7 +810,7 @@ class OrderManager:
         Returns:
             List[Position]: รายการ Position ของสัญลักษณ์นั้น
         """
-        return [pos for pos in self.active_positions if pos.symbol == symbol]
+        return self.position_store.by_symbol(symbol)
         
     def get_positions_by_type(self, position_type: int) -> List[Position]:
         """
@@ -405,7 +822,7 @@ class OrderManager:
         Returns:
             List[Position]: รายการ Position ตามประเภท
         """
-        return [pos for pos in self.active_positions if pos.type == position_type]
+        return self.position_store.by_type(position_type)
         
     def get_profitable_positions(self) -> List[Position]:
         """
@@ -431,44 +848,117 @@ class OrderManager:
             if (pos.profit + pos.swap + pos.commission) < 0
         ]
         
-    def calculate_total_profit_loss(self) -> Dict[str, float]:
+    def get_position_arrays(self) -> Dict[str, np.ndarray]:
         """
-        คำนวณกำไรขาดทุนรวม
+        ดึง Position ที่เปิดอยู่เป็น NumPy arrays แบบคอลัมน์ สำหรับคำนวณแบบ vectorized
         
         Returns:
-            Dict: ข้อมูลกำไรขาดทุนรวม
+            Dict[str, np.ndarray]: ticket, type, volume, price_open, price_current,
+                                   profit, swap, time_open (อ่านอย่างเดียว)
         """
-        if not self.active_positions:
-            return {
-                'total_profit': 0.0,
-                'total_swap': 0.0,
-                'total_commission': 0.0,
-                'net_profit': 0.0,
-                'profitable_count': 0,
-                'losing_count': 0
-            }
-            
-        total_profit = sum(pos.profit for pos in self.active_positions)
-        total_swap = sum(pos.swap for pos in self.active_positions)
-        total_commission = sum(pos.commission for pos in self.active_positions)
-        net_profit = total_profit + total_swap + total_commission
+        return self.position_store.columns()
         
-        profitable_count = len(self.get_profitable_positions())
-        losing_count = len(self.get_losing_positions())
+    def get_portfolio_aggregates(self) -> Dict[str, float]:
+        """
+        คำนวณค่ารวมของพอร์ตในรอบเดียว (จำนวน, volume, กำไรแยกฝั่ง, ราคาเฉลี่ยถ่วงน้ำหนัก,
+        ขาดทุนสะสม และ margin requirement) แล้วเก็บไว้จนกว่า position_store จะเปลี่ยน
         
-        return {
+        Returns:
+            Dict: ค่ารวมของพอร์ต (ห้ามแก้ไข - ใช้ร่วมกันจนกว่าจะ sync ครั้งถัดไป)
+        """
+        version, positions = self.position_store.snapshot()
+        cached = self._aggregates_cache
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        count = buy_count = sell_count = 0
+        profitable_count = losing_count = 0
+        buy_volume = sell_volume = 0.0
+        buy_value = sell_value = 0.0
+        buy_profit = sell_profit = 0.0
+        total_profit = total_swap = total_commission = 0.0
+        total_unrealized_loss = max_position_loss = 0.0
+        total_exposure = 0.0
+        
+        for pos in positions:
+            count += 1
+            net = pos.profit + pos.swap + pos.commission
+            total_profit += pos.profit
+            total_swap += pos.swap
+            total_commission += pos.commission
+            
+            if net > 0:
+                profitable_count += 1
+            elif net < 0:
+                losing_count += 1
+                loss = -net
+                total_unrealized_loss += loss
+                if loss > max_position_loss:
+                    max_position_loss = loss
+            
+            if pos.type == 0:  # BUY
+                buy_count += 1
+                buy_volume += pos.volume
+                buy_value += pos.volume * pos.price_open
+                buy_profit += net
+            elif pos.type == 1:  # SELL
+                sell_count += 1
+                sell_volume += pos.volume
+                sell_value += pos.volume * pos.price_open
+                sell_profit += net
+            
+            # Margin requirement (เหมือน PercentageCalculator.calculate_portfolio_exposure_percentage)
+            symbol = pos.symbol.upper()
+            if 'XAU' in symbol or 'GOLD' in symbol:
+                total_exposure += pos.volume * pos.price_open * 100 * 0.02
+            else:
+                total_exposure += pos.volume * 100000 * 0.01
+        
+        aggregates = {
+            'version': version,
+            'total_positions': count,
+            'buy_count': buy_count,
+            'sell_count': sell_count,
+            'buy_volume': buy_volume,
+            'sell_volume': sell_volume,
+            'total_volume': buy_volume + sell_volume,
+            'buy_avg_price': buy_value / buy_volume if buy_volume > 0 else 0.0,
+            'sell_avg_price': sell_value / sell_volume if sell_volume > 0 else 0.0,
+            'buy_profit': buy_profit,
+            'sell_profit': sell_profit,
             'total_profit': total_profit,
             'total_swap': total_swap,
             'total_commission': total_commission,
-            'net_profit': net_profit,
+            'net_profit': total_profit + total_swap + total_commission,
             'profitable_count': profitable_count,
-            'losing_count': losing_count
+            'losing_count': losing_count,
+            'total_unrealized_loss': total_unrealized_loss,
+            'max_position_loss': max_position_loss,
+            'total_exposure': total_exposure
         }
+        self._aggregates_cache = (version, aggregates)
+        return aggregates
         
+    def calculate_total_profit_loss(self) -> Dict[str, float]:
+        """
+        คำนวณกำไรขาดทุนรวม
+        
+        Returns:
+            Dict: ข้อมูลกำไรขาดทุนรวม
+        """
+        aggregates = self.get_portfolio_aggregates()
+        return {
+            'total_profit': aggregates['total_profit'],
+            'total_swap': aggregates['total_swap'],
+            'total_commission': aggregates['total_commission'],
+            'net_profit': aggregates['net_profit'],
+            'profitable_count': aggregates['profitable_count'],
+            'losing_count': aggregates['losing_count']
+        }
         
     def get_position_statistics(self, account_balance: float) -> Dict[str, Any]:
         """
-        คำนวณสถิติของ Position
+        คำนวณสถิติของ Position (จากค่ารวมที่คำนวณไว้ - ไม่วนซ้ำทั้งพอร์ต)
         
         Args:
             account_balance: ยอดเงินในบัญชี
@@ -476,7 +966,10 @@ class OrderManager:
         Returns:
             Dict: สถิติต่างๆ
         """
-        if not self.active_positions:
+        aggregates = self.get_portfolio_aggregates()
+        total_count = aggregates['total_positions']
+        
+        if total_count == 0:
             return {
                 'total_positions': 0,
                 'buy_sell_ratio': {
@@ -492,31 +985,32 @@ class OrderManager:
             }
             
         # คำนวณสัดส่วน Buy:Sell
-        buy_sell_ratio = PercentageCalculator.calculate_buy_sell_ratio(self.active_positions)
-        
-        # คำนวณกำไรขาดทุนเป็นเปอร์เซ็นต์
-        profit_percentage = PercentageCalculator.calculate_group_profit_percentage(
-            self.active_positions, account_balance
-        )
-        
-        # คำนวณการใช้เงินทุน
-        exposure_percentage = PercentageCalculator.calculate_portfolio_exposure_percentage(
-            self.active_positions, account_balance
-        )
+        buy_sell_ratio = {
+            'buy_percentage': (aggregates['buy_count'] / total_count) * 100,
+            'sell_percentage': (aggregates['sell_count'] / total_count) * 100,
+            'buy_count': aggregates['buy_count'],
+            'sell_count': aggregates['sell_count'],
+            'total_positions': total_count
+        }
         
-        # คำนวณความเสี่ยง
-        from calculations import RiskCalculator
-        risk_info = RiskCalculator.calculate_portfolio_risk_percentage(
-            self.active_positions, account_balance
-        )
+        # กำไรขาดทุน การใช้เงินทุน และความเสี่ยงเป็นเปอร์เซ็นต์
+        if account_balance > 0:
+            profit_percentage = (aggregates['net_profit'] / account_balance) * 100
+            exposure_percentage = (aggregates['total_exposure'] / account_balance) * 100
+            risk_percentage = (aggregates['total_unrealized_loss'] / account_balance) * 100
+            max_position_risk = (aggregates['max_position_loss'] / account_balance) * 100
+            losing_positions_count = aggregates['losing_count']
+        else:
+            profit_percentage = exposure_percentage = risk_percentage = max_position_risk = 0.0
+            losing_positions_count = 0
         
         return {
-            'total_positions': len(self.active_positions),
+            'total_positions': total_count,
             'buy_sell_ratio': buy_sell_ratio,
             'total_profit_percentage': profit_percentage,
             'exposure_percentage': exposure_percentage,
-            'risk_percentage': risk_info['total_risk_percentage'],
-            'losing_positions_count': risk_info['losing_positions_count'],
-            'max_position_risk': risk_info['max_position_risk']
+            'risk_percentage': risk_percentage,
+            'losing_positions_count': losing_positions_count,
+            'max_position_risk': max_position_risk
         }
     
@@ -5,12 +5,18 @@ Portfolio Manager Module
 """
 
 import logging
-from typing import Dict, List, Optional, Tuple, Any
+import math
+import threading
+import time
+from collections import deque
+from types import MappingProxyType
+from typing import Callable, Deque, Dict, List, Mapping, Optional, Tuple, Any
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
+import numpy as np
 from calculations import (
-    Position, PercentageCalculator, LotSizeCalculator, 
-    RiskCalculator, MarketAnalysisCalculator, ProfitTargetCalculator
+    Position, FrozenPosition, PercentageCalculator, LotSizeCalculator, 
+    MarketAnalysisCalculator, ProfitTargetCalculator
 )
 from trading_conditions import Signal, TradingConditions, CandleData
 from order_management import OrderManager, OrderResult, CloseResult
@@ -34,6 +40,22 @@ class PortfolioState:
     buy_sell_ratio: Dict[str, float]
     timestamp: datetime = field(default_factory=datetime.now)
 
+@dataclass(frozen=True)
+class PortfolioSnapshot:
+    """
+    สถานะพอร์ต ณ รอบหนึ่งแบบแก้ไขไม่ได้ (เผยแพร่โดย PortfolioManager.publish_portfolio_snapshot)
+    
+    ผู้อ่านหลาย thread ใช้ object เดียวกันได้โดยไม่ต้อง lock - ห้ามแก้ไข state
+    """
+    version: int
+    timestamp: float
+    state: PortfolioState
+    positions: Tuple[FrozenPosition, ...]
+    account_info: Mapping[str, Any]
+    aggregates: Mapping[str, float]
+    store_version: int
+    current_price: float = 0.0
+
 @dataclass
 class PerformanceMetrics:
     """คลาสสำหรับเก็บเมตริกการทำงาน"""
@@ -46,7 +68,359 @@ class PerformanceMetrics:
     max_drawdown_percentage: float = 0.0
     profit_factor: float = 0.0
     daily_pnl_percentage: float = 0.0
-    equity_history: List[float] = field(default_factory=list)
+    # Balance หลังปิดไม้แต่ละครั้ง (เก็บเฉพาะล่าสุด) - max drawdown คำนวณแบบ running จาก peak_equity
+    equity_history: Deque[float] = field(default_factory=lambda: deque(maxlen=1000))
+    peak_equity: float = 0.0
+
+class PortfolioHistory:
+    """
+    ประวัติสถานะพอร์ตแบบ ring buffer ขนาดคงที่ พร้อมสรุปรายชั่วโมง / รายวัน
+    
+    เก็บเฉพาะตัวเลข (FIELDS) ใน NumPy array ขนาด capacity - เมื่อเต็มจะเขียนทับข้อมูลเก่าสุด
+    สรุปรายชั่วโมง/รายวัน (UTC) อัพเดทแบบ incremental และเก็บย้อนหลังจำกัดจำนวน
+    """
+    
+    FIELDS = ('timestamp', 'balance', 'equity', 'margin', 'total_profit',
+              'total_positions', 'buy_positions', 'sell_positions', 'exposure_percentage')
+    
+    def __init__(self, capacity: int = 2880, hourly_buckets: int = 168, daily_buckets: int = 90):
+        """
+        Args:
+            capacity: จำนวน snapshot ล่าสุดที่เก็บ
+            hourly_buckets: จำนวนชั่วโมงย้อนหลังที่เก็บสรุป
+            daily_buckets: จำนวนวันย้อนหลังที่เก็บสรุป
+        """
+        self.capacity = capacity
+        self._data = np.zeros((capacity, len(self.FIELDS)), dtype=np.float64)
+        self._column = {name: i for i, name in enumerate(self.FIELDS)}
+        self._head = 0  # ตำแหน่งที่จะเขียนถัดไป
+        self._count = 0
+        self._lock = threading.Lock()
+        
+        self.hourly = deque(maxlen=hourly_buckets)
+        self.daily = deque(maxlen=daily_buckets)
+        self._current_hour = None
+        self._current_day = None
+        
+        # Drawdown ตลอดการทำงาน (running peak - ไม่ต้องสแกนประวัติ)
+        self.peak_equity = 0.0
+        self.max_drawdown_percentage = 0.0
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def append(self, state: 'PortfolioState'):
+        """บันทึก snapshot จาก PortfolioState - O(1)"""
+        timestamp = state.timestamp.timestamp() if isinstance(state.timestamp, datetime) else float(state.timestamp)
+        row = (timestamp, state.account_balance, state.equity, state.margin, state.total_profit,
+               state.total_positions, state.buy_positions, state.sell_positions,
+               state.exposure_percentage)
+        
+        with self._lock:
+            self._data[self._head] = row
+            self._head = (self._head + 1) % self.capacity
+            if self._count < self.capacity:
+                self._count += 1
+            
+            equity = state.equity
+            if equity > self.peak_equity:
+                self.peak_equity = equity
+            drawdown = (self.peak_equity - equity) / self.peak_equity * 100 if self.peak_equity > 0 else 0.0
+            if drawdown > self.max_drawdown_percentage:
+                self.max_drawdown_percentage = drawdown
+            
+            self._current_hour = self._update_bucket(self._current_hour, self.hourly, timestamp, 3600,
+                                                     equity, state, drawdown)
+            self._current_day = self._update_bucket(self._current_day, self.daily, timestamp, 86400,
+                                                    equity, state, drawdown)
+    
+    @staticmethod
+    def _update_bucket(bucket: Optional[Dict], completed: deque, timestamp: float, period: int,
+                       equity: float, state: 'PortfolioState', drawdown: float) -> Dict:
+        """อัพเดทสรุปของช่วงเวลาปัจจุบัน - ถ้าขึ้นช่วงใหม่จะย้ายช่วงเดิมเข้า completed"""
+        start = int(timestamp // period) * period
+        if bucket is None or bucket['start'] != start:
+            if bucket is not None:
+                completed.append(bucket)
+            return {
+                'start': start,
+                'samples': 1,
+                'equity_open': equity,
+                'equity_high': equity,
+                'equity_low': equity,
+                'equity_close': equity,
+                'balance_close': state.account_balance,
+                'profit_sum': state.total_profit,
+                'max_positions': state.total_positions,
+                'max_drawdown_percentage': drawdown
+            }
+        bucket['samples'] += 1
+        if equity > bucket['equity_high']:
+            bucket['equity_high'] = equity
+        if equity < bucket['equity_low']:
+            bucket['equity_low'] = equity
+        bucket['equity_close'] = equity
+        bucket['balance_close'] = state.account_balance
+        bucket['profit_sum'] += state.total_profit
+        if state.total_positions > bucket['max_positions']:
+            bucket['max_positions'] = state.total_positions
+        if drawdown > bucket['max_drawdown_percentage']:
+            bucket['max_drawdown_percentage'] = drawdown
+        return bucket
+    
+    def get_series(self, name: str, window: Optional[int] = None) -> np.ndarray:
+        """
+        ดึงค่าของ field เรียงจากเก่าไปใหม่ - O(window)
+        
+        Args:
+            name: ชื่อ field ใน FIELDS
+            window: จำนวน snapshot ล่าสุด (None = ทั้งหมดที่เก็บไว้)
+            
+        Returns:
+            np.ndarray: สำเนาของข้อมูล
+        """
+        with self._lock:
+            count = self._count if window is None else min(window, self._count)
+            indices = (self._head - count + np.arange(count)) % self.capacity
+            return self._data[indices, self._column[name]]
+    
+    def get_equity_curve(self, window: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Equity curve (timestamps, equity) ของ snapshot ล่าสุด"""
+        return self.get_series('timestamp', window), self.get_series('equity', window)
+    
+    def get_drawdown(self, window: Optional[int] = None) -> Dict[str, float]:
+        """
+        Drawdown ในช่วง snapshot ล่าสุด
+        
+        Returns:
+            Dict: current / max drawdown (%) ในช่วงนั้น และ max drawdown ตลอดการทำงาน
+        """
+        equity = self.get_series('equity', window)
+        result = {'current': 0.0, 'max': 0.0, 'all_time_max': self.max_drawdown_percentage}
+        if equity.size == 0:
+            return result
+        peaks = np.maximum.accumulate(equity)
+        drawdowns = np.divide(peaks - equity, peaks, out=np.zeros_like(equity), where=peaks > 0) * 100
+        result['current'] = float(drawdowns[-1])
+        result['max'] = float(drawdowns.max())
+        return result
+    
+    def latest(self) -> Optional[Dict[str, float]]:
+        """Snapshot ล่าสุดเป็น dict หรือ None ถ้ายังไม่มีข้อมูล"""
+        with self._lock:
+            if self._count == 0:
+                return None
+            row = self._data[(self._head - 1) % self.capacity]
+            return {name: float(row[i]) for i, name in enumerate(self.FIELDS)}
+    
+    def get_aggregates(self, period: str = 'hourly') -> List[Dict[str, Any]]:
+        """
+        สรุปรายชั่วโมง / รายวัน เรียงจากเก่าไปใหม่ (รวมช่วงปัจจุบันที่ยังไม่จบ)
+        
+        Args:
+            period: 'hourly' หรือ 'daily'
+            
+        Returns:
+            List[Dict]: start (epoch UTC), samples, equity OHLC, balance_close,
+                        avg_profit, max_positions, max_drawdown_percentage
+        """
+        with self._lock:
+            if period == 'daily':
+                buckets = list(self.daily) + ([self._current_day] if self._current_day else [])
+            else:
+                buckets = list(self.hourly) + ([self._current_hour] if self._current_hour else [])
+            buckets = [dict(bucket) for bucket in buckets]
+        for bucket in buckets:
+            bucket['avg_profit'] = bucket.pop('profit_sum') / bucket['samples']
+        return buckets
+
+class PositionZone:
+    """Position ที่ราคาเปิดอยู่ในช่วงราคาเดียวกัน (หนึ่ง bucket ของ ZoneIndex)"""
+    
+    __slots__ = ('zone_id', 'price_low', 'price_high', 'buy_positions', 'sell_positions',
+                 'buy_volume', 'sell_volume', 'total_pnl')
+    
+    def __init__(self, zone_id: int, zone_size: float):
+        self.zone_id = zone_id
+        self.price_low = zone_id * zone_size
+        self.price_high = self.price_low + zone_size
+        self.buy_positions = {}   # ticket -> Position
+        self.sell_positions = {}  # ticket -> Position
+        self.buy_volume = 0.0
+        self.sell_volume = 0.0
+        self.total_pnl = 0.0
+    
+    @property
+    def buy_count(self) -> int:
+        return len(self.buy_positions)
+    
+    @property
+    def sell_count(self) -> int:
+        return len(self.sell_positions)
+    
+    @property
+    def total_positions(self) -> int:
+        return len(self.buy_positions) + len(self.sell_positions)
+    
+    @property
+    def balance_ratio(self) -> float:
+        """สัดส่วนไม้ BUY ในโซน (1.0 = BUY ทั้งหมด, 0.0 = SELL ทั้งหมด)"""
+        total = self.total_positions
+        return len(self.buy_positions) / total if total else 0.5
+    
+    @property
+    def volume_imbalance(self) -> float:
+        """ความไม่สมดุลของ lot (-1 = SELL ทั้งหมด, +1 = BUY ทั้งหมด)"""
+        total = self.buy_volume + self.sell_volume
+        return (self.buy_volume - self.sell_volume) / total if total > 0 else 0.0
+
+class ZoneIndex:
+    """
+    ดัชนี Position ตามโซนราคา (bucket ขนาด zone_size ตามราคาเปิด)
+    
+    อัพเดทแบบ incremental จาก callback ของ OrderManager ('opened' / 'closed' / 'modified')
+    จึงตอบ "ไม้ในโซนนี้" และ "ความไม่สมดุลของโซน" ได้โดยไม่ต้องสแกนพอร์ต
+    """
+    
+    def __init__(self, zone_size: float = 30.0):
+        """
+        Args:
+            zone_size: ความกว้างของโซน (หน่วยราคา)
+        """
+        self.zone_size = zone_size
+        self.zones: Dict[int, PositionZone] = {}
+        self._entries = {}  # ticket -> (zone_id, is_buy, volume, profit)
+        self._lock = threading.RLock()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def calculate_zone_id(self, price: float) -> int:
+        """หมายเลขโซนของราคา"""
+        return int(math.floor(price / self.zone_size))
+    
+    def _add(self, position: Any):
+        ticket = getattr(position, 'ticket', None)
+        if ticket is None:
+            return
+        if ticket in self._entries:
+            self._remove(ticket)
+        
+        zone_id = self.calculate_zone_id(getattr(position, 'price_open', 0.0))
+        zone = self.zones.get(zone_id)
+        if zone is None:
+            zone = self.zones[zone_id] = PositionZone(zone_id, self.zone_size)
+        
+        is_buy = getattr(position, 'type', 0) == 0
+        volume = getattr(position, 'volume', 0.0)
+        profit = getattr(position, 'profit', 0.0)
+        if is_buy:
+            zone.buy_positions[ticket] = position
+            zone.buy_volume += volume
+        else:
+            zone.sell_positions[ticket] = position
+            zone.sell_volume += volume
+        zone.total_pnl += profit
+        self._entries[ticket] = (zone_id, is_buy, volume, profit)
+    
+    def _remove(self, ticket: int):
+        entry = self._entries.pop(ticket, None)
+        if entry is None:
+            return
+        zone_id, is_buy, volume, profit = entry
+        zone = self.zones.get(zone_id)
+        if zone is None:
+            return
+        if is_buy:
+            zone.buy_positions.pop(ticket, None)
+            zone.buy_volume -= volume
+        else:
+            zone.sell_positions.pop(ticket, None)
+            zone.sell_volume -= volume
+        zone.total_pnl -= profit
+        if zone.total_positions == 0:
+            del self.zones[zone_id]
+    
+    def _update(self, position: Any):
+        ticket = getattr(position, 'ticket', None)
+        entry = self._entries.get(ticket)
+        if entry is None:
+            self._add(position)
+            return
+        zone_id, is_buy, volume, profit = entry
+        zone = self.zones[zone_id]
+        new_volume = getattr(position, 'volume', 0.0)
+        new_profit = getattr(position, 'profit', 0.0)
+        if is_buy:
+            zone.buy_volume += new_volume - volume
+        else:
+            zone.sell_volume += new_volume - volume
+        zone.total_pnl += new_profit - profit
+        self._entries[ticket] = (zone_id, is_buy, new_volume, new_profit)
+    
+    def on_position_change(self, change_type: str, position: Any, timestamp: float):
+        """Callback สำหรับ OrderManager.add_position_change_callback"""
+        with self._lock:
+            if change_type == 'opened':
+                self._add(position)
+            elif change_type == 'closed':
+                self._remove(getattr(position, 'ticket', None))
+            elif change_type == 'modified':
+                self._update(position)
+    
+    def rebuild(self, positions: List[Any]):
+        """สร้างดัชนีใหม่ทั้งหมดจากรายการ Position"""
+        with self._lock:
+            self.zones = {}
+            self._entries = {}
+            for position in positions:
+                self._add(position)
+    
+    def update_zones_from_positions(self, positions: List[Any], current_price: float = 0.0) -> bool:
+        """
+        ตรวจว่าดัชนีตรงกับรายการ Position (สร้างใหม่เฉพาะเมื่อจำนวนไม่ตรง)
+        
+        Returns:
+            bool: มีโซนที่มี Position อยู่หรือไม่
+        """
+        if len(positions) != len(self._entries):
+            self.rebuild(positions)
+        return bool(self.zones)
+    
+    def get_zone(self, zone_id: int) -> Optional[PositionZone]:
+        """โซนตามหมายเลข หรือ None ถ้าไม่มี Position"""
+        return self.zones.get(zone_id)
+    
+    def get_zone_positions(self, zone_id: int) -> Dict[str, List]:
+        """Position ในโซน แยก BUY / SELL"""
+        with self._lock:
+            zone = self.zones.get(zone_id)
+            if zone is None:
+                return {'BUY': [], 'SELL': []}
+            return {'BUY': list(zone.buy_positions.values()), 'SELL': list(zone.sell_positions.values())}
+    
+    def get_zone_imbalance(self, zone_id: int) -> Dict[str, float]:
+        """
+        ความไม่สมดุลของโซน - O(1)
+        
+        Returns:
+            Dict: buy_count, sell_count, balance_ratio, buy_volume, sell_volume,
+                  volume_imbalance, total_pnl
+        """
+        with self._lock:
+            zone = self.zones.get(zone_id)
+            if zone is None:
+                return {'buy_count': 0, 'sell_count': 0, 'balance_ratio': 0.5, 'buy_volume': 0.0,
+                        'sell_volume': 0.0, 'volume_imbalance': 0.0, 'total_pnl': 0.0}
+            return {
+                'buy_count': zone.buy_count,
+                'sell_count': zone.sell_count,
+                'balance_ratio': zone.balance_ratio,
+                'buy_volume': zone.buy_volume,
+                'sell_volume': zone.sell_volume,
+                'volume_imbalance': zone.volume_imbalance,
+                'total_pnl': zone.total_pnl
+            }
 
 class PortfolioManager:
     """คลาสสำหรับบริหารพอร์ตและการตัดสินใจการเทรด"""
@@ -78,6 +452,11 @@ class PortfolioManager:
         self.zone_analyzer = None
         self.zone_rebalancer = None
         
+        # 🗺️ Zone Index: Position ตามโซนราคา อัพเดทจาก callback ของ OrderManager
+        self.zone_index = ZoneIndex(zone_size=30.0)
+        self.zone_index.rebuild(self.order_manager.active_positions)
+        self.order_manager.add_position_change_callback(self.zone_index.on_position_change)
+        
         logger.info("🚫 OLD ENTRY SYSTEMS DISABLED - Using Smart Entry Timing only")
         
         # การตั้งค่าความเสี่ยง
@@ -96,8 +475,14 @@ class PortfolioManager:
         self.daily_start_balance = initial_balance
         self.daily_start_time = datetime.now().date()
         
-        # ประวัติการทำงาน
-        self.portfolio_history = []
+        # ประวัติการทำงาน (ring buffer ขนาดคงที่ + สรุปรายชั่วโมง/รายวัน)
+        self.portfolio_history = PortfolioHistory()
+        
+        # 📸 Portfolio Snapshot: writer เดียวต่อรอบ ผู้อ่านหยิบ reference ล่าสุดโดยไม่ lock
+        self._portfolio_snapshot: Optional[PortfolioSnapshot] = None
+        self._snapshot_write_lock = threading.Lock()
+        self.snapshot_count = 0
+        self.snapshot_callbacks = []  # callback(snapshot) - เรียกทุกครั้งที่เผยแพร่ snapshot ใหม่
         self.trade_history = []
         
         # ติดตามเวลาเทรดล่าสุด สำหรับ Continuous Trading
@@ -133,7 +518,7 @@ class PortfolioManager:
                 total_positions=stats['total_positions'],
                 buy_positions=stats['buy_sell_ratio']['buy_count'],
                 sell_positions=stats['buy_sell_ratio']['sell_count'],
-                total_profit=sum(pos.profit + pos.swap + pos.commission for pos in positions),
+                total_profit=self.order_manager.get_portfolio_aggregates()['net_profit'],
                 total_profit_percentage=stats['total_profit_percentage'],
                 exposure_percentage=stats['exposure_percentage'],
                 risk_percentage=stats['risk_percentage'],
@@ -162,6 +547,73 @@ class PortfolioManager:
                 buy_sell_ratio={'buy_percentage': 0, 'sell_percentage': 0}
             )
             
+    def publish_portfolio_snapshot(self, account_info: Optional[Dict] = None,
+                                   current_price: float = 0.0) -> PortfolioSnapshot:
+        """
+        ซิงค์ Position จาก MT5 และเผยแพร่ PortfolioSnapshot ใหม่ (เรียกครั้งเดียวต่อรอบจาก trading loop)
+        
+        Args:
+            account_info: ข้อมูลบัญชีจาก MT5 (None = ดึงใหม่)
+            current_price: ราคาปัจจุบันที่ trading loop อ่านมาแล้วในรอบนี้
+            
+        Returns:
+            PortfolioSnapshot: snapshot ที่เผยแพร่
+        """
+        with self._snapshot_write_lock:
+            if account_info is None:
+                account_info = self.order_manager.mt5.get_account_info() or {}
+            
+            state = self.analyze_portfolio_state(account_info)
+            store_version, live_positions = self.order_manager.position_store.snapshot()
+            
+            # Position ไม่เปลี่ยนตั้งแต่ snapshot ก่อน - ใช้ tuple เดิม
+            previous = self._portfolio_snapshot
+            if previous is not None and previous.store_version == store_version:
+                positions = previous.positions
+            else:
+                positions = tuple(position.freeze() for position in live_positions)
+            
+            self.snapshot_count += 1
+            snapshot = PortfolioSnapshot(
+                version=self.snapshot_count,
+                timestamp=time.time(),
+                state=state,
+                positions=positions,
+                account_info=MappingProxyType(dict(account_info)),
+                aggregates=MappingProxyType(dict(self.order_manager.get_portfolio_aggregates())),
+                store_version=store_version,
+                current_price=current_price
+            )
+            # สลับ reference ครั้งเดียว - ผู้อ่านเห็น snapshot เก่าหรือใหม่ทั้งก้อน
+            self._portfolio_snapshot = snapshot
+            
+            # แจ้งผู้ติดตามตามลำดับการเผยแพร่ (callback ต้องสั้น - ส่งงานหนักต่อให้ thread ของตัวเอง)
+            for callback in self.snapshot_callbacks:
+                try:
+                    callback(snapshot)
+                except Exception as e:
+                    logger.error(f"❌ Error in snapshot callback: {e}")
+            return snapshot
+    
+    def add_snapshot_callback(self, callback: Callable):
+        """เพิ่ม callback(snapshot) เมื่อมีการเผยแพร่ PortfolioSnapshot ใหม่"""
+        if callback not in self.snapshot_callbacks:
+            self.snapshot_callbacks.append(callback)
+    
+    def remove_snapshot_callback(self, callback: Callable):
+        """ลบ snapshot callback"""
+        if callback in self.snapshot_callbacks:
+            self.snapshot_callbacks.remove(callback)
+    
+    def get_portfolio_snapshot(self) -> Optional[PortfolioSnapshot]:
+        """
+        Snapshot ล่าสุด (ไม่ lock ไม่ซิงค์ MT5)
+        
+        Returns:
+            PortfolioSnapshot: snapshot ล่าสุด หรือ None ถ้ายังไม่เคยเผยแพร่
+        """
+        return self._portfolio_snapshot
+            
     def should_enter_trade(self, signal: Signal, candle: CandleData, 
                           current_state: PortfolioState, volume_history: List[float] = None,
                           dynamic_lot_size: float = None) -> Dict[str, Any]:
@@ -511,9 +963,8 @@ class PortfolioManager:
         if len(self.performance_metrics.equity_history) < 2:
             return {'should_exit': False}
             
-        max_drawdown = RiskCalculator.calculate_maximum_drawdown_percentage(
-            self.performance_metrics.equity_history
-        )
+        # อัพเดทแบบ running ใน _update_performance_metrics แล้ว
+        max_drawdown = self.performance_metrics.max_drawdown_percentage
         
         if max_drawdown >= self.max_drawdown_limit:
             return {
@@ -658,15 +1109,16 @@ class PortfolioManager:
                 )
                 
             # อัพเดท Equity History
-            self.performance_metrics.equity_history.append(self.current_balance)
-            
-            # คำนวณ Max Drawdown
-            if len(self.performance_metrics.equity_history) > 1:
-                self.performance_metrics.max_drawdown_percentage = (
-                    RiskCalculator.calculate_maximum_drawdown_percentage(
-                        self.performance_metrics.equity_history
-                    )
-                )
+            metrics = self.performance_metrics
+            metrics.equity_history.append(self.current_balance)
+            
+            # คำนวณ Max Drawdown แบบ running peak - O(1) (ผลเท่ากับสแกนประวัติทั้งหมด)
+            if self.current_balance > metrics.peak_equity:
+                metrics.peak_equity = self.current_balance
+            elif metrics.peak_equity > 0:
+                drawdown = (metrics.peak_equity - self.current_balance) / metrics.peak_equity * 100
+                if drawdown > metrics.max_drawdown_percentage:
+                    metrics.max_drawdown_percentage = drawdown
                 
             # คำนวณ Daily P&L
             daily_pnl = self.current_balance - self.daily_start_balance
@@ -727,6 +1179,7 @@ class PortfolioManager:
                     'max_drawdown_percentage': self.performance_metrics.max_drawdown_percentage,
                     'daily_pnl_percentage': self.performance_metrics.daily_pnl_percentage
                 },
+                'execution_quality': self.get_execution_quality(),
                 'risk_settings': {
                     'max_risk_per_trade': self.max_risk_per_trade,
                     'max_portfolio_exposure': self.max_portfolio_exposure,
@@ -739,6 +1192,43 @@ class PortfolioManager:
             logger.error(f"เกิดข้อผิดพลาดในการสรุปพอร์ต: {str(e)}")
             return {'error': str(e)}
             
+    def get_equity_curve(self, window: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Equity curve และ drawdown จากประวัติพอร์ต (ข้อมูลจำกัดขนาด)
+        
+        Args:
+            window: จำนวน snapshot ล่าสุด (None = ทั้งหมดที่เก็บไว้)
+            
+        Returns:
+            Dict: timestamps, equity (list) และ drawdown (current / max / all_time_max)
+        """
+        timestamps, equity = self.portfolio_history.get_equity_curve(window)
+        return {
+            'timestamps': timestamps.tolist(),
+            'equity': equity.tolist(),
+            'drawdown': self.portfolio_history.get_drawdown(window)
+        }
+        
+    def get_history_aggregates(self, period: str = 'hourly') -> List[Dict[str, Any]]:
+        """สรุปสถานะพอร์ตรายชั่วโมง ('hourly') หรือรายวัน ('daily')"""
+        return self.portfolio_history.get_aggregates(period)
+        
+    def get_execution_quality(self, kind: Optional[str] = None) -> Dict[str, Any]:
+        """
+        ดึงสถิติ latency / slippage ของคำสั่งเปิด-ปิดล่าสุดจาก OrderManager
+        
+        Args:
+            kind: 'open' / 'close' หรือ None เพื่อดูทุกประเภท
+            
+        Returns:
+            Dict: percentile ของ latency (ms) และ slippage (points) แบบ rolling
+        """
+        try:
+            return self.order_manager.get_execution_stats(kind)
+        except Exception as e:
+            logger.error(f"เกิดข้อผิดพลาดในการดึงสถิติการส่งคำสั่ง: {str(e)}")
+            return {}
+            
     def reset_daily_metrics(self):
         """รีเซ็ตเมตริกรายวัน"""
         try:
@@ -784,14 +1274,11 @@ class PortfolioManager:
             Dict: คำแนะนำการเข้าไม้แบบ Zone-Based
         """
         try:
-            if not self.position_manager:
-                return None
-            
             # ดึงข้อมูล Positions ปัจจุบัน
             positions = self.order_manager.active_positions or []
             
             # อัพเดท Zones จาก Positions ปัจจุบัน
-            zones_updated = self.position_manager.zone_manager.update_zones_from_positions(positions, current_price)
+            zones_updated = self.zone_index.update_zones_from_positions(positions, current_price)
             if not zones_updated:
                 # ถ้าไม่มี Zones ให้สร้างใหม่
                 logger.info("🎯 Creating initial zones for entry analysis")
@@ -868,7 +1355,7 @@ class PortfolioManager:
     def _analyze_current_zone_distribution(self, current_price: float) -> Dict[str, Any]:
         """วิเคราะห์การกระจาย Zones ปัจจุบัน"""
         try:
-            zones = self.position_manager.zone_manager.zones
+            zones = dict(self.zone_index.zones)
             
             if not zones:
                 return {'total_zones': 0, 'buy_heavy_zones': 0, 'sell_heavy_zones': 0, 'balanced_zones': 0}
@@ -902,8 +1389,8 @@ class PortfolioManager:
         """ประเมินผลกระทบของการเข้าไม้ต่อ Zone System"""
         try:
             # คำนวณ Zone ที่ราคาปัจจุบันจะเข้าไป
-            target_zone_id = self.position_manager.zone_manager.calculate_zone_id(current_price)
-            target_zone = self.position_manager.zone_manager.zones.get(target_zone_id)
+            target_zone_id = self.zone_index.calculate_zone_id(current_price)
+            target_zone = self.zone_index.zones.get(target_zone_id)
             
             # วิเคราะห์ผลกระทบ
             should_enter = True
@@ -1206,27 +1693,10 @@ class PortfolioManager:
             }
     
     def _get_zone_positions(self, zone_id: int, current_price: float) -> Dict[str, List]:
-        """📊 ดึง positions ใน zone ที่กำหนด"""
+        """📊 ดึง positions ใน zone ที่กำหนด (จาก zone_index - ไม่สแกนพอร์ต)"""
         try:
-            positions = self.order_manager.active_positions or []
-            if not positions:
-                return {'BUY': [], 'SELL': []}
-            
-            zone_positions = {'BUY': [], 'SELL': []}
-            zone_size_pips = 30.0  # Default zone size
-            
-            for pos in positions:
-                pos_price = getattr(pos, 'price_open', current_price)
-                pos_zone_id = int((pos_price - current_price) / zone_size_pips)
-                
-                if pos_zone_id == zone_id:
-                    pos_type = getattr(pos, 'type', 0)
-                    if pos_type == 0:  # BUY
-                        zone_positions['BUY'].append(pos)
-                    else:  # SELL
-                        zone_positions['SELL'].append(pos)
-            
-            return zone_positions
+            self.zone_index.update_zones_from_positions(self.order_manager.active_positions, current_price)
+            return self.zone_index.get_zone_positions(zone_id)
             
         except Exception as e:
             logger.error(f"❌ Error getting zone positions: {e}")
@@ -1446,7 +1916,7 @@ class PortfolioManager:
             Dict: ความต้องการของแต่ละ Zone
         """
         try:
-            zones = self.position_manager.zone_manager.zones
+            zones = self.zone_index.zones
             zone_needs = {
                 'urgent_zones': [],      # Zone ที่ต้องการความช่วยเหลือด่วน
                 'target_zone_id': None,  # Zone ที่ราคาปัจจุบันจะเข้าไป
@@ -1459,11 +1929,11 @@ class PortfolioManager:
                 return zone_needs
             
             # คำนวณ Zone ที่ราคาปัจจุบันจะเข้าไป
-            target_zone_id = self.position_manager.zone_manager.calculate_zone_id(current_price)
+            target_zone_id = self.zone_index.calculate_zone_id(current_price)
             zone_needs['target_zone_id'] = target_zone_id
             
             # วิเคราะห์ความต้องการของแต่ละ Zone
-            for zone_id, zone in zones.items():
+            for zone_id, zone in list(zones.items()):
                 if zone.total_positions == 0:
                     continue
                 
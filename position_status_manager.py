@@ -6,17 +6,76 @@ Position Status Manager
 
 import logging
 import time
-from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass
+import numpy as np
+from typing import Dict, List, Any, Optional, Tuple, Callable
+from dataclasses import dataclass, field, replace
+from enum import IntEnum
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+class PositionStatusCode(IntEnum):
+    """รหัสสถานะไม้ (ใช้ภายใน) - แปลงเป็นข้อความไทยที่ format_position_status เท่านั้น"""
+    UNKNOWN = 0
+    HEDGE_GUARD = 1
+    SUPPORT_GUARD = 2
+    PROTECTED = 3
+    PROFIT_HELPER = 4
+    STANDALONE = 5
+
+# index ด้วยค่า int ของรหัส (เร็วกว่าเรียก PositionStatusCode(value) ทุกไม้)
+_STATUS_CODES = tuple(PositionStatusCode)
+# ชื่อย่อระดับโมดูล (อ่านเร็วกว่า PositionStatusCode.X ในลูปต่อไม้)
+(_HEDGE_GUARD, _SUPPORT_GUARD, _PROTECTED,
+ _PROFIT_HELPER, _STANDALONE) = _STATUS_CODES[1:]
+
+STATUS_LABELS = {
+    PositionStatusCode.UNKNOWN: 'Unknown',
+    PositionStatusCode.HEDGE_GUARD: 'HG',
+    PositionStatusCode.SUPPORT_GUARD: 'Support Guard',
+    PositionStatusCode.PROTECTED: 'Protected',
+    PositionStatusCode.PROFIT_HELPER: 'Profit Helper',
+    PositionStatusCode.STANDALONE: 'Standalone'
+}
+
+def format_position_status(code: PositionStatusCode, zone_type: str, relationships: Dict[str, Any],
+                           helper_zone: str = '') -> str:
+    """
+    แปลงรหัสสถานะเป็นข้อความภาษาไทยสำหรับแสดงผล (GUI / Log)
+    
+    Args:
+        code: รหัสสถานะ
+        zone_type: ประเภท Zone ของไม้
+        relationships: ความสัมพันธ์จาก _find_position_relationships
+        helper_zone: Zone ที่ Profit Helper พร้อมช่วย (ถ้ามี)
+        
+    Returns:
+        str: ข้อความสถานะ
+    """
+    try:
+        if code == PositionStatusCode.HEDGE_GUARD:
+            target_info = relationships['hedge_target']
+            ratio = relationships.get('hedge_ratio', '1:1')
+            return f"HG - ค้ำ {target_info['direction']} Zone {zone_type} ({ratio})"
+        if code == PositionStatusCode.SUPPORT_GUARD:
+            return f"Support Guard - ห้ามปิด ค้ำ {len(relationships['protecting'])} ไม้"
+        if code == PositionStatusCode.PROTECTED:
+            return f"Protected - มี HG ค้ำแล้ว รอช่วยเหลือ (โดย #{relationships['protected_by']['ticket']})"
+        if code == PositionStatusCode.PROFIT_HELPER:
+            if helper_zone:
+                return f"Profit Helper - พร้อมช่วย Zone {helper_zone}"
+            return "Profit Helper - พร้อมช่วยเหลือ"
+        if code == PositionStatusCode.STANDALONE:
+            return "Standalone - ยังไม่มีหน้าที่"
+    except Exception as e:
+        logger.error(f"❌ Error formatting status: {e}")
+    return "Unknown - ข้อผิดพลาดในการวิเคราะห์"
+
 @dataclass
 class PositionStatus:
     """คลาสสำหรับเก็บสถานะของ Position"""
     ticket: int
-    status: str
+    code: PositionStatusCode
     zone: str
     relationships: Dict[str, Any]
     ratio_info: Dict[str, Any]
@@ -25,6 +84,40 @@ class PositionStatus:
     direction: str
     price_open: float
     price_current: float
+    helper_zone: str = ''
+    _display_key: Optional[Tuple] = field(default=None, init=False, repr=False, compare=False)
+    
+    @property
+    def status(self) -> str:
+        """ข้อความสถานะภาษาไทย (สร้างเมื่อถูกอ่านเท่านั้น)"""
+        return format_position_status(self.code, self.zone, self.relationships, self.helper_zone)
+    
+    @property
+    def display_key(self) -> Tuple:
+        """
+        ค่าที่ข้อความสถานะขึ้นอยู่ด้วย - เท่ากันเมื่อ status เท่ากัน
+        ใช้เทียบการเปลี่ยนสถานะโดยไม่ต้องสร้างข้อความ (คำนวณครั้งเดียวต่อ object - สถานะไม่ถูกแก้หลังสร้าง)
+        """
+        key = self._display_key
+        if key is None:
+            key = self._display_key = self._build_display_key()
+        return key
+    
+    def _build_display_key(self) -> Tuple:
+        code = self.code
+        if code is _STANDALONE:
+            return (code,)
+        if code is _PROFIT_HELPER:
+            return (code, self.helper_zone)
+        relationships = self.relationships
+        if code is _PROTECTED:
+            return (code, (relationships.get('protected_by') or {}).get('ticket'))
+        if code is _HEDGE_GUARD:
+            target = relationships.get('hedge_target') or {}
+            return (code, self.zone, target.get('direction'), relationships.get('hedge_ratio', '1:1'))
+        if code is _SUPPORT_GUARD:
+            return (code, len(relationships.get('protecting', ())))
+        return (code,)
 
 @dataclass
 class ZoneInfo:
@@ -53,6 +146,17 @@ class PositionStatusManager:
         self.last_analysis_time = 0
         self.analysis_interval = 3  # วิเคราะห์ทุก 3 วินาที
         
+        # 🚀 Dirty Tracking: คำนวณใหม่เฉพาะไม้ที่เปลี่ยน
+        self._profit_classes = {}          # ticket -> ช่วงกำไร (ดู _compute_status_arrays)
+        self._zone_cache = {}              # ticket -> (price_open, zone dict)
+        self._zones_signature = None       # zones + tolerance ของรอบก่อน
+        self._relationship_signature = {}  # type -> โครงสร้างความสัมพันธ์ของรอบก่อน
+        self.last_recomputed_count = 0
+        self.portfolio_totals = {}
+        
+        self.analysis_callbacks = []  # callback(status_results) - เรียกเมื่อวิเคราะห์รอบใหม่เสร็จ
+        self.last_refreshed_count = 0
+        
         # 🎯 Dynamic Parameters ตาม Market Condition
         self.zone_tolerance_levels = {
             'volatile': 0.001,    # แม่นยำมาก
@@ -93,41 +197,115 @@ class PositionStatusManager:
             self._adjust_zone_parameters(market_condition)
             
             status_results = {}
+            profit_classes = {}
+            zone_cache = {}
+            
+            # ดัชนีความสัมพันธ์แยกตามฝั่ง - สร้างครั้งเดียวต่อรอบ O(N)
+            relationship_index = self._build_relationship_index(positions)
+            
+            # Zone levels เรียงแล้ว - สร้างครั้งเดียวต่อรอบ
+            zone_levels = self._build_zone_levels(zones)
             
-            for position in positions:
+            # Zones / tolerance เปลี่ยน -> จำแนก Zone ใหม่ทุกไม้
+            zones_signature = self._get_zones_signature(zone_levels)
+            zones_changed = zones_signature != self._zones_signature
+            
+            # จำแนก Zone ของไม้ใหม่ / ทั้งหมด (ถ้า zones เปลี่ยน) ด้วย searchsorted ครั้งเดียว
+            pending_positions = [
+                position for position in positions
+                if zones_changed or
+                self._zone_cache.get(getattr(position, 'ticket', 0), (None,))[0] != getattr(position, 'price_open', 0.0)
+            ]
+            classified_zones = dict(zip(
+                (getattr(position, 'ticket', 0) for position in pending_positions),
+                self._classify_position_zones(pending_positions, zone_levels)
+            ))
+            
+            # รหัสสถานะ / ratio / ช่วงกำไรของทุกไม้ - คำนวณแบบ vectorized ครั้งเดียวต่อรอบ
+            status_arrays = self._compute_status_arrays(positions, relationship_index)
+            codes = status_arrays['codes'].tolist()
+            profit_class_list = status_arrays['profit_classes'].tolist()
+            ratios = status_arrays['ratios'].tolist()
+            strengths = status_arrays['strengths'].tolist()
+            target_profits = status_arrays['target_profits'].tolist()
+            
+            # ฝั่งที่โครงสร้างความสัมพันธ์เปลี่ยน แยกตามส่วน (0 = เป้า HG, 1 = ไม้ขาดทุน, 2 = ไม้ค้ำ)
+            relationship_signature = self._get_relationship_signature(relationship_index)
+            hedge_changed, losing_changed, profitable_changed = (
+                {
+                    position_type
+                    for position_type in set(relationship_signature) | set(self._relationship_signature)
+                    if relationship_signature.get(position_type, (False, False, False))[part] !=
+                    self._relationship_signature.get(position_type, (False, False, False))[part]
+                }
+                for part in range(3)
+            )
+            # ไม้กำไรขึ้นกับไม้ขาดทุนฝั่งเดียวกันและเป้า HG ฝั่งตรงข้าม / ไม้ขาดทุนขึ้นกับไม้ค้ำฝั่งเดียวกัน
+            dirty_profitable_types = set(losing_changed)
+            for position_type in relationship_index['sides']:
+                if any(changed_type != position_type for changed_type in hedge_changed):
+                    dirty_profitable_types.add(position_type)
+            dirty_losing_types = profitable_changed
+            
+            previous_profit_classes = self._profit_classes
+            recomputed = 0
+            for i, position in enumerate(positions):
                 try:
-                    # 1. จำแนก Zone
-                    zone = self._classify_position_zone(position, current_price, zones)
-                    
-                    # 2. หา Relationships
-                    relationships = self._find_position_relationships(position, positions)
+                    ticket = getattr(position, 'ticket', 0)
+                    position_type = getattr(position, 'type', 0)
+                    price_open = getattr(position, 'price_open', 0.0)
+                    profit_class = profit_class_list[i]
+                    profit_classes[ticket] = profit_class
+                    code = _STATUS_CODES[codes[i]]
+                    ratio_info = self._build_ratio_info(
+                        getattr(position, 'profit', 0.0), target_profits[i], ratios[i], strengths[i]
+                    )
                     
-                    # 3. กำหนดสถานะ
-                    status = self._determine_position_status(position, zone, relationships)
+                    # 1. Zone (ใช้ผลเดิมถ้า zones และราคาเปิดไม่เปลี่ยน)
+                    zone = classified_zones.get(ticket)
+                    if zone is None:
+                        zone = self._zone_cache[ticket][1]
+                    zone_cache[ticket] = (price_open, zone)
                     
-                    # 4. คำนวณ Ratio (ถ้าเป็น HG)
-                    ratio_info = self._calculate_hedge_ratio(position, relationships)
+                    cached = self.status_cache.get(ticket)
+                    if profit_class == 0:
+                        relationship_changed = position_type in dirty_profitable_types
+                    elif profit_class >= 2:
+                        relationship_changed = position_type in dirty_losing_types
+                    else:
+                        relationship_changed = False
                     
-                    # 5. สร้าง PositionStatus Object
-                    position_status = PositionStatus(
-                        ticket=getattr(position, 'ticket', 0),
-                        status=status,
-                        zone=zone.get('type', 'unknown'),
-                        relationships=relationships,
-                        ratio_info=ratio_info,
-                        last_update=current_time,
-                        profit=getattr(position, 'profit', 0.0),
-                        direction='BUY' if getattr(position, 'type', 0) == 0 else 'SELL',
-                        price_open=getattr(position, 'price_open', 0.0),
-                        price_current=getattr(position, 'price_current', current_price)
+                    dirty = (
+                        cached is None or
+                        zones_changed or
+                        relationship_changed or
+                        previous_profit_classes.get(ticket) != profit_class
                     )
                     
-                    status_results[position_status.ticket] = position_status
+                    if dirty:
+                        recomputed += 1
+                        status_results[ticket] = self._compute_position_status(
+                            position, zone, positions, relationship_index, code, ratio_info,
+                            current_price, current_time
+                        )
+                    else:
+                        status_results[ticket] = self._refresh_position_status(
+                            cached, position, positions, relationship_index, code, ratio_info,
+                            current_price, current_time
+                        )
                     
                 except Exception as e:
                     logger.error(f"❌ Error analyzing position {getattr(position, 'ticket', 'unknown')}: {e}")
                     continue
             
+            self._profit_classes = profit_classes
+            self._zone_cache = zone_cache
+            self._zones_signature = zones_signature
+            self._relationship_signature = relationship_signature
+            self.last_recomputed_count = recomputed
+            self.last_refreshed_count = len(status_results) - recomputed
+            logger.debug(f"🔁 [STATUS ANALYSIS] คำนวณใหม่ {recomputed} ไม้, อัพเดทค่า {self.last_refreshed_count} ไม้")
+            
             # อัพเดท Cache
             self.status_cache = status_results
             self.last_analysis_time = current_time
@@ -135,12 +313,169 @@ class PositionStatusManager:
             # Log สรุปผลการวิเคราะห์
             self._log_analysis_summary(status_results)
             
+            for callback in self.analysis_callbacks:
+                try:
+                    callback(status_results)
+                except Exception as e:
+                    logger.error(f"❌ Error in status analysis callback: {e}")
+            
             return status_results
             
         except Exception as e:
             logger.error(f"❌ Error in analyze_all_positions: {e}")
             return self.status_cache
     
+    def _compute_position_status(self, position: Any, zone: Dict[str, Any], positions: List[Any],
+                                 relationship_index: Dict[str, Dict[int, Any]], code: PositionStatusCode,
+                                 ratio_info: Dict[str, Any], current_price: float,
+                                 current_time: float) -> PositionStatus:
+        """สร้าง PositionStatus ใหม่ทั้งหมด (ไม้ที่ dirty)"""
+        # หา Relationships (รหัสสถานะ / ratio ได้จาก _compute_status_arrays แล้ว)
+        relationships = self._find_position_relationships(position, positions, relationship_index)
+        
+        helper_zone = ''
+        if code == PositionStatusCode.PROFIT_HELPER:
+            available_zones = self._find_zones_needing_help()
+            helper_zone = available_zones[0] if available_zones else ''
+        
+        return PositionStatus(
+            ticket=getattr(position, 'ticket', 0),
+            code=code,
+            zone=zone.get('type', 'unknown'),
+            relationships=relationships,
+            ratio_info=ratio_info,
+            last_update=current_time,
+            profit=getattr(position, 'profit', 0.0),
+            direction='BUY' if getattr(position, 'type', 0) == 0 else 'SELL',
+            price_open=getattr(position, 'price_open', 0.0),
+            price_current=getattr(position, 'price_current', current_price),
+            helper_zone=helper_zone
+        )
+    
+    def _refresh_position_status(self, position_status: PositionStatus, position: Any, positions: List[Any],
+                                 relationship_index: Dict[str, Dict[int, Any]], code: PositionStatusCode,
+                                 ratio_info: Dict[str, Any], current_price: float,
+                                 current_time: float) -> PositionStatus:
+        """
+        สร้างสถานะใหม่ของไม้ที่ไม่ dirty โดยอัพเดทเฉพาะค่าตัวเลข (โครงสร้างสถานะเหมือนเดิม)
+        
+        ไม้ที่มีความสัมพันธ์จะอ่านกำไรของไม้คู่ใหม่จากดัชนี (O(1)) เพราะ ratio ของ HG เปลี่ยนตามกำไร
+        ไม่แก้ object เดิม - ผลรอบก่อน (status_cache / get_all_statuses) อาจถูกเก็บไว้เทียบโดยผู้อื่น
+        """
+        relationships = position_status.relationships
+        if relationships.get('has_assignment'):
+            relationships = self._find_position_relationships(position, positions, relationship_index)
+        
+        return replace(
+            position_status,
+            profit=getattr(position, 'profit', 0.0),
+            price_current=getattr(position, 'price_current', current_price),
+            last_update=current_time,
+            code=code,
+            ratio_info=ratio_info,
+            relationships=relationships
+        )
+    
+    def _compute_status_arrays(self, positions: List[Any],
+                               relationship_index: Dict[str, Dict[int, Any]]) -> Dict[str, np.ndarray]:
+        """
+        คำนวณรหัสสถานะ, ratio ของ HG และช่วงกำไรของทุกไม้แบบ vectorized
+        พร้อมยอดรวม volume / กำไรฝั่ง BUY-SELL ครั้งเดียวต่อรอบ (เก็บที่ self.portfolio_totals)
+        
+        Args:
+            positions: รายการ Position ทั้งหมด
+            relationship_index: ผลจาก _build_relationship_index
+            
+        Returns:
+            Dict: codes, profit_classes, ratios (NaN = ไม่ใช่ HG), strengths, target_profits
+        """
+        count = len(positions)
+        profits = np.fromiter((getattr(p, 'profit', 0.0) for p in positions), dtype=float, count=count)
+        types = np.fromiter((getattr(p, 'type', 0) for p in positions), dtype=np.int64, count=count)
+        volumes = np.fromiter((getattr(p, 'volume', 0.0) for p in positions), dtype=float, count=count)
+        
+        # ค่าต่อฝั่ง (กำไรของเป้า HG ฝั่งตรงข้าม / มีไม้ขาดทุน / มีไม้ค้ำ) กระจายให้ทุกไม้ในฝั่งนั้น
+        target_profits = np.full(count, np.nan)
+        has_losing = np.zeros(count, dtype=bool)
+        has_profitable = np.zeros(count, dtype=bool)
+        for position_type in np.unique(types).tolist():
+            mask = types == position_type
+            target = self._get_hedge_target(position_type, relationship_index)
+            if target is not None:
+                target_profits[mask] = getattr(target[1], 'profit', 0.0)
+            has_losing[mask] = bool(relationship_index['losing'].get(position_type))
+            has_profitable[mask] = relationship_index['first_profitable'].get(position_type) is not None
+        
+        profitable = profits > 0
+        is_hedging = profitable & ~np.isnan(target_profits)
+        codes = np.select(
+            [is_hedging, profitable & has_losing, (profits < -2.0) & has_profitable, profitable],
+            [PositionStatusCode.HEDGE_GUARD, PositionStatusCode.SUPPORT_GUARD,
+             PositionStatusCode.PROTECTED, PositionStatusCode.PROFIT_HELPER],
+            default=PositionStatusCode.STANDALONE
+        )
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios = np.where(is_hedging & (target_profits != 0), np.abs(profits / target_profits), np.nan)
+        strengths = np.minimum(ratios, 2.0) / 2.0  # 0-1 scale
+        
+        # ช่วงกำไรตามเกณฑ์สถานะ: 0 = กำไร, 1 = -2..0, 2 = -5..-2, 3 = ขาดทุนเกิน 5
+        profit_classes = np.select([profitable, profits >= -2.0, profits >= -5.0], [0, 1, 2], default=3)
+        
+        buy_mask = types == 0
+        sell_mask = types == 1
+        self.portfolio_totals = {
+            'buy_volume': float(volumes[buy_mask].sum()),
+            'sell_volume': float(volumes[sell_mask].sum()),
+            'buy_profit': float(profits[buy_mask].sum()),
+            'sell_profit': float(profits[sell_mask].sum()),
+            'total_profit': float(profits.sum())
+        }
+        
+        return {
+            'codes': codes,
+            'profit_classes': profit_classes,
+            'ratios': ratios,
+            'strengths': strengths,
+            'target_profits': target_profits
+        }
+    
+    @staticmethod
+    def _build_ratio_info(position_profit: float, target_profit: float, ratio: float,
+                          strength: float) -> Dict[str, Any]:
+        """สร้าง ratio_info จากค่าที่คำนวณแบบ vectorized (ratio เป็น NaN = ไม่ใช่ HG)"""
+        if ratio != ratio:
+            return {'ratio': '1:1', 'strength': 0.0}
+        return {
+            'ratio': f"{ratio:.1f}:1",
+            'strength': strength,
+            'position_profit': position_profit,
+            'target_profit': target_profit
+        }
+    
+    def _get_zones_signature(self, zone_levels: Dict[str, Any]) -> Tuple:
+        """ค่าสำหรับตรวจว่า zones / tolerance เปลี่ยนจากรอบก่อนหรือไม่"""
+        return (self.zone_tolerance, zone_levels['levels'].tobytes(),
+                tuple(zone_levels['types']), tuple(zone_levels['strengths']))
+    
+    @staticmethod
+    def _get_relationship_signature(relationship_index: Dict[str, Dict[int, Any]]) -> Dict[int, Tuple[bool, bool, bool]]:
+        """
+        กลุ่มความสัมพันธ์ต่อฝั่ง: (มีเป้า HG, มีไม้ขาดทุน, มีไม้ค้ำ)
+        
+        ไม้ที่มีความสัมพันธ์อยู่แล้วจะอ่านคู่ใหม่จากดัชนีทุกรอบ จึงต้อง dirty เฉพาะตอนกลุ่มเกิด/หายไป
+        """
+        signature = {}
+        types = (set(relationship_index['first_hedge_target']) | set(relationship_index['losing']) |
+                 set(relationship_index['first_profitable']))
+        for position_type in types:
+            signature[position_type] = (
+                relationship_index['first_hedge_target'].get(position_type) is not None,
+                bool(relationship_index['losing'].get(position_type)),
+                relationship_index['first_profitable'].get(position_type) is not None
+            )
+        return signature
+    
     def _adjust_zone_parameters(self, market_condition: str):
         """ปรับพารามิเตอร์ Zone ตาม Market Condition"""
         self.zone_tolerance = self.zone_tolerance_levels.get(market_condition, 0.1)
@@ -149,207 +484,224 @@ class PositionStatusManager:
         logger.debug(f"🔧 [ZONE PARAMS] Market: {market_condition}, "
                     f"Tolerance: {self.zone_tolerance}, Min Strength: {self.min_zone_strength}")
     
-    def _classify_position_zone(self, position: Any, current_price: float, zones: Any) -> Dict[str, Any]:
-        """จำแนก Zone ของ Position"""
-        try:
-            position_price = getattr(position, 'price_open', 0.0)
-            position_type = getattr(position, 'type', 0)
-            
-            # ตรวจสอบว่า zones เป็น list หรือไม่
-            if not isinstance(zones, list) or not zones:
-                return {
-                    'type': 'standalone',
-                    'level': position_price,
-                    'strength': 0.0,
-                    'distance': float('inf')
-                }
-            
-            # หา Zone ที่ใกล้ที่สุด
-            closest_zone = None
-            min_distance = float('inf')
+    @staticmethod
+    def _build_zone_levels(zones: Any) -> Dict[str, Any]:
+        """
+        สร้างระดับ Zone เรียงจากน้อยไปมาก (ครั้งเดียวต่อรอบ)
+        
+        Args:
+            zones: {'support': [...], 'resistance': [...]} จาก ZoneAnalyzer.get_zones()
+                   หรือ list ของ zone dict (ใช้ key 'level' หรือ 'price')
             
-            for zone in zones:
-                # ตรวจสอบว่า zone เป็น dict หรือไม่
+        Returns:
+            Dict: levels (np.ndarray เรียงแล้ว), types, strengths ตามลำดับเดียวกัน
+        """
+        if isinstance(zones, dict):
+            grouped = [(zone_type, zone_list) for zone_type, zone_list in zones.items()
+                       if isinstance(zone_list, list)]
+        elif isinstance(zones, list):
+            grouped = [('unknown', zones)]
+        else:
+            grouped = []
+        
+        entries = []
+        for zone_type, zone_list in grouped:
+            for zone in zone_list:
                 if not isinstance(zone, dict):
                     continue
-                    
-                zone_level = zone.get('level', 0.0)
-                distance = abs(position_price - zone_level)
-                
-                if distance < min_distance:
-                    min_distance = distance
-                    closest_zone = zone
-            
-            if closest_zone and min_distance <= self.zone_tolerance:
-                return {
-                    'type': closest_zone.get('type', 'unknown'),
-                    'level': closest_zone.get('level', 0.0),
-                    'strength': closest_zone.get('strength', 0.0),
-                    'distance': min_distance
-                }
+                level = zone.get('level', zone.get('price'))
+                if level is None or level != level:  # ข้าม None / NaN
+                    continue
+                entries.append((float(level), zone.get('type', zone_type), zone.get('strength', 0.0)))
+        
+        entries.sort(key=lambda entry: entry[0])
+        return {
+            'levels': np.array([entry[0] for entry in entries], dtype=float),
+            'types': [entry[1] for entry in entries],
+            'strengths': [entry[2] for entry in entries]
+        }
+    
+    def _classify_position_zones(self, positions: List[Any], zone_levels: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        จำแนก Zone ของหลายไม้พร้อมกันด้วย searchsorted - O(N log Z)
+        
+        Args:
+            positions: รายการ Position ที่ต้องจำแนก
+            zone_levels: ผลจาก _build_zone_levels
+            
+        Returns:
+            List[Dict]: zone ของแต่ละไม้ ตามลำดับ positions
+        """
+        if not positions:
+            return []
+        
+        prices = np.fromiter((getattr(p, 'price_open', 0.0) for p in positions), dtype=float, count=len(positions))
+        levels = zone_levels['levels']
+        
+        if levels.size == 0:
+            return [{'type': 'standalone', 'level': float(price), 'strength': 0.0, 'distance': float('inf')}
+                    for price in prices]
+        
+        # Zone ที่ใกล้ที่สุดคือหนึ่งในสองระดับที่ขนาบราคาเปิด (ระยะเท่ากันเลือกระดับต่ำกว่า)
+        upper = np.searchsorted(levels, prices)
+        lower = np.clip(upper - 1, 0, levels.size - 1)
+        upper = np.clip(upper, 0, levels.size - 1)
+        lower_distance = np.abs(prices - levels[lower])
+        upper_distance = np.abs(prices - levels[upper])
+        nearest = np.where(upper_distance < lower_distance, upper, lower)
+        distances = np.minimum(lower_distance, upper_distance)
+        within = distances <= self.zone_tolerance
+        
+        types = zone_levels['types']
+        strengths = zone_levels['strengths']
+        results = []
+        for price, index, distance, in_zone in zip(prices.tolist(), nearest.tolist(),
+                                                   distances.tolist(), within.tolist()):
+            if in_zone:
+                results.append({'type': types[index], 'level': float(levels[index]),
+                                'strength': strengths[index], 'distance': distance})
             else:
-                return {
-                    'type': 'standalone',
-                    'level': position_price,
-                    'strength': 0.0,
-                    'distance': min_distance
-                }
-                
+                results.append({'type': 'standalone', 'level': price, 'strength': 0.0, 'distance': distance})
+        return results
+    
+    def _classify_position_zone(self, position: Any, current_price: float, zones: Any) -> Dict[str, Any]:
+        """จำแนก Zone ของ Position"""
+        try:
+            return self._classify_position_zones([position], self._build_zone_levels(zones))[0]
         except Exception as e:
             logger.error(f"❌ Error classifying zone: {e}")
             return {'type': 'unknown', 'level': 0.0, 'strength': 0.0, 'distance': float('inf')}
     
-    def _find_position_relationships(self, position: Any, all_positions: List[Any]) -> Dict[str, Any]:
-        """หา Relationships ของ Position"""
-        try:
-            relationships = {
-                'is_hedging': False,
-                'is_protecting_others': False,
-                'is_protected': False,
-                'has_assignment': False,
-                'hedge_target': None,
-                'hedge_ratio': '1:1',
-                'protecting': [],
-                'protected_by': None
-            }
-            
-            position_ticket = getattr(position, 'ticket', 0)
+    def _build_relationship_index(self, all_positions: List[Any]) -> Dict[str, Dict[int, Any]]:
+        """
+        สร้างดัชนีสำหรับหา Relationships แยกตามฝั่ง (type) ในรอบเดียว - O(N)
+        
+        เก็บตามลำดับเดิมของ all_positions เพื่อให้ผลตรงกับการสแกนทีละไม้
+        
+        Returns:
+            Dict: first_hedge_target (ไม้แรกที่ขาดทุน < -5 ต่อฝั่ง),
+                  losing (รายการไม้ขาดทุน < -2 ต่อฝั่ง - ใช้ร่วมกัน ห้ามแก้ไข),
+                  first_profitable (ไม้กำไรไม้แรกต่อฝั่ง),
+                  sides (ข้อมูลคู่ของแต่ละฝั่งจาก _build_side_relationships)
+        """
+        first_hedge_target = {}  # type -> (ลำดับ, position)
+        losing = {}
+        first_profitable = {}
+        
+        for order, position in enumerate(all_positions):
             position_type = getattr(position, 'type', 0)
-            position_profit = getattr(position, 'profit', 0.0)
-            
-            # หา Position ที่เป็นฝั่งตรงข้าม
-            opposite_positions = [
-                p for p in all_positions 
-                if getattr(p, 'ticket', 0) != position_ticket and 
-                   getattr(p, 'type', 0) != position_type
-            ]
-            
-            # ตรวจสอบ HG (Hedge Guard)
-            for opp_pos in opposite_positions:
-                opp_profit = getattr(opp_pos, 'profit', 0.0)
-                
-                # ถ้าไม้ฝั่งตรงข้ามขาดทุน และไม้นี้กำไร
-                if opp_profit < -5.0 and position_profit > 0:
-                    relationships['is_hedging'] = True
-                    relationships['hedge_target'] = {
-                        'ticket': getattr(opp_pos, 'ticket', 0),
-                        'direction': 'BUY' if getattr(opp_pos, 'type', 0) == 0 else 'SELL',
-                        'profit': opp_profit
-                    }
-                    relationships['hedge_ratio'] = self._calculate_hedge_ratio_string(position_profit, opp_profit)
-                    break
-            
-            # ตรวจสอบ Support Guard (ไม้ที่ค้ำไม้อื่น)
-            if position_profit > 0:
-                protected_positions = [
-                    p for p in all_positions 
-                    if getattr(p, 'ticket', 0) != position_ticket and 
-                       getattr(p, 'type', 0) == position_type and
-                       getattr(p, 'profit', 0.0) < -2.0
-                ]
-                
-                if protected_positions:
-                    relationships['is_protecting_others'] = True
-                    relationships['protecting'] = [
-                        {'ticket': getattr(p, 'ticket', 0), 'profit': getattr(p, 'profit', 0.0)}
-                        for p in protected_positions
-                    ]
-            
-            # ตรวจสอบ Protected (ไม้ที่ถูกค้ำ)
-            if position_profit < -2.0:
-                protector_positions = [
-                    p for p in all_positions 
-                    if getattr(p, 'ticket', 0) != position_ticket and 
-                       getattr(p, 'type', 0) == position_type and
-                       getattr(p, 'profit', 0.0) > 0
-                ]
-                
-                if protector_positions:
-                    relationships['is_protected'] = True
-                    relationships['protected_by'] = {
-                        'ticket': getattr(protector_positions[0], 'ticket', 0),
-                        'profit': getattr(protector_positions[0], 'profit', 0.0)
-                    }
-            
-            # ตรวจสอบ Assignment
-            relationships['has_assignment'] = (
-                relationships['is_hedging'] or 
-                relationships['is_protecting_others'] or 
-                relationships['is_protected']
-            )
-            
-            return relationships
-            
-        except Exception as e:
-            logger.error(f"❌ Error finding relationships: {e}")
-            return {'is_hedging': False, 'is_protecting_others': False, 'is_protected': False, 'has_assignment': False}
+            profit = getattr(position, 'profit', 0.0)
+            
+            if profit < -5.0 and position_type not in first_hedge_target:
+                first_hedge_target[position_type] = (order, position)
+            if profit < -2.0:
+                losing.setdefault(position_type, []).append(
+                    {'ticket': getattr(position, 'ticket', 0), 'profit': profit}
+                )
+            elif profit > 0 and position_type not in first_profitable:
+                first_profitable[position_type] = position
+        
+        relationship_index = {
+            'first_hedge_target': first_hedge_target,
+            'losing': losing,
+            'first_profitable': first_profitable
+        }
+        relationship_index['sides'] = {
+            position_type: self._build_side_relationships(position_type, relationship_index)
+            for position_type in {getattr(position, 'type', 0) for position in all_positions}
+        }
+        return relationship_index
     
-    def _determine_position_status(self, position: Any, zone: Dict[str, Any], 
-                                 relationships: Dict[str, Any]) -> str:
-        """กำหนดสถานะตามตัวอย่างที่ให้มา"""
-        try:
-            position_profit = getattr(position, 'profit', 0.0)
-            
-            # ตรวจสอบ HG ก่อน
-            if relationships.get('is_hedging'):
-                target_info = relationships['hedge_target']
-                ratio = relationships.get('hedge_ratio', '1:1')
-                return f"HG - ค้ำ {target_info['direction']} Zone {zone.get('type', 'unknown')} ({ratio})"
-                
-            # ตรวจสอบ Support Guard
-            elif relationships.get('is_protecting_others'):
-                protected_count = len(relationships['protecting'])
-                return f"Support Guard - ห้ามปิด ค้ำ {protected_count} ไม้"
-                
-            # ตรวจสอบ Protected
-            elif relationships.get('is_protected'):
-                protector = relationships['protected_by']
-                return f"Protected - มี HG ค้ำแล้ว รอช่วยเหลือ (โดย #{protector['ticket']})"
-                
-            # ตรวจสอบ Profit Helper
-            elif position_profit > 0 and not relationships.get('has_assignment'):
-                available_zones = self._find_zones_needing_help()
-                if available_zones:
-                    return f"Profit Helper - พร้อมช่วย Zone {available_zones[0]}"
-                else:
-                    return "Profit Helper - พร้อมช่วยเหลือ"
-                    
-            # สถานะ Default
-            else:
-                return "Standalone - ยังไม่มีหน้าที่"
-                
-        except Exception as e:
-            logger.error(f"❌ Error determining status: {e}")
-            return "Unknown - ข้อผิดพลาดในการวิเคราะห์"
+    def _build_side_relationships(self, position_type: int,
+                                  relationship_index: Dict[str, Dict[int, Any]]) -> Dict[str, Any]:
+        """
+        ข้อมูลคู่ที่ทุกไม้ในฝั่งเดียวกันใช้ร่วมกัน (สร้างครั้งเดียวต่อฝั่งต่อรอบ - ห้ามแก้ไข)
+        
+        Returns:
+            Dict: hedge_target (เป้า HG ฝั่งตรงข้าม), protecting (ไม้ขาดทุนฝั่งเดียวกัน),
+                  protected_by (ไม้ค้ำฝั่งเดียวกัน)
+        """
+        hedge_target = None
+        target = self._get_hedge_target(position_type, relationship_index)
+        if target is not None:
+            opp_pos = target[1]
+            hedge_target = {
+                'ticket': getattr(opp_pos, 'ticket', 0),
+                'direction': 'BUY' if getattr(opp_pos, 'type', 0) == 0 else 'SELL',
+                'profit': getattr(opp_pos, 'profit', 0.0)
+            }
+        
+        protected_by = None
+        protector = relationship_index['first_profitable'].get(position_type)
+        if protector is not None:
+            protected_by = {
+                'ticket': getattr(protector, 'ticket', 0),
+                'profit': getattr(protector, 'profit', 0.0)
+            }
+        
+        return {
+            'hedge_target': hedge_target,
+            'protecting': relationship_index['losing'].get(position_type, []),
+            'protected_by': protected_by
+        }
     
-    def _calculate_hedge_ratio(self, position: Any, relationships: Dict[str, Any]) -> Dict[str, Any]:
-        """คำนวณ Ratio สำหรับ HG"""
+    @staticmethod
+    def _get_hedge_target(position_type: int,
+                          relationship_index: Dict[str, Dict[int, Any]]) -> Optional[Tuple[int, Any]]:
+        """เป้า HG ของฝั่งนี้: ไม้แรก (ตามลำดับ) ของฝั่งอื่นที่ขาดทุน < -5"""
+        target = None
+        for target_type, (order, candidate) in relationship_index['first_hedge_target'].items():
+            if target_type != position_type and (target is None or order < target[0]):
+                target = (order, candidate)
+        return target
+    
+    def _find_position_relationships(self, position: Any, all_positions: List[Any],
+                                     relationship_index: Optional[Dict[str, Dict[int, Any]]] = None) -> Dict[str, Any]:
+        """
+        หา Relationships ของ Position
+        
+        Args:
+            position: Position ที่ต้องการหา
+            all_positions: Position ทั้งหมด
+            relationship_index: ผลจาก _build_relationship_index (None = สร้างใหม่)
+        """
         try:
-            if not relationships.get('is_hedging'):
-                return {'ratio': '1:1', 'strength': 0.0}
+            if relationship_index is None:
+                relationship_index = self._build_relationship_index(all_positions)
             
+            position_type = getattr(position, 'type', 0)
             position_profit = getattr(position, 'profit', 0.0)
-            target_profit = relationships['hedge_target']['profit']
             
-            if target_profit == 0:
-                return {'ratio': '1:1', 'strength': 0.0}
+            side = relationship_index['sides'].get(position_type)
+            if side is None:
+                side = self._build_side_relationships(position_type, relationship_index)
             
-            ratio_value = abs(position_profit / target_profit)
-            ratio_string = f"{ratio_value:.1f}:1"
+            # HG (Hedge Guard): ไม้ฝั่งตรงข้ามไม้แรกที่ขาดทุน (< -5) ขณะที่ไม้นี้กำไร
+            # Support Guard: ไม้กำไรค้ำไม้ขาดทุน < -2 ฝั่งเดียวกัน
+            # Protected: ไม้ขาดทุน < -2 ที่มีไม้กำไรฝั่งเดียวกัน
+            hedge_target = side['hedge_target'] if position_profit > 0 else None
+            protecting = side['protecting'] if position_profit > 0 else []
+            protected_by = side['protected_by'] if position_profit < -2.0 else None
             
-            # คำนวณความแข็งแกร่งของ HG
-            strength = min(ratio_value, 2.0) / 2.0  # 0-1 scale
+            is_hedging = hedge_target is not None
+            is_protecting_others = bool(protecting)
+            is_protected = protected_by is not None
             
             return {
-                'ratio': ratio_string,
-                'strength': strength,
-                'position_profit': position_profit,
-                'target_profit': target_profit
+                'is_hedging': is_hedging,
+                'is_protecting_others': is_protecting_others,
+                'is_protected': is_protected,
+                'has_assignment': is_hedging or is_protecting_others or is_protected,
+                'hedge_target': hedge_target,
+                'hedge_ratio': (self._calculate_hedge_ratio_string(position_profit, hedge_target['profit'])
+                                if is_hedging else '1:1'),
+                'protecting': protecting if is_protecting_others else [],
+                'protected_by': protected_by
             }
             
         except Exception as e:
-            logger.error(f"❌ Error calculating hedge ratio: {e}")
-            return {'ratio': '1:1', 'strength': 0.0}
+            logger.error(f"❌ Error finding relationships: {e}")
+            return {'is_hedging': False, 'is_protecting_others': False, 'is_protected': False, 'has_assignment': False}
     
     def _calculate_hedge_ratio_string(self, position_profit: float, target_profit: float) -> str:
         """คำนวณ Ratio String"""
@@ -375,29 +727,28 @@ class PositionStatusManager:
             if not status_results:
                 return
             
-            # นับสถานะต่างๆ
+            # นับสถานะต่างๆ ตามรหัส
             status_counts = {}
             for status_obj in status_results.values():
-                status_type = status_obj.status.split(' - ')[0]
-                status_counts[status_type] = status_counts.get(status_type, 0) + 1
+                status_counts[status_obj.code] = status_counts.get(status_obj.code, 0) + 1
             
             # Log สรุป
             summary_parts = []
-            for status_type, count in status_counts.items():
-                summary_parts.append(f"{status_type}: {count}")
+            for code, count in status_counts.items():
+                summary_parts.append(f"{STATUS_LABELS[code]}: {count}")
             
             logger.info(f"📊 [STATUS SUMMARY] {', '.join(summary_parts)}")
             
-            # Log ไม้ที่มีสถานะพิเศษ
+            # Log ไม้ที่มีสถานะพิเศษ (สร้างข้อความเฉพาะไม้เหล่านี้)
             special_positions = [
-                (ticket, status_obj.status) 
+                (ticket, status_obj) 
                 for ticket, status_obj in status_results.items() 
-                if 'HG' in status_obj.status or 'Support Guard' in status_obj.status
+                if status_obj.code in (PositionStatusCode.HEDGE_GUARD, PositionStatusCode.SUPPORT_GUARD)
             ]
             
-            if special_positions:
-                for ticket, status in special_positions:
-                    logger.info(f"🎯 [SPECIAL STATUS] #{ticket}: {status}")
+            if special_positions and logger.isEnabledFor(logging.INFO):
+                for ticket, status_obj in special_positions:
+                    logger.info(f"🎯 [SPECIAL STATUS] #{ticket}: {status_obj.status}")
                     
         except Exception as e:
             logger.error(f"❌ Error logging analysis summary: {e}")
@@ -410,8 +761,26 @@ class PositionStatusManager:
         """ดึงสถานะทั้งหมด"""
         return self.status_cache.copy()
     
+    def add_analysis_callback(self, callback: Callable):
+        """เพิ่ม callback(status_results) เมื่อวิเคราะห์สถานะรอบใหม่เสร็จ (ไม่เรียกเมื่อคืนค่าจาก cache)"""
+        if callback not in self.analysis_callbacks:
+            self.analysis_callbacks.append(callback)
+    
+    def remove_analysis_callback(self, callback: Callable):
+        """ลบ analysis callback"""
+        if callback in self.analysis_callbacks:
+            self.analysis_callbacks.remove(callback)
+    
+    def get_portfolio_totals(self) -> Dict[str, float]:
+        """ยอดรวม volume / กำไรฝั่ง BUY-SELL จากการวิเคราะห์รอบล่าสุด"""
+        return dict(self.portfolio_totals)
+    
     def clear_cache(self):
         """ล้าง Cache"""
         self.status_cache.clear()
+        self._profit_classes = {}
+        self._zone_cache = {}
+        self._zones_signature = None
+        self._relationship_signature = {}
         self.last_analysis_time = 0
         logger.info("🧹 [CACHE] Cleared position status cache")
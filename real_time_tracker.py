@@ -7,11 +7,12 @@ Real Time Tracker
 import logging
 import time
 import asyncio
-from typing import Dict, List, Any, Optional, Callable
+from typing import Dict, List, Any, Optional, Callable, Tuple
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 import threading
-from queue import Queue
+from collections import OrderedDict, deque
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +45,233 @@ class AlertThreshold:
     position_closed: bool = True
     status_change: bool = True
 
+class PriceHistoryBuffer:
+    """
+    ประวัติราคาแบบ ring buffer ขนาดคงที่ เรียงตามเวลา
+    
+    append / evict เป็น O(1) และหาช่วงเวลาด้วย binary search O(log n)
+    เวลาที่ย้อนหลังกว่าค่าล่าสุดจะถูกปรับเป็นค่าล่าสุด เพื่อให้ข้อมูลเรียงเสมอ
+    """
+    
+    def __init__(self, capacity: int = 100):
+        """
+        Args:
+            capacity: จำนวนราคาล่าสุดที่เก็บ
+        """
+        self.capacity = capacity
+        self._timestamps = np.zeros(capacity, dtype=np.float64)
+        self._prices = np.zeros(capacity, dtype=np.float64)
+        self._head = 0  # ตำแหน่งที่จะเขียนถัดไป
+        self._count = 0
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def append(self, timestamp: float, price: float):
+        """เพิ่มราคา - เมื่อเต็มจะเขียนทับราคาเก่าสุด O(1)"""
+        with self._lock:
+            if self._count:
+                timestamp = max(timestamp, self._timestamps[(self._head - 1) % self.capacity])
+            self._timestamps[self._head] = timestamp
+            self._prices[self._head] = price
+            self._head = (self._head + 1) % self.capacity
+            if self._count < self.capacity:
+                self._count += 1
+    
+    def _segments(self) -> List[slice]:
+        """ช่วงของ array ตามลำดับเวลา (เก่า -> ใหม่) - ไม่เกิน 2 ช่วง"""
+        if self._count < self.capacity:
+            return [slice(0, self._count)]
+        return [slice(self._head, self.capacity), slice(0, self._head)]
+    
+    def get_range(self, start_time: float, end_time: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        ราคาในช่วงเวลา [start_time, end_time]
+        
+        Returns:
+            Tuple: (timestamps, prices) เรียงจากเก่าไปใหม่ (สำเนา)
+        """
+        if end_time is None:
+            end_time = float('inf')
+        with self._lock:
+            timestamps, prices = [], []
+            for segment in self._segments():
+                segment_times = self._timestamps[segment]
+                left = np.searchsorted(segment_times, start_time, side='left')
+                right = np.searchsorted(segment_times, end_time, side='right')
+                if right > left:
+                    timestamps.append(segment_times[left:right])
+                    prices.append(self._prices[segment][left:right])
+            if not timestamps:
+                return np.empty(0), np.empty(0)
+            return np.concatenate(timestamps), np.concatenate(prices)
+    
+    def latest(self, limit: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        ราคาล่าสุด limit ค่า
+        
+        Returns:
+            Tuple: (timestamps, prices) เรียงจากเก่าไปใหม่ (สำเนา)
+        """
+        with self._lock:
+            limit = max(0, min(limit, self._count))
+            index = (np.arange(self._head - limit, self._head)) % self.capacity
+            return self._timestamps[index], self._prices[index]
+    
+    def clear(self):
+        """ล้างประวัติ"""
+        with self._lock:
+            self._head = 0
+            self._count = 0
+
+class LatencyStats:
+    """
+    ค่าหน่วงเวลา (ms) แบบ rolling window
+    
+    เก็บค่าล่าสุด (deque จำกัดขนาด) และคำนวณ percentile เมื่อถูกเรียกดู
+    """
+    
+    def __init__(self, window: int = 1000):
+        """
+        Args:
+            window: จำนวนค่าล่าสุดที่เก็บ
+        """
+        self._samples = deque(maxlen=window)
+        self.total_count = 0
+        self._lock = threading.Lock()
+    
+    def record(self, value_ms: float):
+        """บันทึกค่าหน่วงเวลา (ms)"""
+        with self._lock:
+            self._samples.append(value_ms)
+            self.total_count += 1
+    
+    def get_summary(self) -> Dict[str, float]:
+        """
+        สรุปสถิติ rolling
+        
+        Returns:
+            Dict: count (ใน window), total_count, avg, p50, p95, p99, max (ms)
+        """
+        with self._lock:
+            samples = np.fromiter(self._samples, dtype=np.float64, count=len(self._samples))
+            total_count = self.total_count
+        
+        if samples.size == 0:
+            return {'count': 0, 'total_count': total_count}
+        
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+        return {
+            'count': int(samples.size),
+            'total_count': total_count,
+            'avg': float(samples.mean()),
+            'p50': float(p50),
+            'p95': float(p95),
+            'p99': float(p99),
+            'max': float(samples.max())
+        }
+
+class CoalescingUpdateQueue:
+    """
+    คิว update สำหรับผู้อ่าน (เช่น GUI) แบบจำกัดขนาด
+    
+    - update ชนิดและ key เดียวกันที่ยังไม่ถูกอ่านจะถูกรวม: เก็บค่าล่าสุดไว้ที่ตำแหน่งเดิมในคิว
+    - เมื่อคิวเต็มจะทิ้ง update เก่าสุด
+    ผู้อ่านที่ช้าจึงได้เฉพาะค่าล่าสุดของแต่ละรายการ และหน่วยความจำไม่โตตามเวลา
+    """
+    
+    def __init__(self, maxsize: int = 500):
+        """
+        Args:
+            maxsize: จำนวน update สูงสุดที่ค้างในคิว
+        """
+        self.maxsize = maxsize
+        self._items = OrderedDict()  # (kind, key) -> payload
+        self._not_empty = threading.Condition(threading.Lock())
+        self.coalesced: Dict[str, int] = {}  # ชนิด -> จำนวนที่ถูกรวม
+        self.dropped: Dict[str, int] = {}    # ชนิด -> จำนวนที่ถูกทิ้งเพราะคิวเต็ม
+    
+    def put(self, kind: str, payload: Any, key: Any = None):
+        """
+        เพิ่ม update (ไม่ block)
+        
+        Args:
+            kind: ชนิด update ('price', 'position', 'status')
+            payload: ข้อมูล
+            key: key สำหรับรวม update ชนิดเดียวกัน (เช่น ticket) - None = ค่าเดียวต่อชนิด
+        """
+        with self._not_empty:
+            item_key = (kind, key)
+            if item_key in self._items:
+                self.coalesced[kind] = self.coalesced.get(kind, 0) + 1
+            elif len(self._items) >= self.maxsize:
+                (dropped_kind, _), _ = self._items.popitem(last=False)
+                self.dropped[dropped_kind] = self.dropped.get(dropped_kind, 0) + 1
+            self._items[item_key] = payload
+            self._not_empty.notify()
+    
+    def get(self, timeout: Optional[float] = None) -> Optional[Tuple[str, Any]]:
+        """
+        อ่าน update เก่าสุด
+        
+        Args:
+            timeout: วินาทีที่รอ (None = รอจนมีข้อมูล, 0 = ไม่รอ)
+            
+        Returns:
+            Tuple: (kind, payload) หรือ None ถ้าหมดเวลา
+        """
+        with self._not_empty:
+            if not self._items and timeout != 0:
+                self._not_empty.wait_for(lambda: self._items, timeout)
+            if not self._items:
+                return None
+            (kind, _), payload = self._items.popitem(last=False)
+            return kind, payload
+    
+    def drain(self, max_items: Optional[int] = None) -> List[Tuple[str, Any]]:
+        """อ่าน update ที่ค้างทั้งหมด (หรือไม่เกิน max_items) โดยไม่รอ"""
+        with self._not_empty:
+            count = len(self._items) if max_items is None else min(max_items, len(self._items))
+            return [(kind, payload) for (kind, _), payload in
+                    (self._items.popitem(last=False) for _ in range(count))]
+    
+    def qsize(self) -> int:
+        return len(self._items)
+    
+    def empty(self) -> bool:
+        return not self._items
+    
+    def clear(self):
+        """ล้างคิว"""
+        with self._not_empty:
+            self._items.clear()
+
+class _TrackedPosition:
+    """ค่าล่าสุดของ Position ที่ติดตาม (แก้ไขในที่เดิมทุกรอบ ไม่สร้างใหม่)"""
+    __slots__ = ('ticket', 'profit', 'volume', 'type', 'price_open', 'price_current')
+    
+    def __init__(self, position: Any):
+        self.ticket = getattr(position, 'ticket', 0)
+        self.update(position)
+    
+    def update(self, position: Any):
+        self.profit = getattr(position, 'profit', 0.0)
+        self.volume = getattr(position, 'volume', 0.0)
+        self.type = getattr(position, 'type', 0)
+        self.price_open = getattr(position, 'price_open', 0.0)
+        self.price_current = getattr(position, 'price_current', 0.0)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'ticket': self.ticket,
+            'profit': self.profit,
+            'volume': self.volume,
+            'type': self.type,
+            'price_open': self.price_open,
+            'price_current': self.price_current
+        }
+
 class RealTimeTracker:
     """ตัวหลักในการติดตาม Real-time Changes"""
     
@@ -61,24 +289,45 @@ class RealTimeTracker:
         self.price_change_threshold = 5.0  # 5 pips
         
         # 📊 Monitoring Data
-        self.price_history = {}
-        self.position_history = {}
-        self.status_history = {}
         self.max_history_size = 100
+        self.price_history = PriceHistoryBuffer(self.max_history_size)
+        self.position_history: Dict[int, _TrackedPosition] = {}  # ticket -> ค่าล่าสุด
+        self.status_history = {}
         
         # 🔄 Threading
         self.monitoring_thread = None
-        self.stop_monitoring = False
-        self.update_queue = Queue()
+        self._stop_event = threading.Event()
+        self.update_queue = CoalescingUpdateQueue()
+        self.update_queue_enabled = False  # เก็บ update เข้าคิวเฉพาะเมื่อมีผู้อ่าน (enable_update_queue)
+        
+        # 📡 Event-driven: รับข้อมูลจาก publisher ต่อรอบ (PortfolioSnapshot / ผลวิเคราะห์สถานะ)
+        # เก็บเฉพาะค่าล่าสุดที่ยังไม่ได้ประมวลผล - ข้อมูลที่มาถี่กว่าที่ประมวลผลทันจะถูกรวม (coalesce)
+        self._pending_lock = threading.Lock()
+        self._pending_snapshot = None
+        self._pending_statuses = None
+        self._wake_event = threading.Event()
+        self._subscribed = False
+        self._last_positions = None  # tuple ของ snapshot ล่าสุดที่เปรียบเทียบแล้ว
+        self.coalesced_snapshots = 0
+        self.coalesced_status_updates = 0
         
         # 📈 Performance Metrics
         self.update_count = 0
-        self.last_performance_check = 0
+        self.last_performance_check = time.time()
         self.performance_metrics = {
             'avg_update_time': 0.0,
-            'updates_per_second': 0.0,
-            'memory_usage': 0.0
+            'updates_per_second': 0.0
         }
+        # publish_to_callback: เวลาที่ publisher เผยแพร่ snapshot -> เริ่มเรียก price callbacks
+        # order_fill: ส่งคำสั่งเปิด -> terminal ตอบกลับ (จาก OrderManager.execution_stats)
+        # update_processing: เวลาประมวลผลข้อมูลหนึ่งรอบใน monitoring thread
+        self.latency_stats = {
+            'publish_to_callback': LatencyStats(),
+            'order_fill': LatencyStats(),
+            'update_processing': LatencyStats()
+        }
+        self.callback_stats: Dict[str, LatencyStats] = {}  # ชื่อ callback@id -> เวลาทำงาน
+        self._callback_latency: Dict[int, Tuple[str, LatencyStats]] = {}  # id(callback) -> (ชื่อ, สถิติ)
         
         # 🎯 Callbacks
         self.status_change_callbacks = []
@@ -92,7 +341,9 @@ class RealTimeTracker:
                 logger.warning("⚠️ [MONITORING] Already running")
                 return
             
-            self.stop_monitoring = False
+            self._subscribe()
+            
+            self._stop_event.clear()
             self.monitoring_thread = threading.Thread(target=self._monitoring_loop, daemon=True)
             self.monitoring_thread.start()
             
@@ -101,103 +352,172 @@ class RealTimeTracker:
         except Exception as e:
             logger.error(f"❌ Error starting monitoring: {e}")
     
-    def stop_monitoring(self):
-        """หยุดการติดตาม Real-time"""
+    def stop_monitoring(self, timeout: float = 5.0) -> bool:
+        """
+        หยุดการติดตาม Real-time และรอ monitoring thread จบ
+        
+        Args:
+            timeout: วินาทีสูงสุดที่รอ thread จบ
+            
+        Returns:
+            bool: True ถ้า thread จบภายในเวลา
+        """
         try:
-            self.stop_monitoring = True
-            if self.monitoring_thread:
-                self.monitoring_thread.join(timeout=5.0)
+            self._unsubscribe()
+            self._stop_event.set()
+            self._wake_event.set()  # ปลุก thread ที่รอข้อมูลอยู่ให้เห็น stop ทันที
+            
+            thread = self.monitoring_thread
+            if thread and thread is not threading.current_thread():
+                thread.join(timeout=timeout)
+            
+            if thread and thread.is_alive():
+                logger.warning(f"⚠️ [MONITORING] Thread did not stop within {timeout:.1f}s")
+                return False
+            
+            self.monitoring_thread = None
+            with self._pending_lock:
+                self._pending_snapshot = None
+                self._pending_statuses = None
             
             logger.info("🛑 [MONITORING] Stopped real-time tracking")
+            return True
             
         except Exception as e:
             logger.error(f"❌ Error stopping monitoring: {e}")
+            return False
+    
+    def _subscribe(self):
+        """สมัครรับข้อมูลจาก PortfolioManager (snapshot ต่อรอบ) และ PositionStatusManager (ผลวิเคราะห์)"""
+        if self._subscribed:
+            return
+        
+        portfolio_manager = getattr(self.trading_system, 'portfolio_manager', None)
+        if portfolio_manager is not None and hasattr(portfolio_manager, 'add_snapshot_callback'):
+            portfolio_manager.add_snapshot_callback(self.on_snapshot_published)
+        
+        status_manager = getattr(self.trading_system, 'status_manager', None)
+        if status_manager is not None and hasattr(status_manager, 'add_analysis_callback'):
+            status_manager.add_analysis_callback(self.on_status_analysis)
+        
+        execution_stats = getattr(getattr(self.trading_system, 'order_manager', None), 'execution_stats', None)
+        if execution_stats is not None and hasattr(execution_stats, 'add_record_callback'):
+            execution_stats.add_record_callback(self.on_execution_recorded)
+        
+        self._subscribed = True
+    
+    def _unsubscribe(self):
+        """ยกเลิกการรับข้อมูลจาก publisher"""
+        if not self._subscribed:
+            return
+        
+        portfolio_manager = getattr(self.trading_system, 'portfolio_manager', None)
+        if portfolio_manager is not None and hasattr(portfolio_manager, 'remove_snapshot_callback'):
+            portfolio_manager.remove_snapshot_callback(self.on_snapshot_published)
+        
+        status_manager = getattr(self.trading_system, 'status_manager', None)
+        if status_manager is not None and hasattr(status_manager, 'remove_analysis_callback'):
+            status_manager.remove_analysis_callback(self.on_status_analysis)
+        
+        execution_stats = getattr(getattr(self.trading_system, 'order_manager', None), 'execution_stats', None)
+        if execution_stats is not None and hasattr(execution_stats, 'remove_record_callback'):
+            execution_stats.remove_record_callback(self.on_execution_recorded)
+        
+        self._subscribed = False
+    
+    def on_snapshot_published(self, snapshot: Any):
+        """
+        รับ PortfolioSnapshot ใหม่ (เรียกบน thread ของ trading loop - แค่เก็บค่าแล้วปลุก monitoring thread)
+        
+        Args:
+            snapshot: PortfolioSnapshot ที่เพิ่งเผยแพร่
+        """
+        with self._pending_lock:
+            if self._pending_snapshot is not None:
+                self.coalesced_snapshots += 1
+            self._pending_snapshot = snapshot
+        self._wake_event.set()
+    
+    def on_execution_recorded(self, execution: Any):
+        """
+        รับ ExecutionRecord จาก OrderManager (เรียกบน thread ที่ส่งคำสั่ง)
+        
+        Args:
+            execution: ExecutionRecord ของคำสั่งที่เพิ่งได้ผลจาก terminal
+        """
+        if execution.kind == 'open' and execution.success:
+            self.latency_stats['order_fill'].record(execution.latency_ms)
+    
+    def on_status_analysis(self, status_results: Dict[int, Any]):
+        """
+        รับผลวิเคราะห์สถานะรอบใหม่ (เรียกบน thread ที่วิเคราะห์ - แค่เก็บค่าแล้วปลุก monitoring thread)
+        
+        Args:
+            status_results: ผลจาก PositionStatusManager.analyze_all_positions
+        """
+        with self._pending_lock:
+            if self._pending_statuses is not None:
+                self.coalesced_status_updates += 1
+            self._pending_statuses = status_results
+        self._wake_event.set()
     
     def _monitoring_loop(self):
-        """Loop หลักในการติดตาม"""
+        """Loop หลักในการติดตาม - ทำงานเมื่อ publisher ส่งข้อมูลใหม่ (ไม่อ่าน MT5 เอง)"""
         try:
-            while not self.stop_monitoring:
-                current_time = time.time()
+            while not self._stop_event.is_set():
+                # รอข้อมูลใหม่ (timeout ใช้ตรวจ stop เท่านั้น)
+                if not self._wake_event.wait(timeout=1.0):
+                    continue
+                self._wake_event.clear()
+                if self._stop_event.is_set():
+                    break
+                
+                # หยิบเฉพาะข้อมูลล่าสุด - ข้อมูลที่มาระหว่างประมวลผลจะปลุกรอบถัดไป
+                with self._pending_lock:
+                    snapshot, self._pending_snapshot = self._pending_snapshot, None
+                    statuses, self._pending_statuses = self._pending_statuses, None
                 
-                # ตรวจสอบการเปลี่ยนแปลงราคา
-                self._check_price_changes()
+                started = time.perf_counter()
                 
-                # ตรวจสอบการเปลี่ยนแปลง Position
-                self._check_position_changes()
+                if snapshot is not None:
+                    self._process_snapshot(snapshot)
                 
-                # ตรวจสอบการเปลี่ยนแปลงสถานะ
-                self._check_status_changes()
+                if statuses is not None:
+                    self._compare_statuses(statuses, time.time())
                 
                 # อัพเดท Performance Metrics
+                self.latency_stats['update_processing'].record((time.perf_counter() - started) * 1000)
+                self.update_count += 1
                 self._update_performance_metrics()
                 
-                # รอสักครู่ก่อนตรวจสอบครั้งต่อไป
-                time.sleep(0.5)  # ตรวจสอบทุก 0.5 วินาที
-                
         except Exception as e:
             logger.error(f"❌ Error in monitoring loop: {e}")
     
-    def _check_price_changes(self):
-        """ตรวจสอบการเปลี่ยนแปลงราคา"""
+    def _process_snapshot(self, snapshot: Any):
+        """ตรวจการเปลี่ยนแปลงราคาและ Position จาก snapshot"""
         try:
-            if not hasattr(self.trading_system, 'mt5_connection'):
-                return
+            current_time = snapshot.timestamp
             
-            # ดึงราคาปัจจุบัน
-            current_price = self._get_current_price()
-            if current_price == 0:
-                return
-            
-            current_time = time.time()
-            
-            # ตรวจสอบว่าต้องอัพเดทหรือไม่
-            if self._should_update_price(current_price, current_time):
+            # ราคาที่ trading loop อ่านมาแล้วในรอบนั้น
+            current_price = getattr(snapshot, 'current_price', 0.0)
+            if current_price > 0 and self._should_update_price(current_price, current_time):
                 self._update_price_tracking(current_price, current_time)
-                
-        except Exception as e:
-            logger.error(f"❌ Error checking price changes: {e}")
-    
-    def _check_position_changes(self):
-        """ตรวจสอบการเปลี่ยนแปลง Position"""
-        try:
-            if not hasattr(self.trading_system, 'order_manager'):
-                return
-            
-            # ดึง Position ปัจจุบัน
-            current_positions = self._get_current_positions()
-            if not current_positions:
-                return
-            
-            current_time = time.time()
-            
-            # เปรียบเทียบกับ Position เก่า
-            self._compare_positions(current_positions, current_time)
-            
-        except Exception as e:
-            logger.error(f"❌ Error checking position changes: {e}")
-    
-    def _check_status_changes(self):
-        """ตรวจสอบการเปลี่ยนแปลงสถานะ"""
-        try:
-            if not hasattr(self.trading_system, 'status_manager'):
-                return
-            
-            # ดึงสถานะปัจจุบัน
-            current_statuses = self.trading_system.status_manager.get_all_statuses()
-            if not current_statuses:
-                return
-            
-            current_time = time.time()
-            
-            # เปรียบเทียบกับสถานะเก่า
-            self._compare_statuses(current_statuses, current_time)
             
+            # PortfolioManager ใช้ tuple เดิมเมื่อ Position ไม่เปลี่ยน - เปรียบเทียบเฉพาะเมื่อเป็น tuple ใหม่
+            if snapshot.positions is not self._last_positions:
+                self._last_positions = snapshot.positions
+                self._compare_positions(snapshot.positions, current_time)
+                
         except Exception as e:
-            logger.error(f"❌ Error checking status changes: {e}")
+            logger.error(f"❌ Error processing snapshot: {e}")
     
     def _should_update_price(self, current_price: float, current_time: float) -> bool:
         """ตรวจสอบว่าควรอัพเดทราคาหรือไม่"""
         try:
+            # ราคาไม่เปลี่ยน - ไม่ต้องแจ้ง
+            if current_price == self.last_price:
+                return False
+            
             # ตรวจสอบการเปลี่ยนแปลงราคา
             if self.last_price > 0:
                 price_change = abs(current_price - self.last_price)
@@ -228,7 +548,8 @@ class RealTimeTracker:
             self.last_price = current_price
             self.last_update = current_time
             
-            # เรียก Callbacks
+            # เรียก Callbacks (current_time = เวลาที่ publisher เผยแพร่ข้อมูล)
+            self.latency_stats['publish_to_callback'].record(max(0.0, time.time() - current_time) * 1000)
             self._trigger_price_change_callbacks(current_price, current_time)
             
             # อัพเดท Status Tracker
@@ -242,67 +563,62 @@ class RealTimeTracker:
     def _store_price_history(self, price: float, timestamp: float):
         """เก็บประวัติราคา"""
         try:
-            self.price_history[timestamp] = price
-            
-            # จำกัดขนาดประวัติ
-            if len(self.price_history) > self.max_history_size:
-                oldest_key = min(self.price_history.keys())
-                del self.price_history[oldest_key]
+            self.price_history.append(timestamp, price)
                 
         except Exception as e:
             logger.error(f"❌ Error storing price history: {e}")
     
     def _compare_positions(self, current_positions: List[Any], current_time: float):
-        """เปรียบเทียบ Position เก่าและใหม่"""
+        """
+        เปรียบเทียบ Position เก่าและใหม่แบบ incremental ตาม ticket
+        
+        แก้ไขค่าที่ติดตามในที่เดิม - สร้าง object เฉพาะไม้ที่เปิด/ปิด/เปลี่ยนแปลง
+        """
         try:
-            # สร้าง Dictionary ของ Position ปัจจุบัน
-            current_pos_dict = {
-                getattr(pos, 'ticket', 0): {
-                    'ticket': getattr(pos, 'ticket', 0),
-                    'profit': getattr(pos, 'profit', 0.0),
-                    'volume': getattr(pos, 'volume', 0.0),
-                    'type': getattr(pos, 'type', 0),
-                    'price_open': getattr(pos, 'price_open', 0.0),
-                    'price_current': getattr(pos, 'price_current', 0.0)
-                }
-                for pos in current_positions
-            }
-            
-            # เปรียบเทียบกับ Position เก่า
-            old_positions = self.position_history.get('last_positions', {})
+            tracked = self.position_history
+            previous_count = len(tracked)
+            matched = 0
             
-            # ตรวจสอบ Position ใหม่
-            new_tickets = set(current_pos_dict.keys()) - set(old_positions.keys())
-            for ticket in new_tickets:
-                self._handle_position_opened(current_pos_dict[ticket], current_time)
-            
-            # ตรวจสอบ Position ที่ปิด
-            closed_tickets = set(old_positions.keys()) - set(current_pos_dict.keys())
-            for ticket in closed_tickets:
-                self._handle_position_closed(ticket, old_positions[ticket], current_time)
-            
-            # ตรวจสอบ Position ที่เปลี่ยนแปลง
-            for ticket, current_pos in current_pos_dict.items():
-                if ticket in old_positions:
-                    old_pos = old_positions[ticket]
-                    if self._position_changed(old_pos, current_pos):
-                        self._handle_position_modified(old_pos, current_pos, current_time)
+            for position in current_positions:
+                ticket = getattr(position, 'ticket', 0)
+                record = tracked.get(ticket)
+                
+                # ตรวจสอบ Position ใหม่
+                if record is None:
+                    record = _TrackedPosition(position)
+                    tracked[ticket] = record
+                    self._handle_position_opened(record.to_dict(), current_time)
+                    continue
+                
+                matched += 1
+                
+                # ตรวจสอบ Position ที่เปลี่ยนแปลง (เทียบกับรอบก่อน) - สร้าง dict เฉพาะไม้ที่จะแจ้งเตือน
+                if self._position_changed(record.profit, getattr(position, 'profit', 0.0)):
+                    old_position = record.to_dict()
+                    record.update(position)
+                    self._handle_position_modified(old_position, record.to_dict(), current_time)
+                else:
+                    record.update(position)
             
-            # อัพเดทประวัติ
-            self.position_history['last_positions'] = current_pos_dict
+            # ตรวจสอบ Position ที่ปิด - ต้องสแกนเฉพาะเมื่อมีไม้เดิมหายไป
+            if matched < previous_count:
+                current_tickets = {getattr(position, 'ticket', 0) for position in current_positions}
+                for ticket in [ticket for ticket in tracked if ticket not in current_tickets]:
+                    self._handle_position_closed(ticket, tracked.pop(ticket).to_dict(), current_time)
             
         except Exception as e:
             logger.error(f"❌ Error comparing positions: {e}")
     
     def _compare_statuses(self, current_statuses: Dict[int, Any], current_time: float):
-        """เปรียบเทียบสถานะเก่าและใหม่"""
+        """เปรียบเทียบสถานะเก่าและใหม่ (เทียบ display_key - สร้างข้อความเฉพาะไม้ที่เปลี่ยน)"""
         try:
             old_statuses = self.status_history.get('last_statuses', {})
             
             for ticket, current_status in current_statuses.items():
-                if ticket in old_statuses:
-                    old_status = old_statuses[ticket]
-                    if old_status.status != current_status.status:
+                old_status = old_statuses.get(ticket)
+                if old_status is not None and old_status is not current_status:
+                    if (old_status.code != current_status.code or
+                            old_status.display_key != current_status.display_key):
                         self._handle_status_changed(ticket, old_status, current_status, current_time)
             
             # อัพเดทประวัติ
@@ -311,15 +627,15 @@ class RealTimeTracker:
         except Exception as e:
             logger.error(f"❌ Error comparing statuses: {e}")
     
-    def _position_changed(self, old_pos: Dict, new_pos: Dict) -> bool:
-        """ตรวจสอบว่า Position เปลี่ยนแปลงหรือไม่"""
+    def _position_changed(self, old_profit: float, new_profit: float) -> bool:
+        """
+        ตรวจสอบว่า Position เปลี่ยนแปลงถึงเกณฑ์แจ้งเตือนหรือไม่
+        
+        ราคาเปลี่ยนแทบทุก tick จึงไม่นับเป็นการเปลี่ยนแปลง - _handle_position_modified
+        แจ้งเฉพาะกำไรที่เปลี่ยนถึง alert_thresholds.profit_change อยู่แล้ว
+        """
         try:
-            # ตรวจสอบการเปลี่ยนแปลงที่สำคัญ
-            profit_change = abs(new_pos['profit'] - old_pos['profit'])
-            price_change = abs(new_pos['price_current'] - old_pos['price_current'])
-            
-            return (profit_change >= self.alert_thresholds.profit_change or 
-                   price_change >= 0.001)  # 0.1 pips
+            return abs(new_profit - old_profit) >= self.alert_thresholds.profit_change
             
         except Exception as e:
             logger.error(f"❌ Error checking position change: {e}")
@@ -376,39 +692,19 @@ class RealTimeTracker:
         except Exception as e:
             logger.error(f"❌ Error handling status changed: {e}")
     
-    def _get_current_price(self) -> float:
-        """ดึงราคาปัจจุบัน"""
-        try:
-            if hasattr(self.trading_system, 'mt5_connection'):
-                symbol = getattr(self.trading_system, 'actual_symbol', 'XAUUSD')
-                tick = self.trading_system.mt5_connection.get_current_tick(symbol)
-                if tick:
-                    return (tick['bid'] + tick['ask']) / 2
-            return 0.0
-            
-        except Exception as e:
-            logger.error(f"❌ Error getting current price: {e}")
-            return 0.0
-    
-    def _get_current_positions(self) -> List[Any]:
-        """ดึง Position ปัจจุบัน"""
-        try:
-            if hasattr(self.trading_system, 'order_manager'):
-                return self.trading_system.order_manager.get_positions()
-            return []
-            
-        except Exception as e:
-            logger.error(f"❌ Error getting current positions: {e}")
-            return []
-    
     def _trigger_price_change_callbacks(self, price: float, timestamp: float):
         """เรียก Price Change Callbacks"""
         try:
+            if self.update_queue_enabled:
+                self.update_queue.put('price', {'price': price, 'timestamp': timestamp})
+            
             for callback in self.price_change_callbacks:
+                started = time.perf_counter()
                 try:
                     callback(price, timestamp)
                 except Exception as e:
                     logger.error(f"❌ Error in price change callback: {e}")
+                self._record_callback_time(callback, started)
                     
         except Exception as e:
             logger.error(f"❌ Error triggering price change callbacks: {e}")
@@ -416,11 +712,17 @@ class RealTimeTracker:
     def _trigger_position_change_callbacks(self, change_type: str, position: Dict, timestamp: float):
         """เรียก Position Change Callbacks"""
         try:
+            if self.update_queue_enabled:
+                self.update_queue.put('position', {'change_type': change_type, 'position': position,
+                                                   'timestamp': timestamp}, key=position.get('ticket'))
+            
             for callback in self.position_change_callbacks:
+                started = time.perf_counter()
                 try:
                     callback(change_type, position, timestamp)
                 except Exception as e:
                     logger.error(f"❌ Error in position change callback: {e}")
+                self._record_callback_time(callback, started)
                     
         except Exception as e:
             logger.error(f"❌ Error triggering position change callbacks: {e}")
@@ -428,26 +730,43 @@ class RealTimeTracker:
     def _trigger_status_change_callbacks(self, ticket: int, old_status: Any, new_status: Any, timestamp: float):
         """เรียก Status Change Callbacks"""
         try:
+            if self.update_queue_enabled:
+                self.update_queue.put('status', {'ticket': ticket, 'old_status': old_status,
+                                                 'new_status': new_status, 'timestamp': timestamp}, key=ticket)
+            
             for callback in self.status_change_callbacks:
+                started = time.perf_counter()
                 try:
                     callback(ticket, old_status, new_status, timestamp)
                 except Exception as e:
                     logger.error(f"❌ Error in status change callback: {e}")
+                self._record_callback_time(callback, started)
                     
         except Exception as e:
             logger.error(f"❌ Error triggering status change callbacks: {e}")
     
+    def _record_callback_time(self, callback: Callable, started: float):
+        """บันทึกเวลาทำงานของ callback แยกตามผู้ติดตาม (แยก lambda / instance ด้วย id ของ callback)"""
+        entry = self._callback_latency.get(id(callback))
+        if entry is None:
+            name = (f"{getattr(callback, '__module__', '')}."
+                    f"{getattr(callback, '__qualname__', type(callback).__name__)}@{id(callback):#x}")
+            entry = self._callback_latency[id(callback)] = (name, LatencyStats())
+            self.callback_stats[name] = entry[1]
+        entry[1].record((time.perf_counter() - started) * 1000)
+    
     def _update_performance_metrics(self):
-        """อัพเดท Performance Metrics"""
+        """อัพเดท Performance Metrics (สรุปทุก 1 นาที)"""
         try:
             current_time = time.time()
+            time_elapsed = current_time - self.last_performance_check
             
-            if current_time - self.last_performance_check >= 60:  # ทุก 1 นาที
-                self.update_count += 1
-                
+            if time_elapsed >= 60:  # ทุก 1 นาที
                 # คำนวณ Updates per Second
-                time_elapsed = current_time - self.last_performance_check
                 self.performance_metrics['updates_per_second'] = self.update_count / time_elapsed
+                self.performance_metrics['avg_update_time'] = (
+                    self.latency_stats['update_processing'].get_summary().get('avg', 0.0)
+                )
                 
                 # Reset counters
                 self.update_count = 0
@@ -459,6 +778,26 @@ class RealTimeTracker:
         except Exception as e:
             logger.error(f"❌ Error updating performance metrics: {e}")
     
+    def get_latency_metrics(self) -> Dict[str, Any]:
+        """
+        สถิติหน่วงเวลาของเส้นทาง real-time (p50/p95/p99 ms)
+        
+        Returns:
+            Dict: publish_to_callback, order_fill, update_processing,
+                  callbacks (แยกตามผู้ติดตาม), dropped_updates / coalesced_updates (update_queue),
+                  coalesced_snapshots, coalesced_status_updates
+        """
+        return {
+            **{name: stats.get_summary() for name, stats in self.latency_stats.items()},
+            'callbacks': {name: stats.get_summary() for name, stats in list(self.callback_stats.items())},
+            'dropped_updates': dict(self.update_queue.dropped),
+            'coalesced_updates': dict(self.update_queue.coalesced),
+            'update_queue_size': self.update_queue.qsize(),
+            'update_queue_enabled': self.update_queue_enabled,
+            'coalesced_snapshots': self.coalesced_snapshots,
+            'coalesced_status_updates': self.coalesced_status_updates
+        }
+    
     # 🎯 Callback Management
     def add_price_change_callback(self, callback: Callable):
         """เพิ่ม Price Change Callback"""
@@ -473,13 +812,21 @@ class RealTimeTracker:
         self.status_change_callbacks.append(callback)
     
     def remove_callback(self, callback: Callable):
-        """ลบ Callback"""
-        if callback in self.price_change_callbacks:
-            self.price_change_callbacks.remove(callback)
-        if callback in self.position_change_callbacks:
-            self.position_change_callbacks.remove(callback)
-        if callback in self.status_change_callbacks:
-            self.status_change_callbacks.remove(callback)
+        """
+        ลบ Callback
+        
+        bound method ที่ส่งมาเป็น object ใหม่ (id ไม่ตรงกับที่เก็บไว้) จึงหาตัวที่เก็บไว้ด้วย == ก่อน
+        แล้วลบสถิติด้วย id ของตัวนั้น
+        """
+        for callbacks in (self.price_change_callbacks, self.position_change_callbacks,
+                          self.status_change_callbacks):
+            stored = next((c for c in callbacks if c == callback), None)
+            if stored is None:
+                continue
+            entry = self._callback_latency.pop(id(stored), None)
+            if entry is not None:
+                self.callback_stats.pop(entry[0], None)
+            callbacks.remove(stored)
     
     # 🎯 Configuration
     def set_update_threshold(self, threshold: float):
@@ -500,21 +847,62 @@ class RealTimeTracker:
     # 🎯 Status Methods
     def is_monitoring(self) -> bool:
         """ตรวจสอบว่ากำลังติดตามอยู่หรือไม่"""
-        return self.monitoring_thread and self.monitoring_thread.is_alive() and not self.stop_monitoring
+        return bool(self.monitoring_thread and self.monitoring_thread.is_alive() and not self._stop_event.is_set())
     
     def get_performance_metrics(self) -> Dict[str, Any]:
-        """ดึง Performance Metrics"""
-        return self.performance_metrics.copy()
+        """ดึง Performance Metrics (รวมสถิติหน่วงเวลาจาก get_latency_metrics)"""
+        metrics = self.performance_metrics.copy()
+        metrics['latency'] = self.get_latency_metrics()
+        return metrics
     
     def get_price_history(self, limit: int = 50) -> Dict[float, float]:
-        """ดึงประวัติราคา"""
+        """ดึงประวัติราคา (ใหม่สุดก่อน)"""
         try:
-            sorted_history = sorted(self.price_history.items(), reverse=True)
-            return dict(sorted_history[:limit])
+            timestamps, prices = self.price_history.latest(limit)
+            return dict(zip(timestamps[::-1].tolist(), prices[::-1].tolist()))
         except Exception as e:
             logger.error(f"❌ Error getting price history: {e}")
             return {}
     
+    def get_price_range(self, start_time: float, end_time: Optional[float] = None) -> Dict[float, float]:
+        """
+        ดึงราคาในช่วงเวลา (เก่าสุดก่อน) - binary search O(log n)
+        
+        Args:
+            start_time: เวลาเริ่ม (timestamp)
+            end_time: เวลาสิ้นสุด (None = ถึงล่าสุด)
+        """
+        try:
+            timestamps, prices = self.price_history.get_range(start_time, end_time)
+            return dict(zip(timestamps.tolist(), prices.tolist()))
+        except Exception as e:
+            logger.error(f"❌ Error getting price range: {e}")
+            return {}
+    
+    def enable_update_queue(self, enabled: bool = True):
+        """
+        เปิด/ปิดการเก็บ update เข้า update_queue
+        
+        ผู้อ่านคิว (เช่น GUI ที่เรียก get_pending_updates ทุกรอบ refresh) ต้องเปิดก่อน -
+        ถ้าไม่มีผู้อ่าน คิวจะไม่ถูกเติม (ไม่ค้าง object และไม่นับ dropped_updates)
+        
+        Args:
+            enabled: True = เก็บ update, False = หยุดเก็บและล้างคิว
+        """
+        self.update_queue_enabled = enabled
+        if not enabled:
+            self.update_queue.clear()
+        logger.info(f"📬 [UPDATE QUEUE] {'enabled' if enabled else 'disabled'}")
+    
+    def get_pending_updates(self, max_items: Optional[int] = None) -> List[Tuple[str, Any]]:
+        """
+        ดึง update ที่ค้างใน update_queue (สำหรับ GUI - ไม่ block, ต้อง enable_update_queue ก่อน)
+        
+        Returns:
+            List[Tuple]: (kind, payload) เรียงจากเก่าไปใหม่ - update ของรายการเดียวกันถูกรวมเป็นค่าล่าสุดแล้ว
+        """
+        return self.update_queue.drain(max_items)
+    
     def clear_history(self):
         """ล้างประวัติ"""
         self.price_history.clear()
@@ -612,7 +1000,8 @@ class RealTimeTracker:
                 'filled_orders': filled_orders,
                 'closed_orders': closed_orders,
                 'error_orders': error_orders,
-                'success_rate': (filled_orders / total_orders * 100) if total_orders > 0 else 0
+                'success_rate': (filled_orders / total_orders * 100) if total_orders > 0 else 0,
+                'fill_time_ms': self.latency_stats['order_fill'].get_summary()
             }
         except Exception as e:
             logger.error(f"❌ Error getting order statistics: {e}")
@@ -624,9 +1013,15 @@ class RealTimeTracker:
             if not hasattr(self, 'tracked_orders') or ticket not in self.tracked_orders:
                 return False
             
-            old_status = self.tracked_orders[ticket].get('status')
-            self.tracked_orders[ticket]['status'] = status
-            self.tracked_orders[ticket]['last_update'] = time.time()
+            order = self.tracked_orders[ticket]
+            old_status = order.get('status')
+            now = time.time()
+            order['status'] = status
+            order['last_update'] = now
+            
+            # latency ของ order_fill มาจาก on_execution_recorded - ที่นี่เก็บแค่เวลาที่ fill
+            if status == 'FILLED' and old_status != 'FILLED':
+                order['fill_time'] = now
             
             if old_status != status:
                 logger.info(f"🔄 [ORDER STATUS] #{ticket}: {old_status} → {status}")
@@ -1,4 +1,4 @@
-import MetaTrader5 as mt5
+from mt5_connection import mt5  # เรียก terminal ผ่าน MT5 I/O thread
 import numpy as np
 from datetime import datetime, timedelta
 from typing import List, Dict, Tuple, Optional, Any
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""
+ตั้งค่า pytest: ใช้ Terminal จำลอง (fake_mt5) และ import โมดูลจาก root ของ repo
+"""
+
+import logging
+import os
+import sys
+
+os.environ['MT5_SIMULATOR'] = '1'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+import fake_mt5  # noqa: E402
+from mt5_connection import MT5Connection  # noqa: E402
+
+logging.disable(logging.CRITICAL)
+
+@pytest.fixture
+def terminal():
+    """Terminal จำลองแบบ deterministic (เวลาเดินด้วย advance() เท่านั้น)"""
+    return fake_mt5.reset(speed=0, stops_level=100)
+
+@pytest.fixture
+def connection(terminal):
+    """MT5Connection ที่เชื่อมต่อกับ Terminal จำลองแล้ว"""
+    mt5_connection = MT5Connection()
+    assert mt5_connection.connect_mt5(max_retries=1)
+    return mt5_connection
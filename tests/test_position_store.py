@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+ทดสอบ PositionStore เมื่อมีการเพิ่ม/ลบจาก thread อื่นระหว่างที่ผู้อ่านวนลูป
+"""
+
+import sys
+import threading
+
+from calculations import Position
+from order_management import OrderManager, PositionStore
+
+def _position(ticket: int) -> Position:
+    return Position(ticket=ticket, symbol='XAUUSD', type=ticket % 2, volume=0.01,
+                    price_open=2000.0, price_current=2000.0, profit=float(ticket % 7 - 3))
+
+def _churn(store: PositionStore, stop: threading.Event):
+    """เพิ่มและลบ Position ต่อเนื่อง (จำลอง worker thread ที่เปิด/ปิดไม้)"""
+    ticket = 10000
+    while not stop.is_set():
+        store.add(_position(ticket))
+        store.remove(ticket - 50)
+        ticket += 1
+
+def _run_with_churn(store: PositionStore, reader, calls: int = 300):
+    stop = threading.Event()
+    writer = threading.Thread(target=_churn, args=(store, stop), daemon=True)
+    # สลับ thread บ่อย ๆ ให้การแก้ไขเกิดระหว่างที่ผู้อ่านวนลูปแน่นอน
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    writer.start()
+    errors = []
+    try:
+        for _ in range(calls):
+            try:
+                reader()
+            except RuntimeError as e:
+                errors.append(e)
+    finally:
+        stop.set()
+        writer.join(5)
+        sys.setswitchinterval(switch_interval)
+    return errors
+
+def test_aggregates_survive_concurrent_add_remove(connection):
+    order_manager = OrderManager(connection)
+    order_manager.position_store.replace_all([_position(i) for i in range(2000)])
+    errors = _run_with_churn(order_manager.position_store, order_manager.get_portfolio_aggregates)
+    assert errors == []
+
+def test_iteration_and_columns_survive_concurrent_add_remove():
+    store = PositionStore()
+    store.replace_all([_position(i) for i in range(2000)])
+    errors = _run_with_churn(store, lambda: (sum(p.volume for p in store), store.columns()))
+    assert errors == []
+
+def test_snapshot_version_matches_positions():
+    store = PositionStore()
+    store.replace_all([_position(i) for i in range(10)])
+    version, positions = store.snapshot()
+    assert len(positions) == 10
+    store.add(_position(99))
+    assert store.version != version
+    assert len(positions) == 10  # list เดิมไม่ถูกแก้
+    assert len(store.snapshot()[1]) == 11
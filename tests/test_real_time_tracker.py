@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+ทดสอบสถิติ latency ของ RealTimeTracker บน fake_mt5.FakeTerminal
+"""
+
+import types
+
+from order_management import OrderManager
+from real_time_tracker import RealTimeTracker
+from trading_conditions import Signal
+
+def test_order_fill_is_fed_from_execution_stats(terminal, connection, monkeypatch):
+    # _check_trading_allowed อิงเวลาจริง (ปิดช่วงสุดสัปดาห์) - ทดสอบได้ทุกวัน
+    monkeypatch.setattr(connection, '_check_trading_allowed', lambda symbol: {'allowed': True, 'reason': ''})
+    order_manager = OrderManager(connection)
+    tracker = RealTimeTracker(types.SimpleNamespace(order_manager=order_manager))
+    tracker._subscribe()
+
+    result = order_manager.place_order_from_signal(Signal(direction='BUY', symbol=terminal.symbol), 0.01, 10000.0)
+    assert result.success
+
+    fill = tracker.get_latency_metrics()['order_fill']
+    assert fill['count'] == 1
+    assert fill['p50'] == order_manager.execution_stats.get_recent('open')[-1].latency_ms
+
+    tracker._unsubscribe()
+    order_manager.place_order_from_signal(Signal(direction='SELL', symbol=terminal.symbol), 0.01, 10000.0)
+    assert tracker.get_latency_metrics()['order_fill']['count'] == 1
+
+class _Listener:
+    def on_price(self, price, timestamp):
+        pass
+
+def test_remove_bound_method_drops_its_callback_stats():
+    tracker = RealTimeTracker(types.SimpleNamespace())
+    listener = _Listener()
+    tracker.add_price_change_callback(listener.on_price)
+    tracker._trigger_price_change_callbacks(2000.0, 0.0)
+    assert len(tracker.callback_stats) == 1
+
+    # listener.on_price สร้าง bound method ใหม่ทุกครั้ง (id ไม่ตรงกับตัวที่เก็บไว้)
+    tracker.remove_callback(listener.on_price)
+    assert tracker.price_change_callbacks == []
+    assert tracker.callback_stats == {}
+    assert tracker._callback_latency == {}
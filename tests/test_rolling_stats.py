@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+ทดสอบ RollingWindowStats / สถิติ rolling ของ MarketConditionDetector เทียบกับ NumPy
+"""
+
+import numpy as np
+import pytest
+
+from market_condition_detector import MarketConditionDetector
+
+def _random_walk(count: int, seed: int = 7) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 2000.0 + np.cumsum(rng.normal(0.0, 0.3, count))
+
+def _feed(detector: MarketConditionDetector, prices: np.ndarray, start: int = 0):
+    for i, price in enumerate(prices, start):
+        detector.update_price_data(float(price), 1.0, 1000.0 + i * 0.1)
+
+def _assert_matches_numpy(detector: MarketConditionDetector):
+    history = detector.price_history.last()
+    for window, stats in detector.window_stats.items():
+        y = history[-window:]
+        assert stats.count == len(y)
+        if len(y) < 2:
+            continue
+        x = np.arange(len(y))
+        scale = max(float(np.std(y)), 1e-3)
+        assert stats.slope == pytest.approx(np.polyfit(x, y, 1)[0], abs=1e-6 * scale)
+        assert stats.std == pytest.approx(np.std(y), abs=1e-6)
+        assert stats.average == pytest.approx(np.mean(y), abs=1e-6)
+        if np.std(y) > 0:
+            assert stats.r_squared == pytest.approx(np.corrcoef(x, y)[0, 1] ** 2, abs=1e-6)
+
+def test_rolling_stats_match_numpy_across_resync():
+    detector = MarketConditionDetector()
+    prices = _random_walk(2 * detector.stats_resync_interval + 500)
+    for start in range(0, len(prices), 37):
+        _feed(detector, prices[start:start + 37], start)
+        _assert_matches_numpy(detector)
+
+def test_trend_score_matches_polyfit():
+    detector = MarketConditionDetector()
+    _feed(detector, _random_walk(1200, seed=11))
+    history = detector.price_history.last()
+    for period in detector.trend_periods:
+        y = history[-period:]
+        slope = np.polyfit(np.arange(len(y)), y, 1)[0]
+        expected = np.clip(slope / (np.std(y) * 0.1), -1, 1)
+        assert detector._calculate_trend_score(period) == pytest.approx(expected, abs=1e-6)
+
+def test_flat_prices_have_no_trend():
+    detector = MarketConditionDetector()
+    _feed(detector, np.full(60, 2000.0))
+    assert detector._calculate_trend_score(20) == 0.0
+
+def test_window_is_clamped_to_history_capacity():
+    detector = MarketConditionDetector()
+    capacity = detector.price_history.capacity
+    detector.trend_periods.append(capacity + 500)
+    stats = detector._get_window_stats(capacity + 500)
+    assert stats.window == capacity
+
+    _feed(detector, _random_walk(capacity + 500, seed=3))
+    assert stats.count == capacity
+    _assert_matches_numpy(detector)
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+ทดสอบการแก้ไข SL/TP (TRADE_ACTION_SLTP) บน fake_mt5.FakeTerminal
+"""
+
+import pytest
+
+import fake_mt5
+from order_management import OrderManager
+
+@pytest.fixture
+def order_manager(connection):
+    return OrderManager(connection)
+
+def _bid(terminal):
+    return terminal.symbol_info_tick(terminal.symbol).bid
+
+def test_stops_level_rejection_is_not_sent(terminal, order_manager):
+    ticket = terminal.add_position(fake_mt5.POSITION_TYPE_BUY, 0.01, 2000.0)
+    order_manager.sync_positions_from_mt5()
+    terminal.reset_call_counts()
+
+    # stops_level 100 points = 1.00 - SL ห่าง Bid แค่ 0.50
+    results = order_manager.modify_positions_sl_tp([{'ticket': ticket, 'sl': _bid(terminal) - 0.5, 'tp': 0.0}])
+
+    assert results[ticket]['success'] is False
+    assert results[ticket]['retcode'] == fake_mt5.TRADE_RETCODE_INVALID_STOPS
+    assert terminal.call_counts.get('order_send', 0) == 0
+    assert terminal.positions[ticket]['sl'] == 0.0
+    assert order_manager.position_store.get(ticket).sl == 0.0
+
+def test_successful_sltp_updates_terminal_and_store(terminal, order_manager):
+    ticket = terminal.add_position(fake_mt5.POSITION_TYPE_BUY, 0.01, 2000.0)
+    order_manager.sync_positions_from_mt5()
+    events = []
+    order_manager.add_position_change_callback(lambda change_type, position, ts: events.append((change_type, position.ticket)))
+
+    bid = _bid(terminal)
+    sl, tp = round(bid - 5.0, 2), round(bid + 5.0, 2)
+    assert order_manager.modify_position_sl_tp(ticket, sl, tp) is True
+
+    sent = terminal.order_log[-1]
+    assert sent.request['action'] == fake_mt5.TRADE_ACTION_SLTP
+    assert sent.retcode == fake_mt5.TRADE_RETCODE_DONE
+    assert (terminal.positions[ticket]['sl'], terminal.positions[ticket]['tp']) == (sl, tp)
+    position = order_manager.position_store.get(ticket)
+    assert (position.sl, position.tp) == (sl, tp)
+    assert events == [('modified', ticket)]
+
+def test_batch_reports_per_ticket_results_with_injected_retcodes(terminal, order_manager):
+    ok = terminal.add_position(fake_mt5.POSITION_TYPE_BUY, 0.01, 2000.0)
+    rejected = terminal.add_position(fake_mt5.POSITION_TYPE_SELL, 0.01, 2000.0)
+    requoted = terminal.add_position(fake_mt5.POSITION_TYPE_BUY, 0.01, 2000.0)
+    order_manager.sync_positions_from_mt5()
+    injected = {rejected: fake_mt5.TRADE_RETCODE_REJECT, requoted: fake_mt5.TRADE_RETCODE_REQUOTE}
+    terminal.retcode_hook = lambda request: injected.get(request.get('position'))
+
+    bid = _bid(terminal)
+    ask = terminal.symbol_info_tick(terminal.symbol).ask
+    missing = 999999
+    results = order_manager.modify_positions_sl_tp([
+        {'ticket': ok, 'sl': round(bid - 5.0, 2), 'tp': 0.0},
+        {'ticket': rejected, 'sl': round(ask + 5.0, 2), 'tp': 0.0},
+        {'ticket': requoted, 'sl': round(bid - 5.0, 2), 'tp': 0.0},
+        {'ticket': missing, 'sl': 1.0, 'tp': 0.0},
+    ])
+
+    assert set(results) == {ok, rejected, requoted, missing}
+    assert results[ok]['success'] is True
+    assert results[ok]['retcode'] == fake_mt5.TRADE_RETCODE_DONE
+    assert results[rejected]['success'] is False
+    assert results[rejected]['retcode'] == fake_mt5.TRADE_RETCODE_REJECT
+    assert results[requoted]['success'] is False
+    assert results[requoted]['retcode'] == fake_mt5.TRADE_RETCODE_REQUOTE
+    assert results[missing]['success'] is False
+    assert results[missing]['retcode'] is None
+    assert terminal.call_counts['order_send'] == 3
+
+    assert order_manager.position_store.get(ok).sl == round(bid - 5.0, 2)
+    assert order_manager.position_store.get(rejected).sl == 0.0
+    assert terminal.positions[requoted]['sl'] == 0.0
+
+def test_unchanged_sl_tp_counts_as_success(terminal, order_manager):
+    ticket = terminal.add_position(fake_mt5.POSITION_TYPE_BUY, 0.01, 2000.0)
+    order_manager.sync_positions_from_mt5()
+    sl = round(_bid(terminal) - 5.0, 2)
+    assert order_manager.modify_position_sl_tp(ticket, sl, 0.0) is True
+
+    results = order_manager.modify_positions_sl_tp([{'ticket': ticket, 'sl': sl, 'tp': 0.0}])
+    assert results[ticket]['success'] is True
+    assert results[ticket]['retcode'] == fake_mt5.TRADE_RETCODE_NO_CHANGES
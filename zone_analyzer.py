@@ -1,4 +1,4 @@
-import MetaTrader5 as mt5
+from mt5_connection import mt5  # เรียก terminal ผ่าน MT5 I/O thread
 import numpy as np
 import time
 from datetime import datetime, timedelta